@@ -0,0 +1,160 @@
+"""
+Admission control for busy routes.
+
+ROUTE_LIMITS maps "METHOD /route/template" to token-bucket limits written as
+"N/S": bursts of up to N requests, refilled at N per S seconds. Every request
+draws from its client IP's bucket ("ip"), and one with a valid bearer token
+also from its user's ("user"), so a token does not lift the IP limit.
+RATE_LIMITS (JSON) overrides or adds routes. An empty bucket answers 429 with
+Retry-After set to the longest wait for the next token.
+
+Requests to those routes are also shed with 429 while more than
+ADMISSION_MAX_IN_FLIGHT requests are being served, or while the moving average
+database call latency is above ADMISSION_MAX_DB_LATENCY_MS (0 disables either).
+
+Buckets live in the store named by RATE_LIMIT_BACKEND: "local" keeps them in
+the process, so each API instance enforces its own limits, and
+RATE_LIMIT_LOCAL_LATENCY_MS simulates a shared store's round-trip. Set it to
+"module:factory" for a store shared between instances, with
+`async take(key, capacity, period) -> seconds until a token is free (0 when
+one was taken)`. If the store fails, requests are admitted.
+"""
+import asyncio
+import importlib
+import logging
+import math
+import time
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
+from auth import verify_token
+from cache import TTLCache
+from config import settings
+from metrics import db_latency_average, record_admission, register_gauge, requests_in_flight
+
+logger = logging.getLogger(__name__)
+
+ROUTE_LIMITS = {
+    "POST /bookings/": {"user": "10/60", "ip": "30/60"},
+    "POST /cart/checkout": {"user": "10/60", "ip": "30/60"},
+    "GET /batches/{batch_id}": {"user": "120/60", "ip": "300/60"},
+}
+
+def parse_limit(spec: str) -> Tuple[int, float]:
+    """"N/S" -> (capacity N, period S seconds)."""
+    capacity, _, period = spec.partition("/")
+    return int(capacity), float(period or 1)
+
+def _route_limits() -> Dict[str, Dict[str, Tuple[int, float]]]:
+    limits = {**ROUTE_LIMITS, **settings.rate_limits}
+    return {
+        route: {principal: parse_limit(spec) for principal, spec in specs.items()}
+        for route, specs in limits.items()
+    }
+
+class LocalBucketStore:
+    def __init__(self, max_keys: int, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        # An idle bucket is full again after one period, so dropping it then is safe
+        self.buckets = TTLCache(maxsize=max_keys, ttl=3600.0)
+
+    async def take(self, key: str, capacity: int, period: float) -> float:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        now = time.monotonic()
+        rate = capacity / period
+        tokens, updated = self.buckets.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        if tokens >= 1:
+            self.buckets.set(key, (tokens - 1, now), ttl=period)
+            return 0.0
+        self.buckets.set(key, (tokens, now), ttl=period)
+        return (1 - tokens) / rate
+
+STORES = {
+    "local": lambda: LocalBucketStore(
+        settings.rate_limit_store_size,
+        settings.rate_limit_local_latency_ms
+    )
+}
+
+def load_store(name: str):
+    if name in STORES:
+        return STORES[name]()
+    module_name, _, factory = name.partition(":")
+    return getattr(importlib.import_module(module_name), factory)()
+
+route_limits = _route_limits()
+bucket_store = load_store(settings.rate_limit_backend)
+
+def client_ip(request: Request) -> str:
+    if settings.rate_limit_trust_proxy:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+async def _principal(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        claims = await verify_token(HTTPAuthorizationCredentials(scheme=scheme, credentials=token))
+    except HTTPException:
+        return None
+    return claims.get("sub")
+
+def _too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+def overloaded() -> bool:
+    if settings.admission_max_in_flight and requests_in_flight() > settings.admission_max_in_flight:
+        return True
+    max_latency = settings.admission_max_db_latency_ms / 1000
+    return bool(max_latency) and db_latency_average() > max_latency
+
+async def admission_control(request: Request):
+    """App-wide dependency; runs after routing, so the route template is known."""
+    route = getattr(request.scope.get("route"), "path", None)
+    limits = route_limits.get(f"{request.method} {route}")
+    if not limits or not settings.rate_limit_enabled:
+        return
+
+    if overloaded():
+        record_admission(request.method, route, "shed")
+        raise _too_many_requests("Server is busy, try again shortly", settings.admission_retry_after_seconds)
+
+    user_id = await _principal(request)
+    principals = {"ip": client_ip(request)}
+    if user_id:
+        principals["user"] = user_id
+    buckets = [
+        (f"{request.method} {route}|{kind}:{principal}", limits[kind])
+        for kind, principal in principals.items() if kind in limits
+    ]
+
+    if buckets:
+        try:
+            waits = await asyncio.gather(*[bucket_store.take(key, *limit) for key, limit in buckets])
+        except Exception:
+            logger.exception("Rate limit store failed; admitting request")
+            waits = [0.0]
+        retry_after = max(waits)
+        if retry_after:
+            record_admission(request.method, route, "rate_limited")
+            raise _too_many_requests("Rate limit exceeded", retry_after)
+
+    record_admission(request.method, route, "admitted")
+
+register_gauge("http_requests_in_flight", "Requests being served.", requests_in_flight)
+register_gauge(
+    "db_call_latency_average_seconds",
+    "Moving average database call latency used for load shedding.",
+    db_latency_average
+)
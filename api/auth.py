@@ -3,25 +3,105 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from config import settings
 from database import get_supabase
+from cache import TTLCache
+from projection import columns_for
+from schemas import InstituteResponse, StudentResponse, UserProfile
+import hashlib
+import time
+from datetime import date
 from typing import Optional
 
 security = HTTPBearer()
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+# documents can be large JSON and is only needed by GET /institutes/me
+PRINCIPAL_INSTITUTE_COLUMNS = columns_for(InstituteResponse, exclude=["documents"])
+
+principal_cache = TTLCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds
+)
+
+# Verified claims by token hash, each expiring at its token's exp
+token_cache = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl=settings.token_cache_max_ttl_seconds
+)
+# Revocations are per process and must outlive every token they cover, so
+# these never evict live entries; the size only sets when expired ones are purged.
+# Revoked token hashes, kept until the token would have expired anyway
+revoked_tokens = TTLCache(
+    maxsize=settings.revoked_token_cache_size,
+    ttl=settings.access_token_expire_minutes * 60,
+    evict_live=False
+)
+# user id -> time before which all of the user's tokens are revoked
+revoked_users = TTLCache(
+    maxsize=settings.revoked_token_cache_size,
+    ttl=settings.access_token_expire_minutes * 60,
+    evict_live=False
+)
+
+def token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def revoke_token(token: str, claims: dict):
+    key = token_key(token)
+    remaining = claims.get("exp", time.time() + revoked_tokens.ttl) - time.time()
+    if remaining > 0:
+        revoked_tokens.set(key, True, ttl=remaining)
+    token_cache.pop(key)
+
+def revoke_user_tokens(user_id: str):
+    revoked_users.set(user_id, time.time())
+
+def invalidate_principal(user_id: str):
+    principal_cache.pop(user_id)
+
+def _cache_profile(current_user: dict, table: str, profile: dict):
+    principal = principal_cache.peek(current_user["userid"])
+    if principal is None:
+        principal = {"user": current_user}
+        principal_cache.set(current_user["userid"], principal)
+    principal[table] = profile
+
+def _cached_profile(current_user: dict, table: str) -> Optional[dict]:
+    principal = principal_cache.peek(current_user["userid"])
+    return principal.get(table) if principal else None
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     token = credentials.credentials
-    try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm]
-        )
-        return payload
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    key = token_key(token)
+
+    if revoked_tokens.peek(key) is not None:
+        raise _unauthorized()
+
+    payload = token_cache.get(key)
+    if payload is None:
+        try:
+            payload = jwt.decode(
+                token,
+                settings.jwt_secret_key,
+                algorithms=[settings.jwt_algorithm]
+            )
+        except JWTError:
+            raise _unauthorized()
+
+        ttl = min(payload.get("exp", float("inf")) - time.time(), token_cache.ttl)
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+
+    revoked_before = revoked_users.peek(payload.get("sub"))
+    if revoked_before is not None and payload.get("iat", 0) < revoked_before:
+        raise _unauthorized()
+
+    return payload
 
 async def get_current_user(token_data: dict = Depends(verify_token)) -> dict:
     user_id = token_data.get("sub")
@@ -31,15 +111,20 @@ async def get_current_user(token_data: dict = Depends(verify_token)) -> dict:
             detail="Invalid authentication credentials"
         )
 
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal["user"]
+
     supabase = get_supabase()
-    response = supabase.table("users").select("*").eq("userid", user_id).maybe_single().execute()
+    response = await supabase.table("users").select(columns_for(UserProfile)).eq("userid", user_id).maybe_single().execute()
 
-    if not response.data:
+    if response is None or not response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
+    principal_cache.set(user_id, {"user": response.data})
     return response.data
 
 async def get_current_student(current_user: dict = Depends(get_current_user)) -> dict:
@@ -49,15 +134,20 @@ async def get_current_student(current_user: dict = Depends(get_current_user)) ->
             detail="Access denied. Student role required."
         )
 
+    cached = _cached_profile(current_user, "students")
+    if cached is not None:
+        return cached
+
     supabase = get_supabase()
-    response = supabase.table("students").select("*").eq("userid", current_user["userid"]).maybe_single().execute()
+    response = await supabase.table("students").select(columns_for(StudentResponse)).eq("userid", current_user["userid"]).maybe_single().execute()
 
-    if not response.data:
+    if response is None or not response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student profile not found"
         )
 
+    _cache_profile(current_user, "students", response.data)
     return response.data
 
 async def get_current_institute(current_user: dict = Depends(get_current_user)) -> dict:
@@ -67,16 +157,27 @@ async def get_current_institute(current_user: dict = Depends(get_current_user))
             detail="Access denied. Institute role required."
         )
 
+    cached = _cached_profile(current_user, "institutes")
+    if cached is not None:
+        return cached
+
     supabase = get_supabase()
-    response = supabase.table("institutes").select("*").eq("userid", current_user["userid"]).maybe_single().execute()
+    response = await supabase.table("institutes").select(PRINCIPAL_INSTITUTE_COLUMNS).eq("userid", current_user["userid"]).maybe_single().execute()
 
-    if not response.data:
+    if response is None or not response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Institute profile not found"
         )
 
-    return response.data
+    institute = response.data
+    # The expiry sweeper flags institutes periodically; one whose valid_to
+    # passed since its last run is caught here, once per principal load.
+    if not institute.get("accreditation_expired"):
+        institute["accreditation_expired"] = str(institute["valid_to"]) < date.today().isoformat()
+
+    _cache_profile(current_user, "institutes", institute)
+    return institute
 
 async def get_current_admin(current_user: dict = Depends(get_current_user)) -> dict:
     if current_user["role"] != "admin":
@@ -88,6 +189,4 @@ async def get_current_admin(current_user: dict = Depends(get_current_user)) -> d
     return current_user
 
 def check_institute_expired(institute: dict) -> bool:
-    from datetime import datetime
-    valid_to = datetime.fromisoformat(str(institute["valid_to"]))
-    return valid_to < datetime.now()
+    return institute.get("accreditation_expired", False)
@@ -0,0 +1,88 @@
+"""
+Batch lifecycle scheduler.
+
+Moves batches along upcoming -> ongoing -> completed by their dates, with one
+set-based UPDATE per transition rather than one request per batch:
+
+- upcoming batches whose start_date has passed and end_date has not become ongoing
+- upcoming or ongoing batches whose end_date has passed become completed
+
+Cancelled batches are never touched. The API runs it every
+BATCH_LIFECYCLE_INTERVAL_SECONDS (0 disables the in-app task); it can also be
+run from the command line, or previewed without writing:
+
+    python batch_lifecycle.py run
+    python batch_lifecycle.py dry-run
+"""
+import asyncio
+import json
+import sys
+import time
+from datetime import date
+from typing import Dict, Optional
+from postgrest.types import CountMethod, ReturnMethod
+from database import get_supabase, close_supabase
+from metrics import record_batch_lifecycle_run, register_gauge
+from response_cache import invalidate_catalog
+
+ACTIVE_STATUSES = ["upcoming", "ongoing"]
+
+_last_run = {"timestamp": 0.0}
+
+def _transitions(today: str) -> Dict[str, tuple]:
+    """transition -> (new status, filters), applied in this order."""
+    return {
+        "completed": ("completed", lambda query: query
+            .in_("batch_status", ACTIVE_STATUSES)
+            .lt("end_date", today)),
+        "ongoing": ("ongoing", lambda query: query
+            .eq("batch_status", "upcoming")
+            .lte("start_date", today)
+            .gte("end_date", today)),
+    }
+
+async def advance_batches(dry_run: bool = False, today: Optional[date] = None) -> dict:
+    """Number of batches moved (or, with dry_run, that would move) per new status."""
+    supabase = get_supabase()
+    today = (today or date.today()).isoformat()
+    started = time.perf_counter()
+    moved = {}
+
+    for transition, (new_status, apply_filters) in _transitions(today).items():
+        if dry_run:
+            query = supabase.table("batches").select("batchid", count=CountMethod.exact).limit(1)
+        else:
+            query = supabase.table("batches").update(
+                {"batch_status": new_status},
+                count=CountMethod.exact,
+                returning=ReturnMethod.minimal
+            )
+        response = await apply_filters(query).execute()
+        moved[transition] = response.count or 0
+
+    if not dry_run and any(moved.values()):
+        invalidate_catalog("batches")
+
+    seconds = time.perf_counter() - started
+    _last_run["timestamp"] = time.time()
+    record_batch_lifecycle_run(moved, seconds, dry_run)
+
+    return {"date": today, "dry_run": dry_run, "moved": moved, "seconds": round(seconds, 4)}
+
+register_gauge(
+    "batch_lifecycle_last_run_timestamp_seconds",
+    "Unix time of the last batch lifecycle run in this process.",
+    lambda: _last_run["timestamp"]
+)
+
+async def _run(dry_run: bool) -> dict:
+    try:
+        return await advance_batches(dry_run)
+    finally:
+        await close_supabase()
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "dry-run"
+    if command not in ("run", "dry-run"):
+        sys.exit("usage: python batch_lifecycle.py [run|dry-run]")
+    print(json.dumps(asyncio.run(_run(command == "dry-run")), indent=2))
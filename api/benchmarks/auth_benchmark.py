@@ -0,0 +1,112 @@
+"""
+Per-request authentication overhead microbenchmark.
+
+Measures the bearer token check two ways, over a pool of --tokens distinct
+tokens reused round-robin (dashboards polling with the same token):
+
+    verify    auth.verify_token alone: a full jwt.decode with signature
+              verification on every call (TOKEN_CACHE_SIZE=0) versus the
+              verified-claims cache
+    request   GET /students/me end to end over ASGI on the in-memory backend,
+              with the principal cache warm, with and without the token cache
+
+    python benchmarks/auth_benchmark.py --tokens 100 --iterations 20000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_BACKEND"] = "memory"
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+import httpx
+from fastapi.security import HTTPAuthorizationCredentials
+from auth import token_cache, verify_token
+from routes.auth_routes import create_access_token
+
+def per_call_us(samples: list) -> dict:
+    return {
+        "median_us": round(statistics.median(samples) * 1e6, 2),
+        "p99_us": round(sorted(samples)[int(len(samples) * 0.99) - 1] * 1e6, 2),
+    }
+
+async def measure_verify(tokens: list, iterations: int) -> list:
+    credentials = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=token) for token in tokens]
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await verify_token(credentials[i % len(credentials)])
+        samples.append(time.perf_counter() - started)
+    return samples
+
+async def measure_requests(client: httpx.AsyncClient, tokens: list, iterations: int) -> list:
+    headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        response = await client.get("/students/me", headers=headers[i % len(headers)])
+        samples.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f"/students/me -> {response.status_code}: {response.text}")
+    return samples
+
+async def compare(rounds: int, measure, *args) -> dict:
+    """Alternates uncached and cached runs so drift affects both equally."""
+    maxsize = token_cache.maxsize
+    samples = {False: [], True: []}
+    try:
+        for _ in range(rounds):
+            for enabled in (False, True):
+                token_cache.clear()
+                token_cache.maxsize = maxsize if enabled else 0
+                samples[enabled].extend(await measure(*args))
+    finally:
+        token_cache.maxsize = maxsize
+        token_cache.clear()
+    return {enabled: per_call_us(values) for enabled, values in samples.items()}
+
+async def run(token_count: int, iterations: int, request_iterations: int, rounds: int) -> dict:
+    from main import app
+    from database import get_supabase
+
+    memory = get_supabase().client
+    tokens = []
+    for i in range(token_count):
+        user_id = str(uuid.uuid4())
+        memory.seed("users", [{"userid": user_id, "email": f"auth-{i}@example.com", "full_name": "S", "role": "student"}])
+        memory.seed("students", [{"userid": user_id, "full_name": f"Student {i}", "date_of_birth": "1990-01-01", "phone": "0"}])
+        tokens.append(create_access_token({"sub": user_id, "role": "student"}, timedelta(minutes=30)))
+
+    results = {"verify": await compare(rounds, measure_verify, tokens, iterations // rounds)}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        await measure_requests(client, tokens, len(tokens))
+        results["request"] = await compare(rounds, measure_requests, client, tokens, request_iterations // rounds)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--request-iterations", type=int, default=4000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.tokens, args.iterations, args.request_iterations, args.rounds))
+    for layer in ("verify", "request"):
+        uncached, cached = results[layer][False], results[layer][True]
+        for label, stats in (("decode", uncached), ("cached", cached)):
+            print(f"{layer:>8} {label:>7}: median={stats['median_us']}us p99={stats['p99_us']}us")
+        print(f"{layer:>8}   saved: {uncached['median_us'] - cached['median_us']:.2f}us per request "
+              f"({uncached['median_us'] / cached['median_us']:.1f}x)")
+
+if __name__ == "__main__":
+    main()
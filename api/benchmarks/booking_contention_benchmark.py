@@ -0,0 +1,163 @@
+"""
+Seat reservation contention benchmark.
+
+Creates a batch under an existing course (or a throwaway institute and
+course when --course-id is omitted), then has N concurrent clients
+(one synthetic student each) reserve a seat on it at the same time. Reports
+throughput and latency, then checks that exactly min(N, seats) bookings
+succeeded and that batches.seats_booked matches the booking rows, i.e. that
+nothing was oversold. All rows it creates are removed afterwards.
+
+    python benchmarks/booking_contention_benchmark.py --course-id <uuid> --clients 200 --seats 40
+
+Against the in-memory backend, with a simulated round-trip:
+
+    DATABASE_BACKEND=memory MEMORY_LATENCY_MS=5 python benchmarks/booking_contention_benchmark.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from database import get_supabase, close_supabase
+from reservations import reserve_seat
+
+async def create_course() -> tuple:
+    supabase = get_supabase()
+    today = date.today()
+
+    institute = await supabase.table("institutes").insert({
+        "name": "Contention Benchmark Institute",
+        "accreditation_no": "BENCH-CONTENTION",
+        "valid_from": today.isoformat(),
+        "valid_to": (today + timedelta(days=365)).isoformat(),
+        "contact_email": "bench@example.com",
+        "verified_status": "verified"
+    }).execute()
+    instid = institute.data[0]["instid"]
+
+    course = await supabase.table("courses").insert({
+        "instid": instid,
+        "title": "Contention benchmark",
+        "type": "Other",
+        "duration": "1 day",
+        "mode": "offline",
+        "fees": 1000,
+        "status": "active"
+    }).execute()
+    return instid, course.data[0]["courseid"]
+
+async def setup(course_id: str, clients: int, seats: int):
+    supabase = get_supabase()
+    today = date.today()
+
+    batch = await supabase.table("batches").insert({
+        "courseid": course_id,
+        "batch_name": "Contention benchmark",
+        "start_date": (today + timedelta(days=30)).isoformat(),
+        "end_date": (today + timedelta(days=35)).isoformat(),
+        "seats_total": seats,
+        "seats_booked": 0,
+        "batch_status": "upcoming"
+    }).execute()
+
+    students = await supabase.table("students")\
+        .insert([{"rank": "benchmark"} for _ in range(clients)])\
+        .execute()
+
+    return batch.data[0]["batchid"], [s["studid"] for s in students.data]
+
+async def teardown(batch_id: str, student_ids: list):
+    supabase = get_supabase()
+    await supabase.table("bookings").delete().eq("batchid", batch_id).execute()
+    await supabase.table("batches").delete().eq("batchid", batch_id).execute()
+    await supabase.table("students").delete().in_("studid", student_ids).execute()
+
+async def reserve(batch_id: str, student_id: str, latencies: list, outcomes: dict):
+    started = time.perf_counter()
+    try:
+        await reserve_seat(student_id, batch_id, 1000.0)
+        outcomes["booked"] += 1
+    except HTTPException:
+        outcomes["rejected"] += 1
+    except Exception:
+        outcomes["errors"] += 1
+    latencies.append(time.perf_counter() - started)
+
+async def run(course_id: str, clients: int, seats: int):
+    instid = None
+    if course_id is None:
+        instid, course_id = await create_course()
+
+    batch_id, student_ids = await setup(course_id, clients, seats)
+    latencies = []
+    outcomes = {"booked": 0, "rejected": 0, "errors": 0}
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            reserve(batch_id, student_id, latencies, outcomes)
+            for student_id in student_ids
+        ])
+        elapsed = time.perf_counter() - started
+
+        supabase = get_supabase()
+        batch = await supabase.table("batches").select("seats_total, seats_booked").eq("batchid", batch_id).maybe_single().execute()
+        bookings = await supabase.table("bookings").select("bookid", count="exact").eq("batchid", batch_id).execute()
+    finally:
+        await teardown(batch_id, student_ids)
+        if instid:
+            supabase = get_supabase()
+            await supabase.table("courses").delete().eq("courseid", course_id).execute()
+            await supabase.table("institutes").delete().eq("instid", instid).execute()
+
+    latencies.sort()
+    expected = min(clients, seats)
+    oversold = (
+        outcomes["booked"] != expected
+        or bookings.count != expected
+        or batch.data["seats_booked"] != bookings.count
+        or bookings.count > batch.data["seats_total"]
+    )
+
+    return {
+        "clients": clients,
+        "seats": seats,
+        **outcomes,
+        "booking_rows": bookings.count,
+        "seats_booked": batch.data["seats_booked"],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(clients / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        "oversell_check": "FAIL" if oversold else "OK",
+    }
+
+async def main_async(args):
+    try:
+        return await run(args.course_id, args.clients, args.seats)
+    finally:
+        await close_supabase()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--course-id")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seats", type=int, default=40)
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    for key, value in result.items():
+        print(f"{key:>16}: {value}")
+
+    if result["oversell_check"] != "OK":
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Concurrent throughput benchmark for a single API worker.
+
+Start one worker (uvicorn main:app --workers 1) and fire concurrent requests
+at a route. Run it once on the synchronous client build and once on the
+async one to compare throughput per worker:
+
+    python benchmarks/concurrency_benchmark.py --url http://localhost:8000/courses
+    python benchmarks/concurrency_benchmark.py --url http://localhost:8000/batches --concurrency 100 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+async def worker(client: httpx.AsyncClient, url: str, headers: dict, remaining: list, latencies: list, errors: list):
+    while remaining:
+        remaining.pop()
+        started = time.perf_counter()
+        try:
+            response = await client.get(url, headers=headers)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - started)
+
+async def run(url: str, concurrency: int, total: int, token: str = None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies, errors = [], []
+    remaining = list(range(total))
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await client.get(url, headers=headers)
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            worker(client, url, headers, remaining, latencies, errors)
+            for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/courses")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--token", default=None, help="Bearer token for authenticated routes")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.concurrency, args.requests, args.token))
+    for key, value in result.items():
+        print(f"{key:>16}: {value}")
+
+if __name__ == "__main__":
+    main()
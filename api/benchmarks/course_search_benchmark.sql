@@ -0,0 +1,68 @@
+-- Course search latency benchmark over a large synthetic catalog.
+--
+-- Seeds :courses active courses (titles built from realistic maritime course
+-- words) and compares the legacy ilike '%term%' title filter with
+-- search_courses() for exact, multi-word and misspelled queries. Runs in one
+-- transaction that is rolled back:
+--
+--   psql "$DATABASE_URL" -f benchmarks/course_search_benchmark.sql
+
+\set courses 200000
+
+BEGIN;
+
+\echo 'Seeding synthetic catalog...'
+\timing on
+
+WITH inst AS (
+  INSERT INTO institutes (name, accreditation_no, valid_from, valid_to, contact_email, verified_status)
+  VALUES ('Benchmark Institute', 'BENCH-' || gen_random_uuid(), CURRENT_DATE, CURRENT_DATE + 365, 'bench@example.com', 'verified')
+  RETURNING instid
+),
+words AS (
+  SELECT
+    ARRAY['Basic', 'Advanced', 'Refresher', 'Proficiency', 'Elementary', 'Senior'] AS level,
+    ARRAY['Fire Fighting', 'First Aid', 'Survival Craft', 'Tanker Familiarisation',
+          'Ship Security', 'Radar Navigation', 'Medical Care', 'Bridge Resource Management',
+          'Engine Room Simulator', 'Personal Safety'] AS topic
+)
+INSERT INTO courses (instid, title, type, duration, mode, fees, description, status)
+SELECT
+  inst.instid,
+  level[1 + i % 6] || ' ' || topic[1 + (i / 6) % 10] || ' ' || i,
+  (ARRAY['STCW', 'Refresher', 'Technical', 'Other'])[1 + i % 4],
+  '5 days',
+  (ARRAY['offline', 'online', 'hybrid'])[1 + i % 3],
+  1000 + i % 5000,
+  'Course covering ' || lower(topic[1 + (i / 6) % 10]) || ' for seafarers',
+  'active'
+FROM generate_series(1, :courses) AS i, inst, words;
+
+ANALYZE courses, course_search_index;
+
+\echo ''
+\echo '--- Legacy: title ilike (exact word) ---'
+\o /dev/null
+SELECT * FROM courses WHERE status = 'active' AND title ILIKE '%fire fighting%' ORDER BY created_at DESC LIMIT 50;
+\o
+
+\echo '--- search_courses (exact word) ---'
+\o /dev/null
+SELECT * FROM search_courses('fire fighting', NULL, NULL, 50);
+\o
+
+\echo ''
+\echo '--- Legacy: title ilike (misspelled, expect 0 rows) ---'
+SELECT count(*) FROM (SELECT 1 FROM courses WHERE status = 'active' AND title ILIKE '%fire fihgting%' LIMIT 50) AS t;
+
+\echo '--- search_courses (misspelled, expect matches) ---'
+SELECT count(*) FROM search_courses('fire fihgting', NULL, NULL, 50);
+
+\echo ''
+\echo '--- search_courses (description-only term, filtered by type) ---'
+\o /dev/null
+SELECT * FROM search_courses('seafarers radar', 'STCW', NULL, 50);
+\o
+
+\timing off
+ROLLBACK;
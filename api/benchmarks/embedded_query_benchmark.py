@@ -0,0 +1,88 @@
+"""
+Before/after latency of institute-scoped reads.
+
+"before" is the old two round-trip pattern (fetch every courseid for the
+institute, then filter with in_()), "after" is the single embedded
+courses!inner(instid) query used by the routes now.
+
+    python benchmarks/embedded_query_benchmark.py --instid <institute uuid> --iterations 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_supabase, close_supabase
+from ownership import select_institute_rows
+
+async def two_round_trips(table: str, order_column: str, instid: str, limit: int):
+    supabase = get_supabase()
+
+    courses = await supabase.table("courses").select("courseid").eq("instid", instid).execute()
+    course_ids = [c["courseid"] for c in courses.data]
+    if not course_ids:
+        return []
+
+    response = await supabase.table(table)\
+        .select("*")\
+        .in_("courseid", course_ids)\
+        .order(order_column, desc=True)\
+        .limit(limit)\
+        .execute()
+    return response.data
+
+async def embedded(table: str, order_column: str, instid: str, limit: int):
+    response = await select_institute_rows(table, instid)\
+        .order(order_column, desc=True)\
+        .limit(limit)\
+        .execute()
+    return response.data
+
+async def measure(fn, iterations: int, *args) -> dict:
+    await fn(*args)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        rows = await fn(*args)
+        samples.append(time.perf_counter() - started)
+
+    samples.sort()
+    return {
+        "rows": len(rows),
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 2),
+    }
+
+async def run(instid: str, iterations: int, limit: int):
+    results = {}
+    for table, order_column in (("batches", "start_date"), ("certificates", "issue_date")):
+        results[table] = {
+            "before": await measure(two_round_trips, iterations, table, order_column, instid, limit),
+            "after": await measure(embedded, iterations, table, order_column, instid, limit),
+        }
+    return results
+
+async def main_async(args):
+    try:
+        return await run(args.instid, args.iterations, args.limit)
+    finally:
+        await close_supabase()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instid", required=True)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    for table, result in results.items():
+        for label, stats in result.items():
+            print(f"{table:>13} {label:>6}: rows={stats['rows']} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+Scenario-driven load benchmark for the API.
+
+Drives the app through realistic traffic mixes and reports throughput,
+p50/p95/p99 latency and database round-trips per route:
+
+    catalog       anonymous browsing of /courses and /batches
+    booking_rush  every student books the same small batch at once
+    my_bookings   logged-in students polling /bookings/my-bookings
+    admin_stats   admins loading the /admin/stats dashboard
+    relogin       students renewing an expired access token by signing in again
+    token_refresh the same renewal with each student's refresh token (one each)
+    batch_launch  a few students polling one batch far faster than everyone else
+
+By default the app is driven in-process over ASGI on the in-memory backend,
+so it needs no server or Supabase project (MEMORY_LATENCY_MS still applies):
+
+    MEMORY_LATENCY_MS=2 python benchmarks/load_benchmark.py --save benchmarks/baselines/memory.json
+    MEMORY_LATENCY_MS=2 python benchmarks/load_benchmark.py --baseline benchmarks/baselines/memory.json
+
+With --url it drives a running server over HTTP instead. It creates its
+fixture (institute, courses, batches, students) through the public API and
+needs an existing admin account, so point it at a staging project. Each
+student sends its own X-Forwarded-For, so run the server with
+RATE_LIMIT_TRUST_PROXY=true or all students share one per-IP rate limit:
+
+    python benchmarks/load_benchmark.py --url http://localhost:8000 --admin-email a@x.com --admin-password ...
+
+Database round-trips per request are read from the Server-Timing header.
+--baseline compares against a saved run and exits non-zero when a scenario's
+p95 or throughput regresses by more than --tolerance, or a route makes more
+database round-trips than before.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+PASSWORD = "benchmark-password"
+SCENARIOS = ("catalog", "booking_rush", "my_bookings", "admin_stats", "relogin", "token_refresh", "batch_launch")
+# Scenarios whose requests can only succeed once, so they are not warmed up
+ONE_SHOT = ("booking_rush", "token_refresh")
+DB_CALLS = re.compile(r'db;[^,]*desc="(\d+) calls"')
+
+def percentile(samples: list, fraction: float) -> float:
+    return round(samples[max(int(len(samples) * fraction) - 1, 0)] * 1000, 2)
+
+def summarize(latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Target:
+    """An httpx client on the app, in-process or over HTTP."""
+
+    def __init__(self, url: str = None):
+        self.url = url
+        self.memory = None
+
+        if url:
+            self.client = httpx.AsyncClient(base_url=url, timeout=60)
+            return
+
+        os.environ["DATABASE_BACKEND"] = "memory"
+        os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+        # Every ASGI request comes from one address; each student sends its own X-Forwarded-For
+        os.environ.setdefault("RATE_LIMIT_TRUST_PROXY", "true")
+        from main import app
+        from database import get_supabase
+
+        self.memory = get_supabase().client
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://benchmark",
+            timeout=60
+        )
+
+    @property
+    def backend(self) -> str:
+        return "memory" if self.memory else self.url
+
+    async def aclose(self):
+        await self.client.aclose()
+
+def check(response: httpx.Response, expected: int) -> dict:
+    if response.status_code != expected:
+        raise RuntimeError(f"{response.request.method} {response.request.url} -> {response.status_code}: {response.text}")
+    return response.json()
+
+async def login(target: Target, email: str) -> dict:
+    return check(await target.client.post("/auth/login", json={"email": email, "password": PASSWORD}), 200)
+
+def auth_headers(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+async def build_fixture(target: Target, args) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    today = date.today()
+
+    if target.memory:
+        admin_email = f"admin-{run_id}@example.com"
+        admin = target.memory.auth.add_user(admin_email, PASSWORD)
+        target.memory.seed("users", [{
+            "userid": admin["id"], "email": admin_email, "full_name": "Benchmark Admin", "role": "admin"
+        }])
+        admin_headers = auth_headers(await login(target, admin_email))
+    else:
+        body = check(await target.client.post(
+            "/auth/login", json={"email": args.admin_email, "password": args.admin_password}
+        ), 200)
+        admin_headers = auth_headers(body)
+
+    institute_email = f"institute-{run_id}@example.com"
+    institute = check(await target.client.post("/auth/signup/institute", json={
+        "email": institute_email,
+        "password": PASSWORD,
+        "full_name": "Benchmark Institute",
+        "institute_name": f"Benchmark Institute {run_id}",
+        "accreditation_no": f"BENCH-{run_id}",
+        "valid_from": today.isoformat(),
+        "valid_to": (today + timedelta(days=365)).isoformat(),
+        "contact_phone": "0000000000"
+    }), 201)
+    check(await target.client.put(
+        f"/admin/institutes/{institute['instid']}/verify",
+        params={"verified_status": "verified"},
+        headers=admin_headers
+    ), 200)
+    institute_headers = auth_headers(await login(target, institute_email))
+
+    course_ids, batch_ids = [], []
+    for i in range(args.courses):
+        course = check(await target.client.post("/courses/", headers=institute_headers, json={
+            "title": f"{random.choice(['Basic', 'Advanced', 'Refresher'])} Fire Fighting {i}",
+            "type": "STCW",
+            "duration": "5 days",
+            "mode": random.choice(["offline", "online", "hybrid"]),
+            "fees": 1000 + i
+        }), 201)
+        course_ids.append(course["courseid"])
+
+        batch = check(await target.client.post("/batches/", headers=institute_headers, json={
+            "courseid": course["courseid"],
+            "batch_name": f"Batch {i}",
+            "start_date": (today + timedelta(days=30)).isoformat(),
+            "end_date": (today + timedelta(days=35)).isoformat(),
+            "seats_total": args.students
+        }), 201)
+        batch_ids.append(batch["batchid"])
+
+    rush_batch = check(await target.client.post("/batches/", headers=institute_headers, json={
+        "courseid": course_ids[0],
+        "batch_name": "Booking rush",
+        "start_date": (today + timedelta(days=30)).isoformat(),
+        "end_date": (today + timedelta(days=35)).isoformat(),
+        "seats_total": args.rush_seats
+    }), 201)
+
+    student_emails, student_headers, refresh_tokens = [], [], []
+    for i in range(args.students):
+        email = f"student-{run_id}-{i}@example.com"
+        check(await target.client.post("/auth/signup/student", json={
+            "email": email,
+            "password": PASSWORD,
+            "full_name": f"Benchmark Student {i}",
+            "date_of_birth": "1990-01-01",
+            "phone": "0000000000"
+        }), 201)
+        tokens = await login(target, email)
+        headers = {**auth_headers(tokens), "X-Forwarded-For": f"10.0.{i // 256}.{i % 256}"}
+        student_emails.append(email)
+        student_headers.append(headers)
+        refresh_tokens.append(tokens["refresh_token"])
+
+        for batch_id in random.sample(batch_ids, min(args.bookings_per_student, len(batch_ids))):
+            check(await target.client.post(
+                "/bookings/", headers=headers, json={"batchid": batch_id, "amount": 1000}
+            ), 201)
+
+    return {
+        "admin": admin_headers,
+        "students": student_headers,
+        "student_emails": student_emails,
+        "refresh_tokens": refresh_tokens,
+        "course_ids": course_ids,
+        "batch_ids": batch_ids,
+        "rush_batch_id": rush_batch["batchid"],
+    }
+
+def scenario_requests(name: str, fixture: dict, total: int) -> list:
+    """(route, method, path, kwargs, accepted statuses) for each request of a scenario."""
+    if name == "catalog":
+        routes = [
+            ("GET /courses", lambda: ("/courses/", {})),
+            ("GET /courses?mode", lambda: ("/courses/", {"params": {"mode": random.choice(["online", "offline"])}})),
+            ("GET /courses/{id}", lambda: (f"/courses/{random.choice(fixture['course_ids'])}", {})),
+            ("GET /batches", lambda: ("/batches/", {})),
+            ("GET /batches?course_id", lambda: ("/batches/", {"params": {"course_id": random.choice(fixture["course_ids"])}})),
+        ]
+        requests = []
+        for i in range(total):
+            route, build = routes[i % len(routes)]
+            path, kwargs = build()
+            requests.append((route, "GET", path, kwargs, {200}))
+        return requests
+
+    if name == "booking_rush":
+        return [
+            ("POST /bookings", "POST", "/bookings/",
+             {"headers": headers, "json": {"batchid": fixture["rush_batch_id"], "amount": 1000}}, {201, 400})
+            for headers in fixture["students"]
+        ]
+
+    if name == "my_bookings":
+        return [
+            ("GET /bookings/my-bookings", "GET", "/bookings/my-bookings",
+             {"headers": fixture["students"][i % len(fixture["students"])]}, {200})
+            for i in range(total)
+        ]
+
+    if name == "batch_launch":
+        # Three of every four requests come from five hot clients; 429s are expected for them
+        hot, others = fixture["students"][:5], fixture["students"][5:]
+        path = f"/batches/{fixture['rush_batch_id']}"
+        requests = []
+        for i in range(total):
+            if i % 4:
+                requests.append(("GET /batches/{id} hot", "GET", path, {"headers": hot[i % len(hot)]}, {200, 429}))
+            else:
+                requests.append(("GET /batches/{id}", "GET", path, {"headers": others[i % len(others)]}, {200}))
+        return requests
+
+    if name == "relogin":
+        return [
+            ("POST /auth/login", "POST", "/auth/login",
+             {"json": {"email": fixture["student_emails"][i % len(fixture["student_emails"])], "password": PASSWORD}}, {200})
+            for i in range(total)
+        ]
+
+    if name == "token_refresh":
+        return [
+            ("POST /auth/refresh", "POST", "/auth/refresh", {"json": {"refresh_token": token}}, {200})
+            for token in fixture["refresh_tokens"]
+        ]
+
+    return [
+        ("GET /admin/stats", "GET", "/admin/stats", {"headers": fixture["admin"]}, {200})
+        for _ in range(total)
+    ]
+
+def db_calls(response: httpx.Response) -> int:
+    match = DB_CALLS.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+async def drive(target: Target, requests: list, concurrency: int) -> dict:
+    latencies = {}
+    round_trips = {}
+    errors = []
+    queue = list(reversed(requests))
+
+    async def worker():
+        while queue:
+            route, method, path, kwargs, accepted = queue.pop()
+            started = time.perf_counter()
+            try:
+                response = await target.client.request(method, path, **kwargs)
+                if response.status_code not in accepted:
+                    errors.append(f"{route}: {response.status_code}")
+                calls = db_calls(response)
+                if calls is not None:
+                    round_trips.setdefault(route, []).append(calls)
+            except httpx.HTTPError as e:
+                errors.append(f"{route}: {type(e).__name__}")
+            latencies.setdefault(route, []).append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    every = [sample for samples in latencies.values() for sample in samples]
+    routes = {route: summarize(samples) for route, samples in latencies.items()}
+    for route, calls in round_trips.items():
+        routes[route]["db_round_trips"] = round(statistics.mean(calls), 2)
+
+    return {
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(every) / elapsed, 1),
+        **summarize(every),
+        "routes": routes,
+    }
+
+async def run(args) -> dict:
+    target = Target(args.url)
+    try:
+        fixture = await build_fixture(target, args)
+        scenarios = {}
+
+        for name in args.scenarios:
+            requests = scenario_requests(name, fixture, args.requests)
+            if name not in ONE_SHOT:
+                # Warm connections and caches the way steady-state traffic would
+                await drive(target, requests[:args.concurrency], args.concurrency)
+
+            scenarios[name] = await drive(target, requests, args.concurrency)
+
+        return {
+            "commit": git_commit(),
+            "backend": target.backend,
+            "memory_latency_ms": os.environ.get("MEMORY_LATENCY_MS", "0") if target.memory else None,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "scenarios": scenarios,
+        }
+    finally:
+        await target.aclose()
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, current in result["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if not previous:
+            continue
+
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps")
+
+        for route, stats in current["routes"].items():
+            before = previous["routes"].get(route, {}).get("db_round_trips")
+            after = stats.get("db_round_trips")
+            if before is not None and after is not None and after - before >= 0.5:
+                regressions.append(f"{name} {route}: db round-trips {before} -> {after}")
+    return regressions
+
+def print_result(result: dict):
+    print(f"commit={result['commit']} backend={result['backend']} concurrency={result['concurrency']}")
+    for name, scenario in result["scenarios"].items():
+        print(
+            f"\n{name}: {scenario['throughput_rps']} rps, p50={scenario['p50_ms']}ms "
+            f"p95={scenario['p95_ms']}ms p99={scenario['p99_ms']}ms errors={scenario['errors']}"
+        )
+        for sample in scenario["error_samples"]:
+            print(f"  ! {sample}")
+        for route, stats in scenario["routes"].items():
+            trips = stats.get("db_round_trips", "-")
+            print(
+                f"  {route:<28} n={stats['requests']:<5} p50={stats['p50_ms']}ms "
+                f"p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms db={trips}"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Drive a running server instead of the app in-process")
+    parser.add_argument("--admin-email", default=None)
+    parser.add_argument("--admin-password", default=None)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--bookings-per-student", type=int, default=3)
+    parser.add_argument("--rush-seats", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", default=None, help="Write the result as a JSON baseline")
+    parser.add_argument("--baseline", default=None, help="Compare against a saved JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.url and not (args.admin_email and args.admin_password):
+        parser.error("--url needs --admin-email and --admin-password")
+
+    random.seed(args.seed)
+    result = asyncio.run(run(args))
+    print_result(result)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+if __name__ == "__main__":
+    main()
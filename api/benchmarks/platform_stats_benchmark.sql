@@ -0,0 +1,112 @@
+-- Platform statistics benchmark at 1M bookings.
+--
+-- Compares the legacy dashboard queries (seven counts plus pulling every
+-- completed booking for revenue) with the incremental counters, and checks
+-- that the counters match a full rebuild. It then makes :single_writes
+-- single-row booking inserts, each bumping the counters on its own, and fails
+-- unless the counters moved by exactly that much and still match a rebuild. Everything runs in one transaction
+-- that is rolled back, so it is safe against a development database:
+--
+--   psql "$DATABASE_URL" -f benchmarks/platform_stats_benchmark.sql
+
+\set bookings 1000000
+\set students 20000
+\set batches 200
+\set single_writes 2000
+
+BEGIN;
+
+\echo 'Seeding synthetic institute, course, batches, students and bookings...'
+\timing on
+
+WITH inst AS (
+  INSERT INTO institutes (name, accreditation_no, valid_from, valid_to, contact_email, verified_status)
+  VALUES ('Benchmark Institute', 'BENCH-' || gen_random_uuid(), CURRENT_DATE, CURRENT_DATE + 365, 'bench@example.com', 'verified')
+  RETURNING instid
+)
+INSERT INTO courses (instid, title, type, duration, mode, fees, status)
+SELECT instid, 'Benchmark Course', 'STCW', '5 days', 'offline', 1000, 'active' FROM inst;
+
+INSERT INTO batches (courseid, batch_name, seats_total, seats_booked, start_date, end_date)
+SELECT (SELECT courseid FROM courses WHERE title = 'Benchmark Course' LIMIT 1),
+       'Benchmark Batch ' || i, 100000, 0, CURRENT_DATE + 30, CURRENT_DATE + 35
+FROM generate_series(1, :batches) AS i;
+
+CREATE TEMP TABLE bench_students ON COMMIT DROP AS
+WITH ins AS (
+  INSERT INTO students (rank)
+  SELECT 'benchmark' FROM generate_series(1, :students)
+  RETURNING studid
+)
+SELECT row_number() OVER () AS n, studid FROM ins;
+
+CREATE TEMP TABLE bench_batches ON COMMIT DROP AS
+SELECT row_number() OVER () AS n, batchid FROM batches WHERE batch_name LIKE 'Benchmark Batch %';
+
+INSERT INTO bookings (studid, batchid, amount, confirmation_number, payment_status)
+SELECT s.studid, b.batchid, 500 + (i % 500),
+       'BENCH' || i,
+       CASE WHEN i % 4 = 0 THEN 'pending' ELSE 'completed' END
+FROM generate_series(1, :bookings) AS i
+JOIN bench_students s ON s.n = 1 + (i % :students)
+JOIN bench_batches b ON b.n = 1 + (i % :batches);
+
+ANALYZE institutes, students, courses, bookings, platform_stat_counters;
+
+\echo ''
+\echo '--- Legacy dashboard: seven queries + completed booking rows ---'
+SELECT count(instid) FROM institutes;
+SELECT count(instid) FROM institutes WHERE verified_status = 'verified';
+SELECT count(studid) FROM students;
+SELECT count(courseid) FROM courses;
+SELECT count(courseid) FROM courses WHERE status = 'active';
+SELECT count(bookid) FROM bookings;
+\o /dev/null
+SELECT bookid, amount FROM bookings WHERE payment_status = 'completed';
+\o
+
+\echo ''
+\echo '--- Incremental counters: one read ---'
+SELECT get_platform_stats();
+
+\echo ''
+\echo '--- Reconcile (expect before = after) ---'
+SELECT (r->'before')::text = (r->'after')::text AS counters_match, r
+FROM (SELECT rebuild_platform_stats() AS r) AS t;
+
+\echo ''
+\echo '--- Exact counters after :single_writes single-row writes ---'
+SELECT set_config('bench.single_writes', :'single_writes', true);
+SELECT rebuild_platform_stats() IS NOT NULL AS rebuilt;
+
+DO $$
+DECLARE
+  v_writes int := current_setting('bench.single_writes')::int;
+  v_before json := get_platform_stats();
+  v_after json;
+  v_rebuild json;
+  v_studid uuid := (SELECT studid FROM bench_students WHERE n = 1);
+  v_batchid uuid := (SELECT batchid FROM bench_batches WHERE n = 1);
+BEGIN
+  FOR i IN 1..v_writes LOOP
+    INSERT INTO bookings (studid, batchid, amount, confirmation_number, payment_status)
+    VALUES (v_studid, v_batchid, 10, 'BENCH-SINGLE-' || i, 'completed');
+  END LOOP;
+
+  v_after := get_platform_stats();
+  IF (v_after->>'total_bookings')::bigint <> (v_before->>'total_bookings')::bigint + v_writes
+     OR (v_after->>'total_revenue')::numeric <> (v_before->>'total_revenue')::numeric + 10 * v_writes THEN
+    RAISE EXCEPTION 'Counters drifted: before %, after % for % writes', v_before, v_after, v_writes;
+  END IF;
+
+  v_rebuild := rebuild_platform_stats();
+  IF (v_rebuild->'before')::text <> (v_rebuild->'after')::text THEN
+    RAISE EXCEPTION 'Counters do not match a rebuild: %', v_rebuild;
+  END IF;
+
+  RAISE NOTICE 'Counters exact after % single-row writes', v_writes;
+END;
+$$;
+
+\timing off
+ROLLBACK;
@@ -0,0 +1,127 @@
+"""
+Response serialization microbenchmark on large list responses.
+
+Encodes N synthetic database rows (10k by default) for BookingResponse and
+CourseResponse three ways:
+
+    fastapi   response_model validation + jsonable output + stdlib JSONResponse
+              (what list endpoints do by default)
+    orjson    the same validation, rendered with ORJSONResponse
+    trusted   the FAST_RESPONSES path: precompiled per-schema field projection
+              of trusted rows straight to orjson, no model construction
+
+The rows are shaped as PostgREST returns them (timestamps with a +00:00
+offset, whole-number numerics as ints), and the run fails unless all three
+produce identical bodies.
+
+    python benchmarks/serialization_benchmark.py --rows 10000 --iterations 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from schemas import BookingResponse, CourseResponse
+from serialization import get_serializer
+
+def booking_rows(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [{
+        "bookid": str(uuid.uuid4()),
+        "studid": str(uuid.uuid4()),
+        "batchid": str(uuid.uuid4()),
+        "confirmation_number": f"BK{i:012d}",
+        "amount": 1500 + i % 500 if i % 2 else 1500.5 + i % 500,
+        "payment_status": "completed" if i % 3 else "pending",
+        "attendance_status": "not_started",
+        "booking_date": (now - timedelta(minutes=i)).isoformat(),
+        "created_at": (now - timedelta(minutes=i)).isoformat(),
+    } for i in range(count)]
+
+def course_rows(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [{
+        "courseid": str(uuid.uuid4()),
+        "instid": str(uuid.uuid4()),
+        "title": f"Advanced Fire Fighting {i}",
+        "type": "STCW",
+        "duration": "5 days",
+        "mode": "offline",
+        "fees": 12000 + i,
+        "description": "Course covering fire prevention and fire fighting for seafarers",
+        "validity_months": 60,
+        "accreditation_ref": f"DGS/{i}",
+        "status": "active",
+        "master_course_id": str(uuid.uuid4()),
+        "created_at": (now - timedelta(minutes=i)).isoformat(),
+    } for i in range(count)]
+
+async def fastapi_default(model, rows) -> bytes:
+    field = create_model_field("Response", List[model], mode="serialization")
+    content = await serialize_response(field=field, response_content=rows)
+    return JSONResponse(content).body
+
+async def validated_orjson(model, rows) -> bytes:
+    field = create_model_field("Response", List[model], mode="serialization")
+    content = await serialize_response(field=field, response_content=rows)
+    return ORJSONResponse(content).body
+
+async def trusted(model, rows) -> bytes:
+    return get_serializer(List[model]).dumps(rows)
+
+MODES = (("fastapi", fastapi_default), ("orjson", validated_orjson), ("trusted", trusted))
+
+async def measure(fn, model, rows, iterations: int) -> dict:
+    body = await fn(model, rows)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await fn(model, rows)
+        samples.append(time.perf_counter() - started)
+
+    return {
+        "bytes": len(body),
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+    }
+
+async def run(rows: int, iterations: int) -> dict:
+    results = {}
+    for model, build in ((BookingResponse, booking_rows), (CourseResponse, course_rows)):
+        data = build(rows)
+        bodies = {name: await fn(model, data) for name, fn in MODES}
+        if len(set(bodies.values())) != 1:
+            raise RuntimeError(f"{model.__name__}: bodies differ between {', '.join(bodies)}")
+        results[model.__name__] = {
+            name: await measure(fn, model, data, iterations)
+            for name, fn in MODES
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.iterations))
+    for model, modes in results.items():
+        baseline = modes["fastapi"]["median_ms"]
+        for name, stats in modes.items():
+            print(
+                f"{model:>16} {name:>8}: median={stats['median_ms']}ms min={stats['min_ms']}ms "
+                f"bytes={stats['bytes']} speedup={baseline / stats['median_ms']:.1f}x"
+            )
+
+if __name__ == "__main__":
+    main()
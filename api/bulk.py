@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+from postgrest.exceptions import APIError
+from config import settings
+from database import get_supabase
+
+# Keeps in.(...) filters well inside PostgREST's request URL limit
+IN_FILTER_CHUNK_SIZE = 200
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+async def select_in(
+    build_query: Callable[[], Any],
+    column: str,
+    values: Sequence,
+    chunk_size: int = IN_FILTER_CHUNK_SIZE
+) -> List[dict]:
+    """Rows where column is in values, as one in() query per chunk."""
+    values = list(dict.fromkeys(values))
+    if not values:
+        return []
+
+    responses = await asyncio.gather(*[
+        build_query().in_(column, list(chunk)).execute()
+        for chunk in chunked(values, chunk_size)
+    ])
+    return [row for response in responses for row in response.data]
+
+async def update_in(
+    table: str,
+    changes: dict,
+    column: str,
+    values: Sequence,
+    chunk_size: int = IN_FILTER_CHUNK_SIZE,
+    filters: Optional[dict] = None
+) -> List[dict]:
+    """Updated rows, as one UPDATE ... WHERE column in (...) per chunk."""
+    supabase = get_supabase()
+
+    def build_query():
+        query = supabase.table(table).update(changes)
+        for filter_column, value in (filters or {}).items():
+            query = query.eq(filter_column, value)
+        return query
+
+    return await select_in(build_query, column, values, chunk_size)
+
+async def insert_chunked(
+    table: str,
+    rows: List[dict],
+    chunk_size: int = None
+) -> List[Tuple[Sequence[dict], List[dict], Optional[APIError]]]:
+    """
+    Multi-row inserts of at most chunk_size rows. Returns (requested rows,
+    inserted rows, error) per chunk. A chunk that fails is retried one row at
+    a time, so one bad row does not fail the rows around it; each retried row
+    then gets its own entry.
+    """
+    supabase = get_supabase()
+    results = []
+
+    for chunk in chunked(rows, chunk_size or settings.bulk_insert_chunk_size):
+        try:
+            response = await supabase.table(table).insert(list(chunk)).execute()
+            results.append((chunk, response.data, None))
+            continue
+        except APIError as e:
+            if len(chunk) == 1:
+                results.append((chunk, [], e))
+                continue
+
+        for row in chunk:
+            try:
+                response = await supabase.table(table).insert(row).execute()
+                results.append(([row], response.data, None))
+            except APIError as e:
+                results.append(([row], [], e))
+
+    return results
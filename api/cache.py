@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after a TTL. With evict_live=False, entries
+    are never dropped before they expire: past maxsize the expired ones are
+    purged and the cache grows if they were all still live.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, evict_live: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evict_live = evict_live
+        self._purge_at = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        if not self.evict_live:
+            if len(self._entries) > self._purge_at:
+                self.purge_expired()
+                # Purge again only once the live set has doubled, keeping sets O(1) amortised
+                self._purge_at = max(self.maxsize, 2 * len(self._entries))
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def purge_expired(self):
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,106 @@
+"""
+Certificate renewal reminders.
+
+The sweep pages through valid certificates expiring within the next N days
+(CERTIFICATE_RENEWAL_WINDOW_DAYS by default) in (expiry_date, certid) keyset
+order, one EXPORT_PAGE_SIZE page at a time. For each page it writes one
+in_app notification per certificate with multi-row inserts, then stamps
+renewal_reminder_sent_at on the page's certificates. Memory use is bounded by
+the page size. Stamped certificates drop out of the sweep's partial index, so
+an interrupted sweep is resumed by running it again. At most the page that was
+in flight is notified twice.
+
+    python certificate_renewals.py sweep [days]
+    python certificate_renewals.py dry-run [days]
+"""
+import asyncio
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from postgrest.types import CountMethod
+from bulk import insert_chunked, update_in
+from config import settings
+from database import get_supabase, close_supabase
+from exports import iter_rows
+from jobs import job
+
+def _due_for_reminder(days: int, today: Optional[date] = None):
+    supabase = get_supabase()
+    today = today or date.today()
+
+    def build_query(columns: str = "certid, cert_number, expiry_date, students(userid)", **kwargs):
+        return supabase.table("certificates")\
+            .select(columns, **kwargs)\
+            .eq("status", "valid")\
+            .is_("renewal_reminder_sent_at", "null")\
+            .gte("expiry_date", today.isoformat())\
+            .lte("expiry_date", (today + timedelta(days=days)).isoformat())
+
+    return build_query
+
+async def sweep_renewal_reminders(
+    days: int = None,
+    dry_run: bool = False,
+    today: Optional[date] = None,
+    page_size: int = None
+) -> dict:
+    days = settings.certificate_renewal_window_days if days is None else days
+    build_query = _due_for_reminder(days, today)
+    started = time.perf_counter()
+
+    if dry_run:
+        response = await build_query("certid", count=CountMethod.exact).limit(1).execute()
+        return {"days": days, "dry_run": True, "due": response.count or 0}
+
+    notified = pages = 0
+
+    async for rows in iter_rows(build_query, "expiry_date", "certid", desc=False, page_size=page_size):
+        pages += 1
+        notifications = [
+            {
+                "user_id": row["students"]["userid"],
+                "type": "in_app",
+                "title": "Certificate expiring soon",
+                "message": f"Certificate {row['cert_number']} expires on {row['expiry_date']}. Book a renewal course.",
+                "link": f"/certificates/{row['certid']}"
+            }
+            for row in rows if (row.get("students") or {}).get("userid")
+        ]
+
+        for _, _, error in await insert_chunked("notifications", notifications):
+            if error:
+                raise error
+
+        await update_in(
+            "certificates",
+            {"renewal_reminder_sent_at": datetime.now(timezone.utc).isoformat()},
+            "certid", [row["certid"] for row in rows]
+        )
+        notified += len(notifications)
+
+    return {
+        "days": days,
+        "dry_run": False,
+        "pages": pages,
+        "notified": notified,
+        "seconds": round(time.perf_counter() - started, 4)
+    }
+
+@job("certificate_renewal_sweep")
+async def renewal_sweep_job(days: int = None):
+    await sweep_renewal_reminders(days)
+
+async def _run(dry_run: bool, days: Optional[int]) -> dict:
+    try:
+        return await sweep_renewal_reminders(days, dry_run)
+    finally:
+        await close_supabase()
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "dry-run"
+    if command not in ("sweep", "dry-run") or len(sys.argv) > 3:
+        sys.exit("usage: python certificate_renewals.py [sweep|dry-run] [days]")
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    print(json.dumps(asyncio.run(_run(command == "dry-run", days)), indent=2))
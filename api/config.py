@@ -1,15 +1,70 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict
 
 class Settings(BaseSettings):
-    supabase_url: str
-    supabase_service_key: str
-    supabase_anon_key: str
+    database_backend: str = "supabase"
+    supabase_url: str = ""
+    supabase_service_key: str = ""
+    supabase_anon_key: str = ""
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 30
+    session_purge_interval_seconds: float = 3600.0
+    token_cache_size: int = 10000
+    token_cache_max_ttl_seconds: float = 900.0
+    revoked_token_cache_size: int = 100000
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: float = 60.0
+    catalog_cache_size: int = 2000
+    catalog_cache_ttl_seconds: float = 30.0
+    catalog_cache_max_age: int = 30
+    export_page_size: int = 1000
+    bulk_insert_chunk_size: int = 500
+    student_import_batch_size: int = 100
+    student_import_concurrency: int = 10
+    student_import_max_rows: int = 10000
+    certificate_renewal_window_days: int = 30
+    institute_expiry_interval_seconds: float = 3600.0
+    batch_lifecycle_interval_seconds: float = 3600.0
+    batch_lifecycle_dry_run: bool = False
+    jobs_workers: int = 4
+    jobs_queue_size: int = 10000
+    jobs_max_attempts: int = 5
+    jobs_retry_backoff_seconds: float = 0.5
+    jobs_persist: bool = False
+    jobs_poll_interval_seconds: float = 30.0
+    jobs_claim_timeout_seconds: float = 600.0
+    dgshipping_regulator: str = "local"
+    dgshipping_workers: int = 4
+    dgshipping_batch_size: int = 100
+    dgshipping_max_pending_batches: int = 1000
+    dgshipping_max_attempts: int = 5
+    dgshipping_retry_backoff_seconds: float = 1.0
+    dgshipping_submission_ttl_seconds: float = 86400.0
+    dgshipping_local_latency_ms: float = 0.0
+    dgshipping_local_failure_rate: float = 0.0
+    rate_limit_enabled: bool = True
+    rate_limits: Dict[str, Dict[str, str]] = {}
+    rate_limit_backend: str = "local"
+    rate_limit_store_size: int = 100000
+    rate_limit_local_latency_ms: float = 0.0
+    rate_limit_trust_proxy: bool = False
+    admission_max_in_flight: int = 500
+    admission_max_db_latency_ms: float = 1000.0
+    admission_retry_after_seconds: float = 1.0
+    fast_responses: bool = False
     cors_origins: str = "http://localhost:5173"
     environment: str = "development"
+    db_timeout_seconds: float = 10.0
+    db_pool_max_connections: int = 100
+    db_pool_max_keepalive: int = 20
+    db_pool_keepalive_expiry: float = 30.0
+    memory_latency_ms: float = 0.0
+    memory_latency_jitter_ms: float = 0.0
+    memory_auth_latency_ms: float = 0.0
+    memory_seed_file: str = ""
 
     class Config:
         env_file = ".env"
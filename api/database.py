@@ -1,7 +1,176 @@
-from supabase import create_client, Client
+import inspect
+import time
+from typing import Any, Dict, Optional, Union
+from httpx import Limits, Timeout
+from postgrest import AsyncPostgrestClient
+from postgrest.utils import AsyncClient as PostgrestSession
+from supabase import AsyncClient, AsyncClientOptions
 from config import settings
+from metrics import record_db_call
 
-supabase: Client = create_client(settings.supabase_url, settings.supabase_service_key)
+_pool_limits = Limits(
+    max_connections=settings.db_pool_max_connections,
+    max_keepalive_connections=settings.db_pool_max_keepalive,
+    keepalive_expiry=settings.db_pool_keepalive_expiry,
+)
 
-def get_supabase() -> Client:
+class PooledPostgrestClient(AsyncPostgrestClient):
+    def create_session(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: Union[int, float, Timeout],
+        verify: bool = True,
+        proxy: Optional[str] = None,
+    ) -> PostgrestSession:
+        return PostgrestSession(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=_pool_limits,
+        )
+
+class PooledAsyncClient(AsyncClient):
+    def _init_postgrest_client(
+        self,
+        rest_url: str,
+        headers: Dict[str, str],
+        schema: str,
+        timeout: Union[int, float, Timeout] = settings.db_timeout_seconds,
+        verify: bool = True,
+        proxy: Optional[str] = None,
+    ) -> AsyncPostgrestClient:
+        return PooledPostgrestClient(
+            rest_url,
+            headers=headers,
+            schema=schema,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+        )
+
+    def _listen_to_auth_events(self, event, session):
+        # Sign-ins performed on behalf of end users must not swap the service
+        # role credentials (and the pooled session) used for table access.
+        pass
+
+QUERY_OPERATIONS = {"select", "insert", "upsert", "update", "delete"}
+
+def _row_count(data: Any) -> int:
+    if isinstance(data, list):
+        return len(data)
+    return 1 if data else 0
+
+class InstrumentedQuery:
+    """Forwards to a query builder and records every execute() it makes."""
+
+    def __init__(self, builder: Any, table: str, operation: str):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        operation = name if name in QUERY_OPERATIONS else self._operation
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return InstrumentedQuery(result, self._table, operation)
+            return result
+        return call
+
+    async def execute(self):
+        started = time.perf_counter()
+        try:
+            response = await self._builder.execute()
+        except Exception:
+            record_db_call(self._table, self._operation, time.perf_counter() - started, 0, failed=True)
+            raise
+        rows = _row_count(response.data) if response is not None else 0
+        record_db_call(self._table, self._operation, time.perf_counter() - started, rows)
+        return response
+
+class InstrumentedAuth:
+    def __init__(self, auth: Any):
+        self._auth = auth
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._auth, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await attr(*args, **kwargs)
+            except Exception:
+                record_db_call("auth", name, time.perf_counter() - started, 0, failed=True)
+                raise
+            record_db_call("auth", name, time.perf_counter() - started, 1)
+            return result
+        return call
+
+class InstrumentedClient:
+    """
+    Wraps the Supabase (or in-memory) client so every table query, RPC and
+    auth call is recorded in metrics against the route that made it.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.auth = InstrumentedAuth(client.auth)
+
+    def table(self, name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self.client.table(name), name, "select")
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> InstrumentedQuery:
+        return InstrumentedQuery(self.client.rpc(fn, params or {}), fn, "rpc")
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+supabase: Optional[InstrumentedClient] = None
+
+def _memory_client():
+    from memory_backend import MemoryClient
+
+    client = MemoryClient(
+        latency_ms=settings.memory_latency_ms,
+        jitter_ms=settings.memory_latency_jitter_ms,
+        auth_latency_ms=settings.memory_auth_latency_ms,
+    )
+    if settings.memory_seed_file:
+        client.load_seed_file(settings.memory_seed_file)
+    return client
+
+def get_supabase() -> InstrumentedClient:
+    global supabase
+    if supabase is None and settings.database_backend == "memory":
+        supabase = InstrumentedClient(_memory_client())
+    elif supabase is None:
+        supabase = InstrumentedClient(PooledAsyncClient(
+            settings.supabase_url,
+            settings.supabase_service_key,
+            AsyncClientOptions(
+                auto_refresh_token=False,
+                persist_session=False,
+                postgrest_client_timeout=settings.db_timeout_seconds,
+            ),
+        ))
     return supabase
+
+async def close_supabase():
+    global supabase
+    if supabase is not None and isinstance(supabase.client, PooledAsyncClient):
+        await supabase.client.postgrest.aclose()
+    supabase = None
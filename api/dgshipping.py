@@ -0,0 +1,192 @@
+"""
+DGShipping submission queue.
+
+Certificates marked as uploaded in bulk are handed to the regulator by a pool
+of background workers, so the marking request returns as soon as the rows are
+updated. Each submission is split into batches of DGSHIPPING_BATCH_SIZE
+certificates, failed batches are retried with exponential backoff, and the
+progress of a submission can be polled while it runs and until
+DGSHIPPING_SUBMISSION_TTL_SECONDS after it finishes. Queued work lives in the process and is lost on restart;
+re-marking the certificates submits them again.
+
+DGSHIPPING_REGULATOR selects the regulator client: "local" for the in-process
+stand-in, or "module:factory" for a callable returning an object with
+`async submit(certificates) -> {certid: reference}`.
+"""
+import asyncio
+import importlib
+import random
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from bulk import chunked
+from cache import TTLCache
+from config import settings
+
+class RegulatorError(Exception):
+    pass
+
+class LocalRegulator:
+    """Accepts every batch after a simulated delay, failing a fraction of calls."""
+
+    def __init__(self, latency_ms: float = 0.0, failure_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+
+    async def submit(self, certificates: List[dict]) -> Dict[str, str]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        if random.random() < self.failure_rate:
+            raise RegulatorError("DGShipping portal unavailable")
+        return {
+            certificate["certid"]: f"DGS{uuid.uuid4().hex[:12].upper()}"
+            for certificate in certificates
+        }
+
+REGULATORS = {
+    "local": lambda: LocalRegulator(
+        settings.dgshipping_local_latency_ms,
+        settings.dgshipping_local_failure_rate
+    )
+}
+
+def load_regulator(name: str):
+    if name in REGULATORS:
+        return REGULATORS[name]()
+    module_name, _, factory = name.partition(":")
+    return getattr(importlib.import_module(module_name), factory)()
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class SubmissionQueue:
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        max_pending_batches: int,
+        max_attempts: int,
+        retry_backoff_seconds: float,
+        submission_ttl_seconds: float
+    ):
+        self.worker_count = workers
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        # Unfinished submissions are held until they finish, however many are
+        # queued; finished ones stay pollable for the TTL and are never evicted early
+        self.active: Dict[str, dict] = {}
+        self.submissions = TTLCache(maxsize=10000, ttl=submission_ttl_seconds, evict_live=False)
+        self.regulator = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        if self._workers:
+            return
+        if self.regulator is None:
+            self.regulator = load_regulator(settings.dgshipping_regulator)
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    async def stop(self, drain_timeout: float = 5.0):
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def pending_batches(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def accepts(self, count: int) -> bool:
+        batches = -(-count // self.batch_size)
+        return self.pending_batches() + batches <= self.max_pending_batches
+
+    def submit(self, instid: str, certificates: List[dict]) -> dict:
+        self.start()
+
+        submission = {
+            "submission_id": str(uuid.uuid4()),
+            "instid": instid,
+            "status": "queued",
+            "total": len(certificates),
+            "submitted": 0,
+            "failed": 0,
+            "pending": len(certificates),
+            "created_at": _now(),
+            "updated_at": _now(),
+            "results": {
+                certificate["certid"]: {"certid": certificate["certid"], "status": "queued", "attempts": 0}
+                for certificate in certificates
+            }
+        }
+        self.active[submission["submission_id"]] = submission
+
+        for batch in chunked(certificates, self.batch_size):
+            self._queue.put_nowait((submission, list(batch)))
+
+        return submission
+
+    def get(self, submission_id: str) -> Optional[dict]:
+        return self.active.get(submission_id) or self.submissions.get(submission_id)
+
+    async def _work(self):
+        while True:
+            submission, batch = await self._queue.get()
+            try:
+                await self._submit_batch(submission, batch)
+            finally:
+                self._queue.task_done()
+
+    async def _submit_batch(self, submission: dict, batch: List[dict]):
+        submission["status"] = "in_progress"
+        results = submission["results"]
+        references, error = None, None
+
+        for attempt in range(1, self.max_attempts + 1):
+            for certificate in batch:
+                results[certificate["certid"]]["attempts"] = attempt
+            try:
+                references = await self.regulator.submit(batch)
+                break
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(self.retry_backoff_seconds * 2 ** (attempt - 1))
+
+        for certificate in batch:
+            result = results[certificate["certid"]]
+            reference = (references or {}).get(certificate["certid"])
+            if reference:
+                result.update(status="submitted", reference=reference)
+                submission["submitted"] += 1
+            else:
+                result.update(status="failed", detail=error or "Not accepted by DGShipping")
+                submission["failed"] += 1
+            submission["pending"] -= 1
+
+        if submission["pending"] == 0:
+            if submission["failed"] == 0:
+                submission["status"] = "completed"
+            elif submission["submitted"] == 0:
+                submission["status"] = "failed"
+            else:
+                submission["status"] = "partially_failed"
+            self.active.pop(submission["submission_id"], None)
+            self.submissions.set(submission["submission_id"], submission)
+        submission["updated_at"] = _now()
+
+submission_queue = SubmissionQueue(
+    workers=settings.dgshipping_workers,
+    batch_size=settings.dgshipping_batch_size,
+    max_pending_batches=settings.dgshipping_max_pending_batches,
+    max_attempts=settings.dgshipping_max_attempts,
+    retry_backoff_seconds=settings.dgshipping_retry_backoff_seconds,
+    submission_ttl_seconds=settings.dgshipping_submission_ttl_seconds
+)
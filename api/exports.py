@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Callable, List
+from fastapi.responses import StreamingResponse
+from config import settings
+from pagination import apply_keyset
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+async def iter_rows(
+    build_query: Callable,
+    order_column: str,
+    key_column: str,
+    desc: bool = True,
+    page_size: int = None
+) -> AsyncIterator[List[dict]]:
+    page_size = page_size or settings.export_page_size
+    position = None
+
+    while True:
+        query = apply_keyset(build_query(), position, order_column, key_column, desc)
+        rows = (await query.limit(page_size).execute()).data
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        position = (rows[-1][order_column], rows[-1][key_column])
+
+async def _ndjson_chunks(pages: AsyncIterator[List[dict]], columns: List[str]) -> AsyncIterator[str]:
+    async for rows in pages:
+        yield "".join(
+            json.dumps({c: row.get(c) for c in columns}, default=str) + "\n"
+            for row in rows
+        )
+
+async def _csv_chunks(pages: AsyncIterator[List[dict]], columns: List[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for rows in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+def export_response(
+    pages: AsyncIterator[List[dict]],
+    format: ExportFormat,
+    columns: List[str],
+    filename: str
+) -> StreamingResponse:
+    if format == ExportFormat.csv:
+        chunks = _csv_chunks(pages, columns)
+    else:
+        chunks = _ndjson_chunks(pages, columns)
+
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format.value}"'}
+    )
@@ -0,0 +1,73 @@
+"""
+Institute accreditation expiry sweeper.
+
+institutes.accreditation_expired is the precomputed expiry state. Only this
+sweep sets it: it flags institutes whose valid_to has passed. A trigger clears
+it when valid_to is moved to today or later. For each newly expired institute
+the sweep deactivates the active courses, marking them expiry_deactivated,
+and then sets the flag, all with chunked set-based updates. Approving a
+reactivation request re-activates the marked courses. If a sweep stops
+part-way, the remaining institutes are still unflagged, so the next run picks
+them up. The API runs it every INSTITUTE_EXPIRY_INTERVAL_SECONDS.
+
+    python institute_expiry.py run
+    python institute_expiry.py dry-run
+"""
+import asyncio
+import json
+import sys
+from datetime import date, datetime, timezone
+from typing import Optional
+from auth import invalidate_principal
+from bulk import select_in, update_in
+from database import get_supabase, close_supabase
+from response_cache import invalidate_catalog
+
+async def expire_institutes(dry_run: bool = False, today: Optional[date] = None) -> dict:
+    supabase = get_supabase()
+    today = (today or date.today()).isoformat()
+
+    due = await supabase.table("institutes")\
+        .select("instid, userid")\
+        .eq("accreditation_expired", False)\
+        .lt("valid_to", today)\
+        .execute()
+
+    instids = [row["instid"] for row in due.data]
+    if not instids:
+        return {"date": today, "dry_run": dry_run, "institutes": 0, "courses": 0}
+
+    if dry_run:
+        courses = await select_in(
+            lambda: supabase.table("courses").select("courseid").eq("status", "active"),
+            "instid", instids
+        )
+        return {"date": today, "dry_run": True, "institutes": len(instids), "courses": len(courses)}
+
+    courses = await update_in(
+        "courses", {"status": "inactive", "expiry_deactivated": True}, "instid", instids,
+        filters={"status": "active"}
+    )
+    await update_in(
+        "institutes",
+        {"accreditation_expired": True, "accreditation_expired_at": datetime.now(timezone.utc).isoformat()},
+        "instid", instids
+    )
+
+    for row in due.data:
+        invalidate_principal(row["userid"])
+    invalidate_catalog("institutes", "courses")
+
+    return {"date": today, "dry_run": False, "institutes": len(instids), "courses": len(courses)}
+
+async def _run(dry_run: bool) -> dict:
+    try:
+        return await expire_institutes(dry_run)
+    finally:
+        await close_supabase()
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "dry-run"
+    if command not in ("run", "dry-run"):
+        sys.exit("usage: python institute_expiry.py [run|dry-run]")
+    print(json.dumps(asyncio.run(_run(command == "dry-run")), indent=2))
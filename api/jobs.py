@@ -0,0 +1,277 @@
+"""
+In-process background jobs.
+
+Route handlers enqueue post-write side effects (notifications, audit log
+entries, commission records) with `await job_runner.enqueue(name, **payload)`
+and return without waiting for them. A pool of JOBS_WORKERS workers drains a
+queue bounded at JOBS_QUEUE_SIZE and retries a failed job up to
+JOBS_MAX_ATTEMPTS times with exponential backoff.
+
+With JOBS_PERSIST=true each job is also written to the background_jobs table,
+claimed by this process, before it is queued; it is deleted once it succeeds
+and marked failed after its last attempt. Every JOBS_POLL_INTERVAL_SECONDS (and
+at startup) the runner claims pending rows, which a full queue leaves behind,
+and rows whose claim is older than JOBS_CLAIM_TIMEOUT_SECONDS, which a stopped
+process leaves behind. Claims are atomic, so with several processes each job
+is run by one of them. A queued job renews its claim while it waits or
+retries. Without persistence, queued jobs are lost on restart and jobs
+enqueued while the queue is full are dropped.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from config import settings
+from database import get_supabase
+from metrics import record_job, register_gauge
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS: Dict[str, Callable[..., Awaitable]] = {}
+
+def job(name: str):
+    def register(fn: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        JOB_HANDLERS[name] = fn
+        return fn
+    return register
+
+async def run_periodically(name: str, interval_seconds: float, fn: Callable[..., Awaitable], **kwargs):
+    """Runs fn every interval_seconds until cancelled; a failed run is logged."""
+    while True:
+        try:
+            result = await fn(**kwargs)
+            logger.info("Periodic task %s: %s", name, result)
+        except Exception:
+            logger.exception("Periodic task %s failed", name)
+        await asyncio.sleep(interval_seconds)
+
+def start_periodic(name: str, interval_seconds: float, fn: Callable[..., Awaitable], **kwargs) -> Optional[asyncio.Task]:
+    if interval_seconds <= 0:
+        return None
+    return contextvars.Context().run(
+        asyncio.create_task, run_periodically(name, interval_seconds, fn, **kwargs)
+    )
+
+class JobRunner:
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        max_attempts: int,
+        retry_backoff_seconds: float,
+        persist: bool,
+        claim_timeout_seconds: float
+    ):
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.persist = persist
+        self.claim_timeout_seconds = claim_timeout_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.busy = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # Started from an empty context so a pool created lazily inside a
+        # request does not attribute the jobs' database calls to that request.
+        self._workers = [
+            contextvars.Context().run(asyncio.create_task, self._work())
+            for _ in range(self.worker_count)
+        ]
+
+    async def stop(self, drain_timeout: float = 5.0):
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %d background jobs still queued", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def recover(self) -> int:
+        """Claims pending and stale background_jobs rows and queues them, oldest first."""
+        if not self.persist:
+            return 0
+        self.start()
+
+        capacity = self.queue_size - self.depth()
+        if capacity <= 0:
+            return 0
+
+        supabase = get_supabase()
+        response = await supabase.rpc("claim_background_jobs", {
+            "p_worker": self.worker_id,
+            "p_limit": capacity,
+            "p_stale_seconds": int(self.claim_timeout_seconds)
+        }).execute()
+
+        rows = sorted(response.data or [], key=lambda row: row.get("created_at") or "")
+        now = time.monotonic()
+        for row in rows:
+            self._queue.put_nowait({
+                "job_id": row["job_id"],
+                "name": row["name"],
+                "payload": row["payload"],
+                "attempts": row["attempts"],
+                "persisted": True,
+                "enqueued_at": now,
+                "claimed_at": now
+            })
+        return len(rows)
+
+    async def enqueue(self, name: str, **payload) -> Optional[str]:
+        if name not in JOB_HANDLERS:
+            raise KeyError(f"Unknown background job: {name}")
+        self.start()
+
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "name": name,
+            "payload": payload,
+            "attempts": 0,
+            "persisted": False,
+            "enqueued_at": time.monotonic(),
+            "claimed_at": time.monotonic()
+        }
+
+        if self.persist:
+            try:
+                supabase = get_supabase()
+                await supabase.table("background_jobs").insert({
+                    "job_id": job["job_id"],
+                    "name": name,
+                    "payload": payload,
+                    "status": "running",
+                    "claimed_by": self.worker_id,
+                    "claimed_at": datetime.now(timezone.utc).isoformat()
+                }).execute()
+                job["persisted"] = True
+            except Exception:
+                logger.exception("Could not persist background job %s; running it unpersisted", name)
+
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            outcome = "deferred" if job["persisted"] else "dropped"
+            record_job(name, outcome)
+            logger.warning("Background job queue is full; %s job %s", outcome, name)
+            if job["persisted"]:
+                await self._release(job)
+            return None
+
+        return job["job_id"]
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            self.busy += 1
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception("Background job %s could not be recorded", job["name"])
+            finally:
+                self.busy -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: dict):
+        name = job["name"]
+        handler = JOB_HANDLERS[name]
+        wait_seconds = time.monotonic() - job["enqueued_at"]
+
+        for attempt in range(job["attempts"] + 1, self.max_attempts + 1):
+            await self._renew_claim(job)
+            started = time.monotonic()
+            try:
+                await handler(**job["payload"])
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                final = attempt >= self.max_attempts
+                record_job(name, "failed" if final else "retried", wait_seconds, time.monotonic() - started)
+                wait_seconds = None
+                if final:
+                    logger.exception("Background job %s failed after %d attempts", name, attempt)
+                    await self._finish(job, "failed", attempt, error)
+                    return
+                await asyncio.sleep(self.retry_backoff_seconds * 2 ** (attempt - 1))
+                continue
+
+            record_job(name, "completed", wait_seconds, time.monotonic() - started)
+            await self._finish(job, "completed", attempt)
+            return
+
+    async def _release(self, job: dict):
+        """Hands a deferred job back as pending, for the next poll by any process."""
+        try:
+            await get_supabase().table("background_jobs")\
+                .update({"status": "pending", "claimed_by": None, "claimed_at": None})\
+                .eq("job_id", job["job_id"])\
+                .eq("claimed_by", self.worker_id)\
+                .execute()
+        except Exception:
+            # The claim goes stale and the job is picked up after JOBS_CLAIM_TIMEOUT_SECONDS
+            logger.exception("Could not release background job %s", job["name"])
+
+    async def _renew_claim(self, job: dict):
+        """Keeps another process from taking over a job that is still queued here."""
+        if not job["persisted"] or time.monotonic() - job["claimed_at"] < self.claim_timeout_seconds / 2:
+            return
+        job["claimed_at"] = time.monotonic()
+        await get_supabase().table("background_jobs")\
+            .update({"claimed_at": datetime.now(timezone.utc).isoformat()})\
+            .eq("job_id", job["job_id"])\
+            .eq("claimed_by", self.worker_id)\
+            .execute()
+
+    async def _finish(self, job: dict, outcome: str, attempts: int, error: str = None):
+        if not job["persisted"]:
+            return
+
+        supabase = get_supabase()
+        query = supabase.table("background_jobs")
+        if outcome == "completed":
+            query = query.delete()
+        else:
+            query = query.update({
+                "status": outcome,
+                "attempts": attempts,
+                "last_error": error,
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            })
+        await query.eq("job_id", job["job_id"]).execute()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.worker_count,
+            "busy": self.busy,
+            "queued": self.depth(),
+            "queue_size": self.queue_size,
+            "persist": self.persist
+        }
+
+job_runner = JobRunner(
+    workers=settings.jobs_workers,
+    queue_size=settings.jobs_queue_size,
+    max_attempts=settings.jobs_max_attempts,
+    retry_backoff_seconds=settings.jobs_retry_backoff_seconds,
+    persist=settings.jobs_persist,
+    claim_timeout_seconds=settings.jobs_claim_timeout_seconds
+)
+
+register_gauge("background_jobs_queued", "Background jobs waiting for a worker.", job_runner.depth)
+register_gauge("background_jobs_running", "Background jobs being run.", lambda: job_runner.busy)
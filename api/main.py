@@ -1,6 +1,19 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
+from database import get_supabase, close_supabase
+from metrics import MetricsMiddleware, render_metrics
+from admission import admission_control
+from dgshipping import submission_queue
+from jobs import job_runner, start_periodic
+from batch_lifecycle import advance_batches
+from institute_expiry import expire_institutes
+from sessions import purge_sessions
+import side_effects  # registers the background job handlers
+from pagination import NEXT_CURSOR_HEADER
 from routes import (
     auth_routes,
     institute_routes,
@@ -9,13 +22,49 @@ from routes import (
     booking_routes,
     certificate_routes,
     admin_routes,
-    student_routes
+    student_routes,
+    cart_routes
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_supabase()
+    job_runner.start()
+    submission_queue.start()
+    periodic = [
+        start_periodic(
+            "batch_lifecycle", settings.batch_lifecycle_interval_seconds,
+            advance_batches, dry_run=settings.batch_lifecycle_dry_run
+        ),
+        start_periodic(
+            "institute_expiry", settings.institute_expiry_interval_seconds,
+            expire_institutes
+        ),
+        start_periodic(
+            "session_purge", settings.session_purge_interval_seconds,
+            purge_sessions
+        ),
+        start_periodic(
+            "job_recovery", settings.jobs_poll_interval_seconds if settings.jobs_persist else 0,
+            job_runner.recover
+        ),
+    ]
+    yield
+    periodic = [task for task in periodic if task]
+    for task in periodic:
+        task.cancel()
+    await asyncio.gather(*periodic, return_exceptions=True)
+    await submission_queue.stop()
+    await job_runner.stop()
+    await close_supabase()
+
 app = FastAPI(
     title="Maritime Training Platform API",
     description="REST API for the Maritime Training Course Aggregator Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    dependencies=[Depends(admission_control)],
+    default_response_class=ORJSONResponse if settings.fast_responses else JSONResponse
 )
 
 app.add_middleware(
@@ -24,7 +73,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_routes.router)
 app.include_router(institute_routes.router)
@@ -34,6 +85,7 @@ app.include_router(booking_routes.router)
 app.include_router(certificate_routes.router)
 app.include_router(admin_routes.router)
 app.include_router(student_routes.router)
+app.include_router(cart_routes.router)
 
 @app.get("/")
 async def root():
@@ -49,7 +101,8 @@ async def root():
             "bookings": "/bookings",
             "certificates": "/certificates",
             "admin": "/admin",
-            "students": "/students"
+            "students": "/students",
+            "cart": "/cart"
         }
     }
 
@@ -60,6 +113,10 @@ async def health_check():
         "environment": settings.environment
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
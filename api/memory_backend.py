@@ -0,0 +1,775 @@
+"""
+In-memory stand-in for the Supabase client.
+
+Implements the part of the PostgREST query builder and GoTrue auth surface
+that the routes use, on top of an indexed row store, so the API can run,
+be load tested and be benchmarked without a Supabase project. Select it with
+DATABASE_BACKEND=memory; MEMORY_LATENCY_MS / MEMORY_LATENCY_JITTER_MS add a
+simulated network round-trip to every call and MEMORY_AUTH_LATENCY_MS to
+auth calls. MEMORY_SEED_FILE loads a JSON fixture of
+{"<table>": [rows], "auth_users": [{"email", "password", "id"}]} at startup.
+"""
+import asyncio
+import difflib
+import hashlib
+import json
+import random
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from gotrue.errors import AuthApiError
+from postgrest.exceptions import APIError
+
+PRIMARY_KEYS = {
+    "users": "userid",
+    "students": "studid",
+    "institutes": "instid",
+    "courses": "courseid",
+    "batches": "batchid",
+    "bookings": "bookid",
+    "certificates": "certid",
+    "payments": "payid",
+    "logs": "logid",
+    "master_courses": "master_course_id",
+    "institute_course_applications": "application_id",
+    "institute_reactivation_requests": "request_id",
+    "cart_items": "cart_item_id",
+    "notifications": "notification_id",
+    "platform_configuration": "config_key",
+    "institute_commissions": "commission_id",
+    "booking_commissions": "booking_commission_id",
+    "background_jobs": "job_id",
+    "auth_sessions": "session_id",
+}
+
+DEFAULTS = {
+    "institutes": {"verified_status": "pending", "documents": [], "accreditation_expired": False},
+    "courses": {"status": "inactive", "validity_months": 60, "expiry_deactivated": False},
+    "batches": {"seats_total": 30, "seats_booked": 0, "batch_status": "upcoming"},
+    "bookings": {"payment_status": "pending", "attendance_status": "not_started"},
+    "certificates": {"dgshipping_uploaded": False, "status": "valid"},
+    "master_courses": {"is_active": True, "required_documents": []},
+    "institute_reactivation_requests": {"status": "pending"},
+    "institute_course_applications": {"status": "pending"},
+    "notifications": {"read_status": False},
+    "background_jobs": {"status": "pending", "attempts": 0},
+}
+
+TIMESTAMP_DEFAULTS = {
+    "bookings": ["booking_date"],
+    "institute_reactivation_requests": ["submitted_at"],
+    "cart_items": ["added_at"],
+    "background_jobs": ["created_at", "updated_at"],
+}
+
+UNIQUE = {
+    "users": [("email",)],
+    "bookings": [("confirmation_number",)],
+    "certificates": [("cert_number",)],
+    "master_courses": [("course_code",)],
+    "cart_items": [("user_id", "course_id", "batch_id")],
+    "institute_commissions": [("instid",)],
+    "booking_commissions": [("bookid",)],
+}
+# Tables whose unique constraints are NULLS NOT DISTINCT
+UNIQUE_NULLS_NOT_DISTINCT = {"cart_items"}
+
+# (table, embedded table) -> (local column, remote column); many-to-one only
+RELATIONS = {
+    ("students", "users"): ("userid", "userid"),
+    ("institutes", "users"): ("userid", "userid"),
+    ("courses", "institutes"): ("instid", "instid"),
+    ("courses", "master_courses"): ("master_course_id", "master_course_id"),
+    ("batches", "courses"): ("courseid", "courseid"),
+    ("bookings", "batches"): ("batchid", "batchid"),
+    ("bookings", "students"): ("studid", "studid"),
+    ("certificates", "courses"): ("courseid", "courseid"),
+    ("certificates", "students"): ("studid", "studid"),
+    ("institute_course_applications", "institutes"): ("instid", "instid"),
+    ("institute_course_applications", "master_courses"): ("master_course_id", "master_course_id"),
+    ("institute_reactivation_requests", "institutes"): ("instid", "instid"),
+    ("cart_items", "courses"): ("course_id", "courseid"),
+    ("cart_items", "batches"): ("batch_id", "batchid"),
+}
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _api_error(message: str, code: str, details: str = None) -> APIError:
+    return APIError({"message": message, "code": code, "details": details, "hint": None})
+
+def _index_key(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return None
+    return str(value)
+
+def _coerce(stored: Any, value: Any) -> Tuple[Any, Any]:
+    if isinstance(stored, bool) and isinstance(value, str):
+        return stored, value.lower() == "true"
+    if isinstance(stored, (int, float)) and not isinstance(stored, bool) and isinstance(value, str):
+        try:
+            return stored, float(value)
+        except ValueError:
+            return str(stored), value
+    if isinstance(stored, str) and not isinstance(value, str) and value is not None:
+        return stored, str(value)
+    return stored, value
+
+def _compare(stored: Any, op: str, value: Any) -> bool:
+    if op == "is":
+        if value is None or str(value).lower() == "null":
+            return stored is None
+        return _compare(stored, "eq", value)
+    if op == "in":
+        return any(_compare(stored, "eq", v) for v in value)
+    if stored is None:
+        return False
+    if op in ("like", "ilike"):
+        pattern = "^" + re.escape(str(value)).replace("%", ".*").replace("_", ".") + "$"
+        return re.match(pattern, str(stored), re.IGNORECASE if op == "ilike" else 0) is not None
+
+    stored, value = _coerce(stored, value)
+    if op == "eq":
+        return stored == value
+    if op == "neq":
+        return stored != value
+    if op == "gt":
+        return stored > value
+    if op == "gte":
+        return stored >= value
+    if op == "lt":
+        return stored < value
+    if op == "lte":
+        return stored <= value
+    raise _api_error(f"Unsupported operator {op}", "PGRST100")
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, quoted, current = [], 0, False, []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and quoted:
+            current.append(text[i:i + 2])
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current).strip())
+            current = []
+            i += 1
+            continue
+        current.append(char)
+        i += 1
+    if current:
+        parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+def _parse_logic(expression: str) -> Tuple:
+    """Parse a PostgREST or=/and= tree into ("and"|"or", [nodes]) / (column, op, value)."""
+    terms = []
+    for term in _split_top_level(expression):
+        match = re.match(r"^(and|or)\((.*)\)$", term, re.DOTALL)
+        if match:
+            terms.append(_parse_logic_group(match.group(1), match.group(2)))
+            continue
+        column, op, value = term.split(".", 2)
+        if op == "in":
+            value = [_unquote(v) for v in _split_top_level(value.strip("()"))]
+        else:
+            value = _unquote(value)
+        terms.append((column, op, value))
+    return terms
+
+def _parse_logic_group(kind: str, body: str) -> Tuple:
+    return (kind, _parse_logic(body))
+
+def _eval_logic(node: Tuple, row: dict) -> bool:
+    if node[0] in ("and", "or") and isinstance(node[1], list):
+        results = (_eval_logic(child, row) for child in node[1])
+        return all(results) if node[0] == "and" else any(results)
+    column, op, value = node
+    return _compare(row.get(column), op, value)
+
+def _parse_select(columns: str) -> List[Tuple]:
+    items = []
+    for part in _split_top_level(columns or "*"):
+        match = re.match(r"^([\w]+)(?:!(\w+))?\((.*)\)$", part, re.DOTALL)
+        if match:
+            items.append(("embed", match.group(1), match.group(2) == "inner", _parse_select(match.group(3))))
+        elif part == "*":
+            items.append(("*",))
+        else:
+            items.append(("column", part))
+    return items
+
+class MemoryResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+class MemoryTable:
+    def __init__(self, name: str):
+        self.name = name
+        self.pk = PRIMARY_KEYS.get(name, "id")
+        self.rows: Dict[str, dict] = {}
+        self.indexes: Dict[str, Dict[Any, Set[str]]] = {}
+
+    def index(self, column: str) -> Dict[Any, Set[str]]:
+        if column not in self.indexes:
+            index: Dict[Any, Set[str]] = {}
+            for key, row in self.rows.items():
+                index.setdefault(_index_key(row.get(column)), set()).add(key)
+            self.indexes[column] = index
+        return self.indexes[column]
+
+    def lookup(self, column: str, value: Any) -> List[dict]:
+        if column == self.pk:
+            row = self.rows.get(_index_key(value))
+            return [row] if row else []
+        return [self.rows[k] for k in self.index(column).get(_index_key(value), ())]
+
+    def _check_unique(self, row: dict, ignore: Optional[str] = None):
+        for columns in UNIQUE.get(self.name, []):
+            if self.name not in UNIQUE_NULLS_NOT_DISTINCT and any(row.get(c) is None for c in columns):
+                continue
+            candidates = self.lookup(columns[0], row[columns[0]])
+            for other in candidates:
+                if other[self.pk] != ignore and all(other.get(c) == row.get(c) for c in columns):
+                    raise _api_error(
+                        f'duplicate key value violates unique constraint "{self.name}_{"_".join(columns)}_key"',
+                        "23505"
+                    )
+
+    def insert(self, values: dict) -> dict:
+        row = dict(DEFAULTS.get(self.name, {}))
+        for column in TIMESTAMP_DEFAULTS.get(self.name, []):
+            row[column] = _now()
+        row["created_at"] = _now()
+        row.update(values)
+        row.setdefault(self.pk, str(uuid.uuid4()))
+
+        key = _index_key(row[self.pk])
+        if key in self.rows:
+            raise _api_error(f'duplicate key value violates unique constraint "{self.name}_pkey"', "23505")
+        self._check_unique(row)
+
+        self.rows[key] = row
+        for column, index in self.indexes.items():
+            index.setdefault(_index_key(row.get(column)), set()).add(key)
+        return row
+
+    def update(self, row: dict, changes: dict) -> dict:
+        key = _index_key(row[self.pk])
+        updated = {**row, **changes}
+        self._check_unique(updated, ignore=row[self.pk])
+
+        for column, index in self.indexes.items():
+            if column in changes:
+                index.get(_index_key(row.get(column)), set()).discard(key)
+                index.setdefault(_index_key(updated.get(column)), set()).add(key)
+        row.update(changes)
+        return row
+
+    def delete(self, row: dict):
+        key = _index_key(row[self.pk])
+        self.rows.pop(key, None)
+        for column, index in self.indexes.items():
+            index.get(_index_key(row.get(column)), set()).discard(key)
+
+class MemoryQuery:
+    def __init__(self, client: "MemoryClient", table: str):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._columns = "*"
+        self._count = None
+        self._payload: Any = None
+        self._filters: List[Tuple] = []
+        self._logic: List[Tuple] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single = False
+        self._maybe_single = False
+        self._return_minimal = False
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "MemoryQuery":
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        return self
+
+    def insert(self, payload: Any, returning: Any = None, **kwargs) -> "MemoryQuery":
+        self._action = "insert"
+        self._payload = payload
+        self._return_minimal = getattr(returning, "value", returning) == "minimal"
+        return self
+
+    def upsert(self, payload: Any, on_conflict: str = "", **kwargs) -> "MemoryQuery":
+        self._action = "upsert"
+        self._payload = payload
+        self._on_conflict = [c.strip() for c in on_conflict.split(",") if c.strip()]
+        return self
+
+    def update(self, payload: dict, count: Optional[str] = None, returning: Any = None, **kwargs) -> "MemoryQuery":
+        self._action = "update"
+        self._payload = payload
+        self._count = count
+        self._return_minimal = getattr(returning, "value", returning) == "minimal"
+        return self
+
+    def delete(self, count: Optional[str] = None, returning: Any = None, **kwargs) -> "MemoryQuery":
+        self._action = "delete"
+        self._count = count
+        self._return_minimal = getattr(returning, "value", returning) == "minimal"
+        return self
+
+    def filter(self, column: str, op: str, value: Any) -> "MemoryQuery":
+        self._filters.append((column, op, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        return self.filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "MemoryQuery":
+        return self.filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        return self.filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        return self.filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        return self.filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        return self.filter(column, "lte", value)
+
+    def like(self, column: str, pattern: str) -> "MemoryQuery":
+        return self.filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "MemoryQuery":
+        return self.filter(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any) -> "MemoryQuery":
+        return self.filter(column, "is", value)
+
+    def in_(self, column: str, values: List[Any]) -> "MemoryQuery":
+        return self.filter(column, "in", list(values))
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> "MemoryQuery":
+        self._logic.append(("or", _parse_logic(filters)))
+        return self
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = False, **kwargs) -> "MemoryQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs) -> "MemoryQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> "MemoryQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self) -> "MemoryQuery":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "MemoryQuery":
+        self._maybe_single = True
+        return self
+
+    def _candidates(self, table: MemoryTable) -> List[dict]:
+        for column, op, value in self._filters:
+            if op == "eq" and "." not in column:
+                return table.lookup(column, value)
+        return list(table.rows.values())
+
+    def _matches(self, row: dict) -> bool:
+        for column, op, value in self._filters:
+            if "." not in column and not _compare(row.get(column), op, value):
+                return False
+        return all(_eval_logic(node, row) for node in self._logic)
+
+    def _embed(self, table: str, row: dict, item: Tuple) -> Optional[dict]:
+        _, relation, _, columns = item
+        if (table, relation) not in RELATIONS:
+            raise _api_error(
+                f"Could not find a relationship between '{table}' and '{relation}' in the schema cache",
+                "PGRST200"
+            )
+        local, remote = RELATIONS[(table, relation)]
+        if row.get(local) is None:
+            return None
+        matches = self._client.table_store(relation).lookup(remote, row[local])
+        if not matches:
+            return None
+
+        embedded = self._project(relation, matches[0], columns)
+        prefix = relation + "."
+        for column, op, value in self._filters:
+            if column.startswith(prefix) and not _compare(embedded.get(column[len(prefix):]), op, value):
+                return None
+        return embedded
+
+    def _project(self, table: str, row: dict, items: List[Tuple]) -> dict:
+        result = {}
+        for item in items:
+            if item[0] == "*":
+                result.update(row)
+            elif item[0] == "column":
+                name = item[1]
+                alias, _, source = name.partition(":") if ":" in name else (name, "", name)
+                result[alias] = row.get(source)
+            else:
+                result[item[1]] = self._embed(table, row, item)
+        return result
+
+    def _select(self, rows: List[dict]) -> Tuple[List[dict], int]:
+        items = _parse_select(self._columns)
+        inner = [item[1] for item in items if item[0] == "embed" and item[2]]
+
+        selected = []
+        for row in rows:
+            projected = self._project(self._table, row, items)
+            if any(projected.get(relation) is None for relation in inner):
+                continue
+            selected.append((row, projected))
+
+        for column, desc in reversed(self._order):
+            selected.sort(
+                key=lambda pair: (pair[0].get(column) is None, pair[0].get(column) if pair[0].get(column) is not None else ""),
+                reverse=desc
+            )
+
+        count = len(selected)
+        end = None if self._limit is None else self._offset + self._limit
+        return [projected for _, projected in selected[self._offset:end]], count
+
+    def _write(self, table: MemoryTable) -> List[dict]:
+        if self._action in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            written, undo = [], []
+            try:
+                for values in payload:
+                    existing = None
+                    if self._action == "upsert":
+                        conflict = self._on_conflict or [table.pk]
+                        existing = next(
+                            (r for r in table.lookup(conflict[0], values.get(conflict[0]))
+                             if all(r.get(c) == values.get(c) for c in conflict)),
+                            None
+                        )
+                    if existing is not None:
+                        undo.append((existing, dict(existing)))
+                        written.append(table.update(existing, values))
+                    else:
+                        written.append(table.insert(values))
+                        undo.append((written[-1], None))
+            except APIError:
+                # A multi-row statement is all or nothing, as in Postgres
+                for row, previous in reversed(undo):
+                    if previous is None:
+                        table.delete(row)
+                    else:
+                        table.update(row, previous)
+                raise
+            return written
+
+        rows = [row for row in self._candidates(table) if self._matches(row)]
+        if self._action == "update":
+            return [table.update(row, self._payload) for row in rows]
+
+        for row in rows:
+            table.delete(row)
+        return rows
+
+    async def execute(self) -> Optional[MemoryResponse]:
+        await self._client.round_trip()
+        table = self._client.table_store(self._table)
+
+        if self._action == "select":
+            rows = [row for row in self._candidates(table) if self._matches(row)]
+            data, count = self._select(rows)
+        else:
+            written = self._write(table)
+            data = [] if self._return_minimal else [dict(row) for row in written]
+            count = len(written)
+
+        if self._single or self._maybe_single:
+            if len(data) > 1:
+                raise _api_error("JSON object requested, multiple (or no) rows returned", "PGRST116")
+            if not data and self._single:
+                raise _api_error("JSON object requested, multiple (or no) rows returned", "PGRST116",
+                                 "The result contains 0 rows")
+            if not data:
+                # postgrest's maybe_single() returns None, not an empty response
+                return None
+            return MemoryResponse(data[0], count if self._count else None)
+
+        return MemoryResponse(data, count if self._count else None)
+
+class MemoryRPC:
+    def __init__(self, client: "MemoryClient", fn: str, params: dict):
+        self._client = client
+        self._fn = fn
+        self._params = params or {}
+
+    async def execute(self) -> MemoryResponse:
+        await self._client.round_trip()
+        if self._fn not in RPC_FUNCTIONS:
+            raise _api_error(f"Could not find the function public.{self._fn}", "PGRST202")
+        return MemoryResponse(RPC_FUNCTIONS[self._fn](self._client, **self._params))
+
+RPC_FUNCTIONS: Dict[str, Callable] = {}
+
+def rpc(name: str):
+    def register(fn: Callable) -> Callable:
+        RPC_FUNCTIONS[name] = fn
+        return fn
+    return register
+
+class MemoryAuth:
+    def __init__(self, client: "MemoryClient"):
+        self._client = client
+        self._users: Dict[str, dict] = {}
+
+    @staticmethod
+    def _hash(password: str, salt: str) -> str:
+        return hashlib.sha256(f"{salt}:{password}".encode()).hexdigest()
+
+    def add_user(self, email: str, password: str, user_id: Optional[str] = None) -> dict:
+        email = email.lower()
+        if email in self._users:
+            raise AuthApiError("User already registered", 422, "user_already_exists")
+        salt = uuid.uuid4().hex
+        user = {"id": user_id or str(uuid.uuid4()), "email": email, "salt": salt,
+                "password_hash": self._hash(password, salt)}
+        self._users[email] = user
+        return user
+
+    def _response(self, user: dict) -> SimpleNamespace:
+        return SimpleNamespace(
+            user=SimpleNamespace(id=user["id"], email=user["email"]),
+            session=SimpleNamespace(access_token=uuid.uuid4().hex)
+        )
+
+    async def sign_up(self, credentials: dict) -> SimpleNamespace:
+        await self._client.round_trip(auth=True)
+        return self._response(self.add_user(credentials["email"], credentials["password"]))
+
+    async def sign_in_with_password(self, credentials: dict) -> SimpleNamespace:
+        await self._client.round_trip(auth=True)
+        user = self._users.get(credentials["email"].lower())
+        if not user or user["password_hash"] != self._hash(credentials["password"], user["salt"]):
+            raise AuthApiError("Invalid login credentials", 400, "invalid_credentials")
+        return self._response(user)
+
+class MemoryClient:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, auth_latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.auth_latency_ms = auth_latency_ms
+        self.round_trips = 0
+        self.tables: Dict[str, MemoryTable] = {}
+        self.auth = MemoryAuth(self)
+
+    async def round_trip(self, auth: bool = False):
+        self.round_trips += 1
+        delay = self.latency_ms + (self.auth_latency_ms if auth else 0.0)
+        if self.jitter_ms:
+            delay += random.uniform(0, self.jitter_ms)
+        await asyncio.sleep(delay / 1000 if delay > 0 else 0)
+
+    def table_store(self, name: str) -> MemoryTable:
+        if name not in self.tables:
+            self.tables[name] = MemoryTable(name)
+        return self.tables[name]
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> MemoryRPC:
+        return MemoryRPC(self, fn, params)
+
+    def seed(self, table: str, rows: List[dict]) -> List[dict]:
+        store = self.table_store(table)
+        return [store.insert(dict(row)) for row in rows]
+
+    def load_seed_file(self, path: str):
+        with open(path) as f:
+            fixture = json.load(f)
+        for user in fixture.pop("auth_users", []):
+            self.auth.add_user(user["email"], user["password"], user.get("id"))
+        for table, rows in fixture.items():
+            self.seed(table, rows)
+
+    async def aclose(self):
+        pass
+
+# Stand-ins for the SQL functions in supabase/migrations
+
+@rpc("reserve_batch_seat")
+def _reserve_batch_seat(client: MemoryClient, p_studid: str, p_batchid: str, p_amount: float,
+                        p_confirmation_number: str) -> dict:
+    batches = client.table_store("batches").lookup("batchid", p_batchid)
+    if not batches:
+        raise _api_error("Batch not found", "BK404")
+    batch = batches[0]
+
+    bookings = client.table_store("bookings")
+    if any(b["studid"] == p_studid for b in bookings.lookup("batchid", p_batchid)):
+        raise _api_error("You have already booked this batch", "BK410")
+
+    if (batch.get("seats_booked") or 0) >= batch["seats_total"]:
+        raise _api_error("Batch is full. No seats available.", "BK409")
+
+    booking = bookings.insert({
+        "studid": p_studid,
+        "batchid": p_batchid,
+        "confirmation_number": p_confirmation_number,
+        "amount": p_amount,
+        "payment_status": "pending",
+        "attendance_status": "not_started",
+        "booking_date": _now()
+    })
+    client.table_store("batches").update(batch, {"seats_booked": (batch.get("seats_booked") or 0) + 1})
+    return dict(booking)
+
+@rpc("checkout_cart")
+def _checkout_cart(client: MemoryClient, p_userid: str, p_studid: str) -> List[dict]:
+    items = sorted(
+        client.table_store("cart_items").lookup("user_id", p_userid),
+        key=lambda item: (item.get("batch_id") is None, item.get("batch_id") or "")
+    )
+    if not items:
+        raise _api_error("Cart is empty", "BK400")
+    if any(item.get("batch_id") is None for item in items):
+        raise _api_error("Select a batch for every course in the cart", "BK422")
+
+    batches = client.table_store("batches")
+    bookings = client.table_store("bookings")
+    courses = client.table_store("courses")
+    locked = []
+    for item in items:
+        found = batches.lookup("batchid", item["batch_id"])
+        if not found:
+            raise _api_error("Batch not found", "BK404")
+        batch = found[0]
+        if batch["courseid"] != item["course_id"]:
+            raise _api_error(f"Batch {batch['batch_name']} does not belong to the selected course", "BK422")
+        if any(b["studid"] == p_studid for b in bookings.lookup("batchid", batch["batchid"])):
+            raise _api_error(f"You have already booked batch {batch['batch_name']}", "BK410")
+        if (batch.get("seats_booked") or 0) >= batch["seats_total"]:
+            raise _api_error(f"Batch {batch['batch_name']} is full. No seats available.", "BK409")
+        locked.append((item, batch))
+
+    created = []
+    for item, batch in locked:
+        batches.update(batch, {"seats_booked": (batch.get("seats_booked") or 0) + 1})
+        course = courses.lookup("courseid", item["course_id"])
+        created.append(dict(bookings.insert({
+            "studid": p_studid,
+            "batchid": batch["batchid"],
+            "confirmation_number": f"BK{datetime.now().strftime('%Y%m%d')}{uuid.uuid4().hex[:8].upper()}",
+            "amount": course[0]["fees"] if course else 0,
+            "payment_status": "pending",
+            "attendance_status": "not_started",
+            "booking_date": _now()
+        })))
+
+    cart = client.table_store("cart_items")
+    for item in items:
+        cart.delete(item)
+    return created
+
+@rpc("get_platform_stats")
+def _get_platform_stats(client: MemoryClient) -> dict:
+    institutes = client.table_store("institutes").rows.values()
+    courses = client.table_store("courses").rows.values()
+    bookings = client.table_store("bookings").rows.values()
+
+    total_institutes = len(institutes)
+    verified_institutes = sum(1 for i in institutes if i.get("verified_status") == "verified")
+    return {
+        "total_institutes": total_institutes,
+        "verified_institutes": verified_institutes,
+        "pending_verification": total_institutes - verified_institutes,
+        "total_students": len(client.table_store("students").rows),
+        "total_courses": len(courses),
+        "active_courses": sum(1 for c in courses if c.get("status") == "active"),
+        "total_bookings": len(bookings),
+        "total_revenue": sum(float(b["amount"]) for b in bookings if b.get("payment_status") == "completed")
+    }
+
+@rpc("claim_background_jobs")
+def _claim_background_jobs(client: MemoryClient, p_worker: str, p_limit: int, p_stale_seconds: int) -> List[dict]:
+    stale_before = (datetime.now(timezone.utc) - timedelta(seconds=p_stale_seconds)).isoformat()
+    jobs = client.table_store("background_jobs")
+    claimable = sorted(
+        (job for job in jobs.rows.values()
+         if job.get("status") == "pending"
+         or (job.get("status") == "running" and (job.get("claimed_at") or "") < stale_before)),
+        key=lambda job: job.get("created_at") or ""
+    )[:max(p_limit, 0)]
+
+    now = _now()
+    return [
+        dict(jobs.update(job, {"status": "running", "claimed_by": p_worker, "claimed_at": now, "updated_at": now}))
+        for job in claimable
+    ]
+
+@rpc("rebuild_platform_stats")
+def _rebuild_platform_stats(client: MemoryClient) -> dict:
+    stats = _get_platform_stats(client)
+    return {"before": stats, "after": stats}
+
+def _word_similarity(term: str, words: List[str]) -> float:
+    return max((difflib.SequenceMatcher(None, term, word).ratio() for word in words), default=0.0)
+
+@rpc("search_courses")
+def _search_courses(client: MemoryClient, p_query: str, p_type: Optional[str] = None,
+                    p_mode: Optional[str] = None, p_limit: int = 50) -> List[dict]:
+    terms = re.findall(r"\w+", p_query.lower())
+    masters = client.table_store("master_courses")
+    ranked = []
+
+    for course in client.table_store("courses").rows.values():
+        if course.get("status") != "active":
+            continue
+        if (p_type and course.get("type") != p_type) or (p_mode and course.get("mode") != p_mode):
+            continue
+
+        master = masters.lookup("master_course_id", course["master_course_id"]) if course.get("master_course_id") else []
+        document = " ".join(filter(None, [
+            course.get("title"), course.get("type"), course.get("description"),
+            master[0].get("course_name") if master else None,
+            master[0].get("course_code") if master else None,
+        ])).lower()
+        words = re.findall(r"\w+", document)
+
+        score = sum(_word_similarity(term, words) for term in terms) / max(len(terms), 1)
+        if score >= 0.75:
+            ranked.append((score, course.get("created_at") or "", course))
+
+    ranked.sort(key=lambda r: (r[0], r[1]), reverse=True)
+    return [dict(course) for _, _, course in ranked[:min(max(p_limit, 1), 200)]]
@@ -0,0 +1,211 @@
+import math
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+UNMATCHED_ROUTE = "unmatched"
+NO_ROUTE = "none"
+# Time constant of the moving average of database call latency
+DB_LATENCY_DECAY_SECONDS = 10.0
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _route_template(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+class RequestMetrics:
+    """Database calls made while serving one request."""
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.db_calls = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # The router records the matched route in the scope before any
+        # dependency or endpoint runs.
+        return _route_template(self.scope)
+
+_current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request", default=None)
+
+_request_duration: Dict[Tuple, Histogram] = {}
+_db_calls_per_request: Dict[Tuple, Histogram] = {}
+_db_duration: Dict[Tuple, Histogram] = {}
+_db_rows: Dict[Tuple, int] = {}
+_db_errors: Dict[Tuple, int] = {}
+_job_wait: Dict[Tuple, Histogram] = {}
+_job_duration: Dict[Tuple, Histogram] = {}
+_jobs: Dict[Tuple, int] = {}
+_lifecycle_runs: Dict[Tuple, Histogram] = {}
+_lifecycle_batches: Dict[Tuple, int] = {}
+_admissions: Dict[Tuple, int] = {}
+_gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+_in_flight = {"requests": 0}
+_db_latency = {"average": 0.0, "updated": 0.0}
+
+def _histogram(store: Dict[Tuple, Histogram], key: Tuple, buckets: Tuple[float, ...]) -> Histogram:
+    histogram = store.get(key)
+    if histogram is None:
+        histogram = store[key] = Histogram(buckets)
+    return histogram
+
+def record_db_call(table: str, operation: str, seconds: float, rows: int, failed: bool = False):
+    request = _current_request.get()
+    method, route = (request.scope["method"], request.route) if request else ("", NO_ROUTE)
+    if request:
+        request.db_calls += 1
+        request.db_seconds += seconds
+
+    now = time.monotonic()
+    weight = math.exp(-(now - _db_latency["updated"]) / DB_LATENCY_DECAY_SECONDS)
+    _db_latency["average"] = _db_latency["average"] * weight + seconds * (1 - weight)
+    _db_latency["updated"] = now
+
+    key = (method, route, table, operation)
+    _histogram(_db_duration, key, LATENCY_BUCKETS).observe(seconds)
+    _db_rows[key] = _db_rows.get(key, 0) + rows
+    if failed:
+        _db_errors[key] = _db_errors.get(key, 0) + 1
+
+def db_latency_average() -> float:
+    """Time-weighted average database call latency, decaying towards 0 while idle."""
+    idle = time.monotonic() - _db_latency["updated"]
+    return _db_latency["average"] * math.exp(-idle / DB_LATENCY_DECAY_SECONDS)
+
+def requests_in_flight() -> int:
+    return _in_flight["requests"]
+
+def record_admission(method: str, route: str, outcome: str):
+    key = (method, route, outcome)
+    _admissions[key] = _admissions.get(key, 0) + 1
+
+def record_job(job: str, outcome: str, wait_seconds: float = None, run_seconds: float = None):
+    _jobs[(job, outcome)] = _jobs.get((job, outcome), 0) + 1
+    if wait_seconds is not None:
+        _histogram(_job_wait, (job,), LATENCY_BUCKETS).observe(wait_seconds)
+    if run_seconds is not None:
+        _histogram(_job_duration, (job, outcome), LATENCY_BUCKETS).observe(run_seconds)
+
+def record_batch_lifecycle_run(moved: Dict[str, int], seconds: float, dry_run: bool):
+    mode = "dry_run" if dry_run else "apply"
+    _histogram(_lifecycle_runs, (mode,), LATENCY_BUCKETS).observe(seconds)
+    for transition, count in moved.items():
+        key = (transition, mode)
+        _lifecycle_batches[key] = _lifecycle_batches.get(key, 0) + count
+
+def register_gauge(name: str, help_text: str, read: Callable[[], float]):
+    _gauges[name] = (help_text, read)
+
+class MetricsMiddleware:
+    """
+    Tracks request latency and the database calls each request makes, per
+    route template, and reports them in a Server-Timing response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request = RequestMetrics(scope)
+        token = _current_request.set(request)
+        started = time.perf_counter()
+        status_code = 500
+        _in_flight["requests"] += 1
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = (
+                    f'db;dur={request.db_seconds * 1000:.2f};desc="{request.db_calls} calls", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.2f}"
+                )
+                message.setdefault("headers", []).append((b"server-timing", timing.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _in_flight["requests"] -= 1
+            _current_request.reset(token)
+            key = (scope["method"], request.route)
+            _histogram(_request_duration, key + (str(status_code),), LATENCY_BUCKETS)\
+                .observe(time.perf_counter() - started)
+            _histogram(_db_calls_per_request, key, CALL_COUNT_BUCKETS).observe(request.db_calls)
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return ",".join(pairs)
+
+def _render_histogram(lines: List[str], name: str, help_text: str, label_names: Tuple[str, ...],
+                      store: Dict[Tuple, Histogram]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(store.items()):
+        labels = _labels(label_names, key)
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+def _render_counter(lines: List[str], name: str, help_text: str, label_names: Tuple[str, ...],
+                    store: Dict[Tuple, int]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in sorted(store.items()):
+        lines.append(f"{name}{{{_labels(label_names, key)}}} {value}")
+
+def render_metrics() -> str:
+    """Prometheus text exposition format."""
+    lines: List[str] = []
+    _render_histogram(lines, "http_request_duration_seconds", "Request latency by route.",
+                      ("method", "route", "status"), _request_duration)
+    _render_histogram(lines, "http_request_db_calls", "Database calls per request by route.",
+                      ("method", "route"), _db_calls_per_request)
+    _render_histogram(lines, "db_call_duration_seconds", "Database call latency by route, table and operation.",
+                      ("method", "route", "table", "operation"), _db_duration)
+    _render_counter(lines, "db_rows_total", "Rows returned or written by database calls.",
+                    ("method", "route", "table", "operation"), _db_rows)
+    _render_counter(lines, "db_errors_total", "Database calls that raised.",
+                    ("method", "route", "table", "operation"), _db_errors)
+    _render_counter(lines, "admission_requests_total", "Requests to rate-limited routes by outcome (admitted, rate_limited, shed).",
+                    ("method", "route", "outcome"), _admissions)
+    _render_histogram(lines, "background_job_wait_seconds", "Time background jobs spent queued before their first run.",
+                      ("job",), _job_wait)
+    _render_histogram(lines, "background_job_duration_seconds", "Background job run time per attempt.",
+                      ("job", "outcome"), _job_duration)
+    _render_counter(lines, "background_jobs_total", "Background job attempts and drops by outcome.",
+                    ("job", "outcome"), _jobs)
+    _render_histogram(lines, "batch_lifecycle_run_seconds", "Batch lifecycle scheduler run time.",
+                      ("mode",), _lifecycle_runs)
+    _render_counter(lines, "batch_lifecycle_batches_total", "Batches moved (or, in dry runs, due to move) by new status.",
+                    ("transition", "mode"), _lifecycle_batches)
+    for name, (help_text, read) in sorted(_gauges.items()):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {read()}")
+    return "\n".join(lines) + "\n"
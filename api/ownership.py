@@ -0,0 +1,41 @@
+from fastapi import HTTPException, status
+from database import get_supabase
+
+def select_institute_rows(table: str, instid: str, columns: str = "*"):
+    supabase = get_supabase()
+
+    return supabase.table(table)\
+        .select(f"{columns}, courses!inner(instid)")\
+        .eq("courses.instid", instid)
+
+async def get_institute_row(
+    table: str,
+    key_column: str,
+    key: str,
+    institute: dict,
+    not_found: str,
+    forbidden: str,
+    columns: str = "*",
+    course_columns: str = "instid"
+) -> dict:
+    supabase = get_supabase()
+
+    response = await supabase.table(table)\
+        .select(f"{columns}, courses({course_columns})")\
+        .eq(key_column, key)\
+        .maybe_single()\
+        .execute()
+
+    if response is None or not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=not_found
+        )
+
+    if (response.data.get("courses") or {}).get("instid") != institute["instid"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=forbidden
+        )
+
+    return response.data
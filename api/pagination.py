@@ -0,0 +1,75 @@
+import base64
+import binascii
+import json
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException, Query, Response, status
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class PageParams:
+    def __init__(self, cursor: Optional[str], limit: int):
+        self.cursor = cursor
+        self.limit = limit
+
+# An async dependency: FastAPI runs sync ones (including classes used with a
+# bare Depends()) in the threadpool, which queues under load.
+async def page_params(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+) -> PageParams:
+    return PageParams(cursor, limit)
+
+def encode_cursor(value: Any, key: Any) -> str:
+    raw = json.dumps([value, key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, key = json.loads(base64.urlsafe_b64decode(padded))
+        return value, key
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def _quote(value: Any) -> str:
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+def apply_cursor(query, cursor: Optional[str], order_column: str, key_column: str, desc: bool = True):
+    position = decode_cursor(cursor) if cursor else None
+    return apply_keyset(query, position, order_column, key_column, desc)
+
+def apply_keyset(query, position: Optional[Tuple[Any, Any]], order_column: str, key_column: str, desc: bool = True):
+    if position:
+        value, key = position
+        op = "lt" if desc else "gt"
+        query = query.or_(
+            f"{order_column}.{op}.{_quote(value)},"
+            f"and({order_column}.eq.{_quote(value)},{key_column}.{op}.{_quote(key)})"
+        )
+
+    return query.order(order_column, desc=desc).order(key_column, desc=desc)
+
+async def paginate(
+    query,
+    page: PageParams,
+    response: Response,
+    order_column: str,
+    key_column: str,
+    desc: bool = True
+) -> list:
+    query = apply_cursor(query, page.cursor, order_column, key_column, desc)
+    result = await query.limit(page.limit + 1).execute()
+    rows = result.data
+
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[order_column], last[key_column])
+
+    return rows
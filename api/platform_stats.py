@@ -0,0 +1,36 @@
+"""
+Platform statistics backed by the incrementally maintained
+platform_stat_counters table.
+
+Reconcile the counters with the source tables from the command line:
+
+    python platform_stats.py rebuild
+"""
+import asyncio
+import json
+import sys
+from database import get_supabase, close_supabase
+
+async def fetch_platform_stats() -> dict:
+    supabase = get_supabase()
+    response = await supabase.rpc("get_platform_stats").execute()
+    return response.data
+
+async def rebuild_platform_stats() -> dict:
+    supabase = get_supabase()
+    response = await supabase.rpc("rebuild_platform_stats").execute()
+    return response.data
+
+async def _run(command: str) -> dict:
+    try:
+        if command == "rebuild":
+            return await rebuild_platform_stats()
+        return await fetch_platform_stats()
+    finally:
+        await close_supabase()
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+    if command not in ("show", "rebuild"):
+        sys.exit("usage: python platform_stats.py [show|rebuild]")
+    print(json.dumps(asyncio.run(_run(command)), indent=2))
@@ -0,0 +1,21 @@
+from typing import Any, Dict, Iterable, List, Tuple, get_args, get_origin
+
+_select_lists: Dict[Tuple, str] = {}
+
+def columns_for(model: Any, exclude: Iterable[str] = (), extra: Iterable[str] = ()) -> str:
+    """
+    PostgREST select list for the fields of a response model (or List[model]),
+    so reads fetch only what the response exposes instead of select("*").
+    Every field must be a column created by supabase/migrations, or PostgREST
+    rejects the whole read; exclude fields that are not.
+    """
+    if get_origin(model) in (list, List):
+        model = get_args(model)[0]
+
+    key = (model, tuple(exclude), tuple(extra))
+    if key not in _select_lists:
+        skipped = set(exclude)
+        names = [name for name in model.model_fields if name not in skipped]
+        names += [name for name in extra if name not in names]
+        _select_lists[key] = ", ".join(names)
+    return _select_lists[key]
@@ -0,0 +1,52 @@
+from fastapi import HTTPException, status
+from postgrest.exceptions import APIError
+from database import get_supabase
+from datetime import datetime
+import uuid
+
+RESERVATION_ERRORS = {
+    "BK400": status.HTTP_400_BAD_REQUEST,
+    "BK404": status.HTTP_404_NOT_FOUND,
+    "BK409": status.HTTP_400_BAD_REQUEST,
+    "BK410": status.HTTP_400_BAD_REQUEST,
+    "BK422": status.HTTP_400_BAD_REQUEST,
+}
+
+def new_confirmation_number() -> str:
+    return f"BK{datetime.now().strftime('%Y%m%d')}{str(uuid.uuid4())[:8].upper()}"
+
+def raise_reservation_error(error: APIError):
+    if error.code in RESERVATION_ERRORS:
+        raise HTTPException(
+            status_code=RESERVATION_ERRORS[error.code],
+            detail=error.message
+        )
+    raise error
+
+async def reserve_seat(studid: str, batchid: str, amount: float) -> dict:
+    supabase = get_supabase()
+
+    try:
+        response = await supabase.rpc("reserve_batch_seat", {
+            "p_studid": studid,
+            "p_batchid": batchid,
+            "p_amount": amount,
+            "p_confirmation_number": new_confirmation_number()
+        }).execute()
+    except APIError as e:
+        raise_reservation_error(e)
+
+    return response.data
+
+async def checkout_cart(userid: str, studid: str) -> list:
+    supabase = get_supabase()
+
+    try:
+        response = await supabase.rpc("checkout_cart", {
+            "p_userid": userid,
+            "p_studid": studid
+        }).execute()
+    except APIError as e:
+        raise_reservation_error(e)
+
+    return response.data
@@ -0,0 +1,73 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+from cache import TTLCache
+from config import settings
+from pagination import NEXT_CURSOR_HEADER
+from serialization import get_serializer
+
+catalog_cache = TTLCache(
+    maxsize=settings.catalog_cache_size,
+    ttl=settings.catalog_cache_ttl_seconds
+)
+
+_generations: Dict[str, int] = {}
+_adapters: Dict[Any, TypeAdapter] = {}
+
+def invalidate_catalog(*namespaces: str):
+    for namespace in namespaces:
+        _generations[namespace] = _generations.get(namespace, 0) + 1
+
+def _adapter(model: Any) -> TypeAdapter:
+    if model not in _adapters:
+        _adapters[model] = TypeAdapter(model)
+    return _adapters[model]
+
+def _cache_key(namespace: str, request: Request) -> Tuple:
+    path = request.url.path.rstrip("/") or "/"
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return (namespace, _generations.get(namespace, 0), path, query)
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+async def cached_json(
+    request: Request,
+    namespace: str,
+    model: Any,
+    load: Callable[[Response], Awaitable[Any]]
+) -> Response:
+    key = _cache_key(namespace, request)
+    entry = catalog_cache.get(key)
+
+    if entry is None:
+        scratch = Response()
+        data = await load(scratch)
+
+        if settings.fast_responses:
+            body = get_serializer(model).dumps(data)
+        else:
+            adapter = _adapter(model)
+            body = adapter.dump_json(adapter.validate_python(data))
+        headers = {
+            "ETag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            "Cache-Control": f"public, max-age={settings.catalog_cache_max_age}"
+        }
+        if NEXT_CURSOR_HEADER in scratch.headers:
+            headers[NEXT_CURSOR_HEADER] = scratch.headers[NEXT_CURSOR_HEADER]
+
+        entry = (body, headers)
+        catalog_cache.set(key, entry)
+
+    body, headers = entry
+
+    if _etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,29 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 from schemas import (
     InstituteResponse, ReactivationRequestResponse, ReactivationRequestUpdate,
     BookingResponse
 )
 from database import get_supabase
-from auth import get_current_admin
+from auth import get_current_admin, invalidate_principal, principal_cache, token_cache, revoke_user_tokens
+from platform_stats import fetch_platform_stats, rebuild_platform_stats
+from batch_lifecycle import advance_batches
+from institute_expiry import expire_institutes
+from certificate_renewals import sweep_renewal_reminders
+from sessions import revoke_user_sessions
+from pagination import PageParams, page_params, paginate
+from projection import columns_for
+from exports import ExportFormat, export_response, iter_rows
+from response_cache import catalog_cache, invalidate_catalog
+from serialization import trusted_response
+from jobs import job_runner
+from dgshipping import submission_queue
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 @router.get("/institutes", response_model=List[InstituteResponse])
 async def get_all_institutes(
+    response: Response,
     verified_status: Optional[str] = Query(None),
+    accreditation_expired: Optional[bool] = Query(None),
+    page: PageParams = Depends(page_params),
     admin: dict = Depends(get_current_admin)
 ):
     supabase = get_supabase()
 
-    query = supabase.table("institutes").select("*")
+    query = supabase.table("institutes").select(columns_for(InstituteResponse))
 
     if verified_status:
         query = query.eq("verified_status", verified_status)
 
-    response = query.order("created_at", desc=True).execute()
+    if accreditation_expired is not None:
+        query = query.eq("accreditation_expired", accreditation_expired)
 
-    return response.data
+    rows = await paginate(query, page, response, "created_at", "instid")
+
+    return trusted_response(rows, List[InstituteResponse], response)
 
 @router.put("/institutes/{institute_id}/verify")
 async def verify_institute(
@@ -33,19 +51,37 @@ async def verify_institute(
 ):
     supabase = get_supabase()
 
-    institute = supabase.table("institutes").select("*").eq("instid", institute_id).maybe_single().execute()
+    institute = await supabase.table("institutes").select("instid, userid").eq("instid", institute_id).maybe_single().execute()
 
-    if not institute.data:
+    if institute is None or not institute.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Institute not found"
         )
 
-    response = supabase.table("institutes")\
+    response = await supabase.table("institutes")\
         .update({"verified_status": verified_status})\
         .eq("instid", institute_id)\
         .execute()
 
+    invalidate_principal(institute.data["userid"])
+    invalidate_catalog("institutes")
+
+    await job_runner.enqueue(
+        "notify",
+        user_ids=[institute.data["userid"]],
+        title="Institute verification updated",
+        message=f"Your institute has been {verified_status}.",
+        link="/institutes/me"
+    )
+    await job_runner.enqueue(
+        "audit_log",
+        action=f"institute_{verified_status}",
+        entity_type="institute",
+        entity_ids=[institute_id],
+        actor=admin["userid"]
+    )
+
     return {"message": f"Institute {verified_status} successfully"}
 
 @router.get("/reactivation-requests", response_model=List[ReactivationRequestResponse])
@@ -55,14 +91,14 @@ async def get_all_reactivation_requests(
 ):
     supabase = get_supabase()
 
-    query = supabase.table("institute_reactivation_requests").select("*")
+    query = supabase.table("institute_reactivation_requests").select(columns_for(ReactivationRequestResponse))
 
     if status:
         query = query.eq("status", status)
 
-    response = query.order("submitted_at", desc=True).execute()
+    response = await query.order("submitted_at", desc=True).execute()
 
-    return response.data
+    return trusted_response(response.data, List[ReactivationRequestResponse])
 
 @router.put("/reactivation-requests/{request_id}")
 async def update_reactivation_request(
@@ -70,16 +106,16 @@ async def update_reactivation_request(
     update_data: ReactivationRequestUpdate,
     admin: dict = Depends(get_current_admin)
 ):
-    from datetime import datetime
+    from datetime import date, datetime
     supabase = get_supabase()
 
-    request_data = supabase.table("institute_reactivation_requests")\
-        .select("*")\
+    request_data = await supabase.table("institute_reactivation_requests")\
+        .select("instid, new_accreditation_no, new_valid_from, new_valid_to")\
         .eq("request_id", request_id)\
         .maybe_single()\
         .execute()
 
-    if not request_data.data:
+    if request_data is None or not request_data.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Reactivation request not found"
@@ -91,64 +127,151 @@ async def update_reactivation_request(
         "reviewer_notes": update_data.reviewer_notes
     }
 
-    response = supabase.table("institute_reactivation_requests")\
+    response = await supabase.table("institute_reactivation_requests")\
         .update(update_dict)\
         .eq("request_id", request_id)\
         .execute()
 
     if update_data.status.value == "approved":
         request_info = request_data.data
-        supabase.table("institutes")\
+        institute = await supabase.table("institutes")\
             .update({
                 "accreditation_no": request_info["new_accreditation_no"],
                 "valid_from": request_info["new_valid_from"],
                 "valid_to": request_info["new_valid_to"],
+                "accreditation_expired": str(request_info["new_valid_to"]) < date.today().isoformat(),
                 "verified_status": "verified"
             })\
             .eq("instid", request_info["instid"])\
             .execute()
 
+        for row in institute.data:
+            invalidate_principal(row["userid"])
+            if not row.get("accreditation_expired"):
+                await supabase.table("courses")\
+                    .update({"status": "active", "expiry_deactivated": False})\
+                    .eq("instid", row["instid"])\
+                    .eq("expiry_deactivated", True)\
+                    .execute()
+        invalidate_catalog("institutes", "courses")
+
+    await job_runner.enqueue(
+        "notify",
+        instids=[request_data.data["instid"]],
+        title="Reactivation request reviewed",
+        message=f"Your reactivation request has been {update_data.status.value}.",
+        link="/institutes/me"
+    )
+    await job_runner.enqueue(
+        "audit_log",
+        action=f"reactivation_{update_data.status.value}",
+        entity_type="institute_reactivation_request",
+        entity_ids=[request_id],
+        actor=admin["userid"],
+        remarks=update_data.reviewer_notes
+    )
+
     return {"message": "Reactivation request updated successfully"}
 
 @router.get("/bookings", response_model=List[BookingResponse])
 async def get_all_bookings(
+    response: Response,
     payment_status: Optional[str] = Query(None),
+    page: PageParams = Depends(page_params),
     admin: dict = Depends(get_current_admin)
 ):
     supabase = get_supabase()
 
-    query = supabase.table("bookings").select("*")
+    query = supabase.table("bookings").select(columns_for(BookingResponse))
 
     if payment_status:
         query = query.eq("payment_status", payment_status)
 
-    response = query.order("booking_date", desc=True).execute()
+    rows = await paginate(query, page, response, "booking_date", "bookid")
 
-    return response.data
+    return trusted_response(rows, List[BookingResponse], response)
+
+@router.get("/bookings/export")
+async def export_bookings(
+    format: ExportFormat = Query(ExportFormat.ndjson),
+    payment_status: Optional[str] = Query(None),
+    admin: dict = Depends(get_current_admin)
+):
+    supabase = get_supabase()
+
+    def build_query():
+        query = supabase.table("bookings").select(columns_for(BookingResponse))
+        if payment_status:
+            query = query.eq("payment_status", payment_status)
+        return query
+
+    pages = iter_rows(build_query, "booking_date", "bookid")
+
+    return export_response(pages, format, list(BookingResponse.model_fields), "bookings")
 
 @router.get("/stats")
 async def get_platform_stats(admin: dict = Depends(get_current_admin)):
-    supabase = get_supabase()
+    return await fetch_platform_stats()
+
+@router.post("/stats/rebuild")
+async def rebuild_stats(admin: dict = Depends(get_current_admin)):
+    return await rebuild_platform_stats()
 
-    total_institutes = supabase.table("institutes").select("instid", count="exact").execute()
-    verified_institutes = supabase.table("institutes").select("instid", count="exact").eq("verified_status", "verified").execute()
-    total_students = supabase.table("students").select("studid", count="exact").execute()
-    total_courses = supabase.table("courses").select("courseid", count="exact").execute()
-    active_courses = supabase.table("courses").select("courseid", count="exact").eq("status", "active").execute()
-    total_bookings = supabase.table("bookings").select("bookid", count="exact").execute()
-    completed_bookings = supabase.table("bookings").select("bookid, amount").eq("payment_status", "completed").execute()
+@router.post("/batches/advance-status")
+async def advance_batch_statuses(
+    dry_run: bool = Query(False),
+    admin: dict = Depends(get_current_admin)
+):
+    return await advance_batches(dry_run)
 
-    total_revenue = sum(booking["amount"] for booking in completed_bookings.data) if completed_bookings.data else 0
+@router.post("/institutes/expire")
+async def expire_institute_accreditations(
+    dry_run: bool = Query(False),
+    admin: dict = Depends(get_current_admin)
+):
+    return await expire_institutes(dry_run)
 
+@router.post("/certificates/renewal-reminders")
+async def send_renewal_reminders(
+    response: Response,
+    days: Optional[int] = Query(None, ge=1, le=3650),
+    dry_run: bool = Query(False),
+    admin: dict = Depends(get_current_admin)
+):
+    if dry_run:
+        return await sweep_renewal_reminders(days, dry_run=True)
+
+    job_id = await job_runner.enqueue("certificate_renewal_sweep", days=days)
+    if job_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Background job queue is full, try again shortly"
+        )
+
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {"job_id": job_id}
+
+@router.post("/users/{user_id}/revoke-sessions")
+async def revoke_sessions(user_id: str, admin: dict = Depends(get_current_admin)):
+    revoked = await revoke_user_sessions(user_id)
+    revoke_user_tokens(user_id)
+    invalidate_principal(user_id)
+
+    return {"revoked_sessions": revoked}
+
+@router.get("/job-stats")
+async def get_job_stats(admin: dict = Depends(get_current_admin)):
     return {
-        "total_institutes": total_institutes.count,
-        "verified_institutes": verified_institutes.count,
-        "pending_verification": total_institutes.count - verified_institutes.count,
-        "total_students": total_students.count,
-        "total_courses": total_courses.count,
-        "active_courses": active_courses.count,
-        "total_bookings": total_bookings.count,
-        "total_revenue": total_revenue
+        "jobs": job_runner.stats(),
+        "dgshipping": {"queued_batches": submission_queue.pending_batches()}
+    }
+
+@router.get("/cache-stats")
+async def get_cache_stats(admin: dict = Depends(get_current_admin)):
+    return {
+        "principal": principal_cache.stats(),
+        "token": token_cache.stats(),
+        "catalog": catalog_cache.stats()
     }
 
 @router.get("/institute-course-applications")
@@ -164,7 +287,7 @@ async def get_institute_applications(
     if status:
         query = query.eq("status", status)
 
-    response = query.order("created_at", desc=True).execute()
+    response = await query.order("created_at", desc=True).execute()
 
     return response.data
 
@@ -177,19 +300,19 @@ async def update_application_status(
     from datetime import datetime
     supabase = get_supabase()
 
-    application = supabase.table("institute_course_applications")\
-        .select("*")\
+    application = await supabase.table("institute_course_applications")\
+        .select("application_id, instid")\
         .eq("application_id", application_id)\
         .maybe_single()\
         .execute()
 
-    if not application.data:
+    if application is None or not application.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Application not found"
         )
 
-    response = supabase.table("institute_course_applications")\
+    response = await supabase.table("institute_course_applications")\
         .update({
             "status": new_status,
             "reviewed_at": datetime.utcnow().isoformat()
@@ -197,4 +320,19 @@ async def update_application_status(
         .eq("application_id", application_id)\
         .execute()
 
+    await job_runner.enqueue(
+        "notify",
+        instids=[application.data["instid"]],
+        title="Course application reviewed",
+        message=f"Your course application has been {new_status}.",
+        link="/institutes/me"
+    )
+    await job_runner.enqueue(
+        "audit_log",
+        action=f"course_application_{new_status}",
+        entity_type="institute_course_application",
+        entity_ids=[application_id],
+        actor=admin["userid"]
+    )
+
     return {"message": "Application status updated successfully"}
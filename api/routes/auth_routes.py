@@ -1,13 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from schemas import (
-    UserSignupRequest, UserLoginRequest, TokenResponse,
+    UserSignupRequest, UserLoginRequest, TokenResponse, RefreshTokenRequest,
     StudentRegistrationRequest, InstituteRegistrationRequest,
     UserProfile, StudentResponse, InstituteResponse
 )
 from database import get_supabase
+from auth import security, verify_token, revoke_token, revoke_user_tokens
+from sessions import create_session, rotate_session, revoke_session, revoke_user_sessions
 from jose import jwt
 from datetime import datetime, timedelta
 from config import settings
+import time
 import uuid
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -17,7 +21,7 @@ async def signup_student(request: StudentRegistrationRequest):
     supabase = get_supabase()
 
     try:
-        auth_response = supabase.auth.sign_up({
+        auth_response = await supabase.auth.sign_up({
             "email": request.email,
             "password": request.password
         })
@@ -36,7 +40,7 @@ async def signup_student(request: StudentRegistrationRequest):
             "full_name": request.full_name,
             "role": "student"
         }
-        supabase.table("users").insert(user_data).execute()
+        await supabase.table("users").insert(user_data).execute()
 
         student_data = {
             "userid": user_id,
@@ -51,7 +55,7 @@ async def signup_student(request: StudentRegistrationRequest):
             "state": request.state
         }
 
-        student_response = supabase.table("students").insert(student_data).execute()
+        student_response = await supabase.table("students").insert(student_data).execute()
 
         return student_response.data[0]
 
@@ -66,7 +70,7 @@ async def signup_institute(request: InstituteRegistrationRequest):
     supabase = get_supabase()
 
     try:
-        auth_response = supabase.auth.sign_up({
+        auth_response = await supabase.auth.sign_up({
             "email": request.email,
             "password": request.password
         })
@@ -85,7 +89,7 @@ async def signup_institute(request: InstituteRegistrationRequest):
             "full_name": request.full_name,
             "role": "institute"
         }
-        supabase.table("users").insert(user_data).execute()
+        await supabase.table("users").insert(user_data).execute()
 
         institute_data = {
             "userid": user_id,
@@ -101,7 +105,7 @@ async def signup_institute(request: InstituteRegistrationRequest):
             "verified_status": "pending"
         }
 
-        institute_response = supabase.table("institutes").insert(institute_data).execute()
+        institute_response = await supabase.table("institutes").insert(institute_data).execute()
         institute_id = institute_response.data[0]["instid"]
 
         if request.selected_courses:
@@ -114,7 +118,7 @@ async def signup_institute(request: InstituteRegistrationRequest):
                 })
 
             if applications:
-                supabase.table("institute_course_applications").insert(applications).execute()
+                await supabase.table("institute_course_applications").insert(applications).execute()
 
         return institute_response.data[0]
 
@@ -129,7 +133,7 @@ async def login(request: UserLoginRequest):
     supabase = get_supabase()
 
     try:
-        auth_response = supabase.auth.sign_in_with_password({
+        auth_response = await supabase.auth.sign_in_with_password({
             "email": request.email,
             "password": request.password
         })
@@ -142,25 +146,18 @@ async def login(request: UserLoginRequest):
 
         user_id = auth_response.user.id
 
-        user_response = supabase.table("users").select("*").eq("userid", user_id).maybe_single().execute()
+        user_response = await supabase.table("users").select("userid, role").eq("userid", user_id).maybe_single().execute()
 
-        if not user_response.data:
+        if user_response is None or not user_response.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User profile not found"
             )
 
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-        access_token = create_access_token(
-            data={"sub": user_id, "role": user_response.data["role"]},
-            expires_delta=access_token_expires
-        )
+        role = user_response.data["role"]
+        session_id, refresh_token = await create_session(user_id, role)
 
-        return TokenResponse(
-            access_token=access_token,
-            user_id=user_id,
-            role=user_response.data["role"]
-        )
+        return issue_tokens(user_id, role, session_id, refresh_token)
 
     except Exception as e:
         raise HTTPException(
@@ -168,9 +165,55 @@ async def login(request: UserLoginRequest):
             detail="Invalid credentials"
         )
 
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(request: RefreshTokenRequest):
+    rotated = await rotate_session(request.refresh_token)
+
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
+
+    session, refresh_token = rotated
+    return issue_tokens(session["userid"], session["role"], session["session_id"], refresh_token)
+
+@router.post("/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token_data: dict = Depends(verify_token)
+):
+    if token_data.get("sid"):
+        await revoke_session(token_data["sid"], token_data["sub"])
+    revoke_token(credentials.credentials, token_data)
+
+    return {"message": "Logged out successfully"}
+
+@router.post("/logout-all")
+async def logout_all(token_data: dict = Depends(verify_token)):
+    revoked = await revoke_user_sessions(token_data["sub"])
+    revoke_user_tokens(token_data["sub"])
+
+    return {"revoked_sessions": revoked}
+
+def issue_tokens(user_id: str, role: str, session_id: str, refresh_token: str) -> TokenResponse:
+    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    access_token = create_access_token(
+        data={"sub": user_id, "role": role, "sid": session_id},
+        expires_delta=access_token_expires
+    )
+
+    return TokenResponse(
+        access_token=access_token,
+        expires_in=int(access_token_expires.total_seconds()),
+        refresh_token=refresh_token,
+        user_id=user_id,
+        role=role
+    )
+
 def create_access_token(data: dict, expires_delta: timedelta):
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": time.time()})
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
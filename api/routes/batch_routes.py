@@ -1,45 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from typing import List, Optional
 from schemas import BatchCreateRequest, BatchResponse
 from database import get_supabase
 from auth import get_current_institute, check_institute_expired
+from pagination import PageParams, page_params, paginate
+from projection import columns_for
+from response_cache import cached_json, invalidate_catalog
+from ownership import select_institute_rows, get_institute_row
+from serialization import trusted_response
 
 router = APIRouter(prefix="/batches", tags=["Batches"])
 
 @router.get("/", response_model=List[BatchResponse])
 async def get_batches(
+    request: Request,
     course_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None)
 ):
-    supabase = get_supabase()
+    async def load(response: Response):
+        supabase = get_supabase()
+
+        query = supabase.table("batches").select(columns_for(BatchResponse))
 
-    query = supabase.table("batches").select("*")
+        if course_id:
+            query = query.eq("courseid", course_id)
 
-    if course_id:
-        query = query.eq("courseid", course_id)
+        if status:
+            query = query.eq("batch_status", status)
+        else:
+            query = query.in_("batch_status", ["upcoming", "ongoing"])
 
-    if status:
-        query = query.eq("batch_status", status)
-    else:
-        query = query.in_("batch_status", ["upcoming", "ongoing"])
+        result = await query.order("start_date").execute()
 
-    response = query.order("start_date").execute()
+        return result.data
 
-    return response.data
+    return await cached_json(request, "batches", List[BatchResponse], load)
 
 @router.get("/{batch_id}", response_model=BatchResponse)
-async def get_batch(batch_id: str):
-    supabase = get_supabase()
+async def get_batch(batch_id: str, request: Request):
+    async def load(response: Response):
+        supabase = get_supabase()
 
-    response = supabase.table("batches").select("*").eq("batchid", batch_id).maybe_single().execute()
+        result = await supabase.table("batches").select(columns_for(BatchResponse)).eq("batchid", batch_id).maybe_single().execute()
 
-    if not response.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Batch not found"
-        )
+        if result is None or not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Batch not found"
+            )
 
-    return response.data
+        return result.data
+
+    return await cached_json(request, "batches", BatchResponse, load)
 
 @router.post("/", response_model=BatchResponse, status_code=status.HTTP_201_CREATED)
 async def create_batch(
@@ -54,9 +66,9 @@ async def create_batch(
 
     supabase = get_supabase()
 
-    course = supabase.table("courses").select("*").eq("courseid", request.courseid).maybe_single().execute()
+    course = await supabase.table("courses").select("instid").eq("courseid", request.courseid).maybe_single().execute()
 
-    if not course.data:
+    if course is None or not course.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
@@ -80,31 +92,23 @@ async def create_batch(
         "batch_status": "upcoming"
     }
 
-    response = supabase.table("batches").insert(batch_data).execute()
+    response = await supabase.table("batches").insert(batch_data).execute()
+
+    invalidate_catalog("batches")
 
     return response.data[0]
 
 @router.get("/institute/my-batches", response_model=List[BatchResponse])
-async def get_my_batches(institute: dict = Depends(get_current_institute)):
-    supabase = get_supabase()
-
-    courses_response = supabase.table("courses")\
-        .select("courseid")\
-        .eq("instid", institute["instid"])\
-        .execute()
-
-    course_ids = [c["courseid"] for c in courses_response.data]
+async def get_my_batches(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    institute: dict = Depends(get_current_institute)
+):
+    query = select_institute_rows("batches", institute["instid"], columns_for(BatchResponse))
 
-    if not course_ids:
-        return []
+    rows = await paginate(query, page, response, "start_date", "batchid")
 
-    response = supabase.table("batches")\
-        .select("*")\
-        .in_("courseid", course_ids)\
-        .order("start_date", desc=True)\
-        .execute()
-
-    return response.data
+    return trusted_response(rows, List[BatchResponse], response)
 
 @router.put("/{batch_id}/status")
 async def update_batch_status(
@@ -112,27 +116,20 @@ async def update_batch_status(
     new_status: str,
     institute: dict = Depends(get_current_institute)
 ):
-    supabase = get_supabase()
-
-    batch = supabase.table("batches").select("*").eq("batchid", batch_id).maybe_single().execute()
-
-    if not batch.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Batch not found"
-        )
+    await get_institute_row(
+        "batches", "batchid", batch_id, institute,
+        not_found="Batch not found",
+        forbidden="Not authorized to update this batch",
+        columns="batchid"
+    )
 
-    course = supabase.table("courses").select("*").eq("courseid", batch.data["courseid"]).maybe_single().execute()
-
-    if course.data["instid"] != institute["instid"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this batch"
-        )
+    supabase = get_supabase()
 
-    response = supabase.table("batches")\
+    response = await supabase.table("batches")\
         .update({"batch_status": new_status})\
         .eq("batchid", batch_id)\
         .execute()
 
+    invalidate_catalog("batches")
+
     return {"message": "Batch status updated successfully"}
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from typing import List
 from schemas import BookingCreateRequest, BookingResponse
 from database import get_supabase
 from auth import get_current_student
-import uuid
-from datetime import datetime
+from reservations import reserve_seat
+from pagination import PageParams, page_params, paginate
+from projection import columns_for
+from response_cache import invalidate_catalog
+from serialization import trusted_response
+from jobs import job_runner
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
@@ -13,66 +17,43 @@ async def create_booking(
     request: BookingCreateRequest,
     student: dict = Depends(get_current_student)
 ):
-    supabase = get_supabase()
-
-    batch = supabase.table("batches").select("*").eq("batchid", request.batchid).maybe_single().execute()
-
-    if not batch.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Batch not found"
-        )
-
-    if batch.data["seats_booked"] >= batch.data["seats_total"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Batch is full. No seats available."
-        )
-
-    existing_booking = supabase.table("bookings")\
-        .select("*")\
-        .eq("studid", student["studid"])\
-        .eq("batchid", request.batchid)\
-        .execute()
-
-    if existing_booking.data:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have already booked this batch"
-        )
-
-    confirmation_number = f"BK{datetime.now().strftime('%Y%m%d')}{str(uuid.uuid4())[:8].upper()}"
-
-    booking_data = {
-        "studid": student["studid"],
-        "batchid": request.batchid,
-        "confirmation_number": confirmation_number,
-        "amount": request.amount,
-        "payment_status": "pending",
-        "attendance_status": "not_started",
-        "booking_date": datetime.utcnow().isoformat()
-    }
-
-    response = supabase.table("bookings").insert(booking_data).execute()
-
-    supabase.table("batches")\
-        .update({"seats_booked": batch.data["seats_booked"] + 1})\
-        .eq("batchid", request.batchid)\
-        .execute()
-
-    return response.data[0]
+    booking = await reserve_seat(student["studid"], request.batchid, request.amount)
+
+    invalidate_catalog("batches")
+
+    await job_runner.enqueue("record_commissions", bookids=[booking["bookid"]])
+    await job_runner.enqueue(
+        "notify",
+        user_ids=[student["userid"]],
+        title="Booking received",
+        message=f"Your booking {booking['confirmation_number']} has been received.",
+        link=f"/bookings/{booking['bookid']}"
+    )
+    await job_runner.enqueue(
+        "audit_log",
+        action="booking_created",
+        entity_type="booking",
+        entity_ids=[booking["bookid"]],
+        actor=student["userid"]
+    )
+
+    return booking
 
 @router.get("/my-bookings", response_model=List[BookingResponse])
-async def get_my_bookings(student: dict = Depends(get_current_student)):
+async def get_my_bookings(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    student: dict = Depends(get_current_student)
+):
     supabase = get_supabase()
 
-    response = supabase.table("bookings")\
-        .select("*")\
-        .eq("studid", student["studid"])\
-        .order("booking_date", desc=True)\
-        .execute()
+    query = supabase.table("bookings")\
+        .select(columns_for(BookingResponse))\
+        .eq("studid", student["studid"])
 
-    return response.data
+    rows = await paginate(query, page, response, "booking_date", "bookid")
+
+    return trusted_response(rows, List[BookingResponse], response)
 
 @router.get("/{booking_id}", response_model=BookingResponse)
 async def get_booking(
@@ -81,14 +62,14 @@ async def get_booking(
 ):
     supabase = get_supabase()
 
-    response = supabase.table("bookings")\
-        .select("*")\
+    response = await supabase.table("bookings")\
+        .select(columns_for(BookingResponse))\
         .eq("bookid", booking_id)\
         .eq("studid", student["studid"])\
         .maybe_single()\
         .execute()
 
-    if not response.data:
+    if response is None or not response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Booking not found"
@@ -104,20 +85,20 @@ async def update_payment_status(
 ):
     supabase = get_supabase()
 
-    booking = supabase.table("bookings")\
-        .select("*")\
+    booking = await supabase.table("bookings")\
+        .select("bookid")\
         .eq("bookid", booking_id)\
         .eq("studid", student["studid"])\
         .maybe_single()\
         .execute()
 
-    if not booking.data:
+    if booking is None or not booking.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Booking not found"
         )
 
-    response = supabase.table("bookings")\
+    response = await supabase.table("bookings")\
         .update({"payment_status": payment_status})\
         .eq("bookid", booking_id)\
         .execute()
@@ -125,13 +106,17 @@ async def update_payment_status(
     return {"message": "Payment status updated successfully"}
 
 @router.get("/batch/{batch_id}/bookings", response_model=List[BookingResponse])
-async def get_batch_bookings(batch_id: str):
+async def get_batch_bookings(
+    batch_id: str,
+    response: Response,
+    page: PageParams = Depends(page_params)
+):
     supabase = get_supabase()
 
-    response = supabase.table("bookings")\
-        .select("*")\
-        .eq("batchid", batch_id)\
-        .order("booking_date")\
-        .execute()
+    query = supabase.table("bookings")\
+        .select(columns_for(BookingResponse))\
+        .eq("batchid", batch_id)
 
-    return response.data
+    rows = await paginate(query, page, response, "booking_date", "bookid", desc=False)
+
+    return trusted_response(rows, List[BookingResponse], response)
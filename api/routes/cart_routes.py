@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+from postgrest.exceptions import APIError
+from schemas import CartItemCreateRequest, CartItemResponse, BookingResponse
+from database import get_supabase
+from auth import get_current_student
+from projection import columns_for
+from reservations import checkout_cart
+from response_cache import invalidate_catalog
+from jobs import job_runner
+
+router = APIRouter(prefix="/cart", tags=["Cart"])
+
+@router.get("/", response_model=List[CartItemResponse])
+async def get_cart(student: dict = Depends(get_current_student)):
+    supabase = get_supabase()
+
+    response = await supabase.table("cart_items")\
+        .select(columns_for(CartItemResponse))\
+        .eq("user_id", student["userid"])\
+        .order("added_at")\
+        .execute()
+
+    return response.data
+
+@router.post("/", response_model=CartItemResponse, status_code=status.HTTP_201_CREATED)
+async def add_to_cart(
+    request: CartItemCreateRequest,
+    student: dict = Depends(get_current_student)
+):
+    supabase = get_supabase()
+
+    if request.batch_id:
+        batch = await supabase.table("batches").select("courseid").eq("batchid", request.batch_id).maybe_single().execute()
+
+        if batch is None or not batch.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Batch not found"
+            )
+
+        if batch.data["courseid"] != request.course_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Batch does not belong to this course"
+            )
+    else:
+        course = await supabase.table("courses").select("courseid").eq("courseid", request.course_id).maybe_single().execute()
+
+        if course is None or not course.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
+            )
+
+    try:
+        response = await supabase.table("cart_items").insert({
+            "user_id": student["userid"],
+            "course_id": request.course_id,
+            "batch_id": request.batch_id
+        }).execute()
+    except APIError as e:
+        if e.code == "23505":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Item is already in the cart"
+            )
+        raise
+
+    return response.data[0]
+
+@router.delete("/{cart_item_id}")
+async def remove_from_cart(
+    cart_item_id: str,
+    student: dict = Depends(get_current_student)
+):
+    supabase = get_supabase()
+
+    response = await supabase.table("cart_items")\
+        .delete()\
+        .eq("cart_item_id", cart_item_id)\
+        .eq("user_id", student["userid"])\
+        .execute()
+
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cart item not found"
+        )
+
+    return {"message": "Item removed from cart"}
+
+@router.post("/checkout", response_model=List[BookingResponse], status_code=status.HTTP_201_CREATED)
+async def checkout(student: dict = Depends(get_current_student)):
+    bookings = await checkout_cart(student["userid"], student["studid"])
+
+    invalidate_catalog("batches")
+
+    bookids = [booking["bookid"] for booking in bookings]
+    await job_runner.enqueue("record_commissions", bookids=bookids)
+    await job_runner.enqueue(
+        "notify",
+        user_ids=[student["userid"]],
+        title="Bookings received",
+        message=f"Your {len(bookings)} cart booking(s) have been received.",
+        link="/bookings/my-bookings"
+    )
+    await job_runner.enqueue(
+        "audit_log",
+        action="booking_created",
+        entity_type="booking",
+        entity_ids=bookids,
+        actor=student["userid"],
+        remarks="cart checkout"
+    )
+
+    return bookings
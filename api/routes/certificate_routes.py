@@ -1,8 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from schemas import CertificateCreateRequest, CertificateResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Tuple
+from datetime import date, timedelta
+import calendar
+import uuid
+from schemas import (
+    CertificateCreateRequest, CertificateResponse,
+    CertificateBulkIssueRequest, CertificateBulkIssueResponse,
+    DGShippingBulkUploadRequest, DGShippingBulkUploadResponse,
+    DGShippingSubmissionResponse
+)
 from database import get_supabase
 from auth import get_current_student, get_current_institute
+from pagination import PageParams, page_params, paginate
+from projection import columns_for
+from exports import ExportFormat, export_response, iter_rows
+from ownership import select_institute_rows, get_institute_row
+from serialization import trusted_response
+from bulk import select_in, update_in, insert_chunked
+from dgshipping import submission_queue
+from jobs import job_runner
 
 router = APIRouter(prefix="/certificates", tags=["Certificates"])
 
@@ -13,9 +29,9 @@ async def create_certificate(
 ):
     supabase = get_supabase()
 
-    course = supabase.table("courses").select("*").eq("courseid", request.courseid).maybe_single().execute()
+    course = await supabase.table("courses").select("instid").eq("courseid", request.courseid).maybe_single().execute()
 
-    if not course.data:
+    if course is None or not course.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
@@ -27,8 +43,8 @@ async def create_certificate(
             detail="Not authorized to issue certificates for this course"
         )
 
-    existing = supabase.table("certificates")\
-        .select("*")\
+    existing = await supabase.table("certificates")\
+        .select("certid")\
         .eq("studid", request.studid)\
         .eq("courseid", request.courseid)\
         .execute()
@@ -48,51 +64,327 @@ async def create_certificate(
         "dgshipping_uploaded": False
     }
 
-    response = supabase.table("certificates").insert(certificate_data).execute()
+    response = await supabase.table("certificates").insert(certificate_data).execute()
+    certificate = response.data[0]
 
-    return response.data[0]
+    await job_runner.enqueue(
+        "notify",
+        studids=[request.studid],
+        title="Certificate issued",
+        message=f"Certificate {request.cert_number} has been issued.",
+        link=f"/certificates/{certificate['certid']}"
+    )
+    await job_runner.enqueue(
+        "audit_log",
+        action="certificate_issued",
+        entity_type="certificate",
+        entity_ids=[certificate["certid"]],
+        actor=institute["userid"]
+    )
+
+    return certificate
+
+def new_certificate_number(issue_date: date) -> str:
+    return f"CERT{issue_date.strftime('%Y%m%d')}{uuid.uuid4().hex[:8].upper()}"
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+async def batch_certificate_items(request: CertificateBulkIssueRequest, institute: dict) -> Tuple[str, list, list]:
+    batch = await get_institute_row(
+        "batches", "batchid", request.batch_id, institute,
+        not_found="Batch not found",
+        forbidden="Not authorized to issue certificates for this batch",
+        columns="batchid, courseid",
+        course_columns="instid, validity_months"
+    )
+
+    issue_date = request.issue_date or date.today()
+    expiry_date = request.expiry_date or add_months(issue_date, batch["courses"].get("validity_months") or 60)
+
+    supabase = get_supabase()
+    items, skipped = [], []
+
+    def build_query():
+        return supabase.table("bookings")\
+            .select("bookid, studid, payment_status, booking_date")\
+            .eq("batchid", request.batch_id)
+
+    async for rows in iter_rows(build_query, "booking_date", "bookid", desc=False):
+        for booking in rows:
+            if booking["payment_status"] != "completed":
+                skipped.append({"studid": booking["studid"], "status": "skipped", "detail": "Payment not completed"})
+                continue
+            items.append({
+                "studid": booking["studid"],
+                "batchid": request.batch_id,
+                "cert_number": new_certificate_number(issue_date),
+                "issue_date": issue_date.isoformat(),
+                "expiry_date": expiry_date.isoformat()
+            })
+
+    return batch["courseid"], items, skipped
+
+@router.post("/bulk", response_model=CertificateBulkIssueResponse)
+async def bulk_issue_certificates(
+    request: CertificateBulkIssueRequest,
+    institute: dict = Depends(get_current_institute)
+):
+    if bool(request.batch_id) == bool(request.certificates):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either batch_id or a list of certificates"
+        )
+
+    supabase = get_supabase()
+
+    if request.batch_id:
+        courseid, items, results = await batch_certificate_items(request, institute)
+    else:
+        if not request.courseid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="courseid is required with a list of certificates"
+            )
+
+        course = await supabase.table("courses").select("instid").eq("courseid", request.courseid).maybe_single().execute()
+
+        if course is None or not course.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
+            )
+
+        if course.data["instid"] != institute["instid"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to issue certificates for this course"
+            )
+
+        courseid = request.courseid
+        items = [item.model_dump(mode="json") for item in request.certificates]
+        results = []
+
+    existing_students = {
+        row["studid"] for row in await select_in(
+            lambda: supabase.table("certificates").select("studid").eq("courseid", courseid),
+            "studid", [item["studid"] for item in items]
+        )
+    }
+    # Students in a batch come from its bookings; caller-supplied ones may not exist
+    known_students = None if request.batch_id else {
+        row["studid"] for row in await select_in(
+            lambda: supabase.table("students").select("studid"),
+            "studid", [item["studid"] for item in items]
+        )
+    }
+    # Generated numbers for a batch are fresh; only caller-supplied ones can clash
+    taken_numbers = set() if request.batch_id else {
+        row["cert_number"] for row in await select_in(
+            lambda: supabase.table("certificates").select("cert_number"),
+            "cert_number", [item["cert_number"] for item in items]
+        )
+    }
+
+    rows, seen_students, seen_numbers = [], set(), set()
+    for item in items:
+        detail = None
+        if known_students is not None and item["studid"] not in known_students:
+            detail = "Student not found"
+        elif item["studid"] in existing_students:
+            detail = "Certificate already exists for this student and course"
+        elif item["cert_number"] in taken_numbers or item["cert_number"] in seen_numbers:
+            detail = "Certificate number already in use"
+        elif item["studid"] in seen_students:
+            detail = "Student listed more than once"
+
+        if detail:
+            results.append({**item, "status": "skipped", "detail": detail})
+            continue
+
+        seen_students.add(item["studid"])
+        seen_numbers.add(item["cert_number"])
+        rows.append({**item, "courseid": courseid, "dgshipping_uploaded": False})
+
+    for chunk, inserted, error in await insert_chunked("certificates", rows):
+        if error:
+            results.extend(
+                {**row, "status": "failed", "detail": error.message}
+                for row in chunk
+            )
+            continue
+        results.extend(
+            {**row, "status": "issued", "certid": row["certid"]}
+            for row in inserted
+        )
+
+    counts = {"issued": 0, "skipped": 0, "failed": 0}
+    for result in results:
+        counts[result["status"]] += 1
+
+    issued = [result for result in results if result["status"] == "issued"]
+    if issued:
+        await job_runner.enqueue(
+            "notify",
+            studids=[result["studid"] for result in issued],
+            title="Certificate issued",
+            message="A new certificate has been issued to you.",
+            link="/certificates/my-certificates"
+        )
+        await job_runner.enqueue(
+            "audit_log",
+            action="certificate_issued",
+            entity_type="certificate",
+            entity_ids=[result["certid"] for result in issued],
+            actor=institute["userid"],
+            remarks="bulk issue"
+        )
+
+    return {**counts, "results": results}
+
+@router.put(
+    "/bulk/dgshipping-upload",
+    response_model=DGShippingBulkUploadResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def bulk_update_dgshipping_status(
+    request: DGShippingBulkUploadRequest,
+    institute: dict = Depends(get_current_institute)
+):
+    supabase = get_supabase()
+    certificate_ids = list(dict.fromkeys(request.certificate_ids))
+
+    if not submission_queue.accepts(len(certificate_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="DGShipping submission queue is full, try again shortly",
+            headers={"Retry-After": "30"}
+        )
+
+    rows = await select_in(
+        lambda: supabase.table("certificates")
+            .select("certid, studid, courseid, cert_number, issue_date, expiry_date, courses(instid)"),
+        "certid", certificate_ids
+    )
+
+    found = {row["certid"] for row in rows}
+    owned = [
+        row for row in rows
+        if (row.get("courses") or {}).get("instid") == institute["instid"]
+    ]
+    owned_ids = {row["certid"] for row in owned}
+    forbidden = [certid for certid in certificate_ids if certid in found and certid not in owned_ids]
+    not_found = [certid for certid in certificate_ids if certid not in found]
+
+    if not owned:
+        return {"updated": 0, "not_found": not_found, "forbidden": forbidden}
+
+    updated = await update_in(
+        "certificates",
+        {"dgshipping_uploaded": True, "dgshipping_upload_date": date.today().isoformat()},
+        "certid", list(owned_ids)
+    )
+
+    submission = submission_queue.submit(institute["instid"], [
+        {key: value for key, value in row.items() if key != "courses"}
+        for row in owned
+    ])
+
+    await job_runner.enqueue(
+        "audit_log",
+        action="dgshipping_uploaded",
+        entity_type="certificate",
+        entity_ids=list(owned_ids),
+        actor=institute["userid"],
+        remarks=f"submission {submission['submission_id']}"
+    )
+
+    return {
+        "updated": len(updated),
+        "not_found": not_found,
+        "forbidden": forbidden,
+        "submission_id": submission["submission_id"]
+    }
+
+@router.get("/dgshipping-submissions/{submission_id}", response_model=DGShippingSubmissionResponse)
+async def get_dgshipping_submission(
+    submission_id: str,
+    institute: dict = Depends(get_current_institute)
+):
+    submission = submission_queue.get(submission_id)
+
+    if submission is None or submission["instid"] != institute["instid"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Submission not found"
+        )
+
+    return {**submission, "results": list(submission["results"].values())}
 
 @router.get("/my-certificates", response_model=List[CertificateResponse])
 async def get_my_certificates(student: dict = Depends(get_current_student)):
     supabase = get_supabase()
 
-    response = supabase.table("certificates")\
-        .select("*")\
+    response = await supabase.table("certificates")\
+        .select(columns_for(CertificateResponse))\
         .eq("studid", student["studid"])\
         .order("issue_date", desc=True)\
         .execute()
 
-    return response.data
+    return trusted_response(response.data, List[CertificateResponse])
 
-@router.get("/institute/my-certificates", response_model=List[CertificateResponse])
-async def get_institute_certificates(institute: dict = Depends(get_current_institute)):
+@router.get("/my-certificates/expiring", response_model=List[CertificateResponse])
+async def get_my_expiring_certificates(
+    days: int = Query(90, ge=1, le=3650),
+    student: dict = Depends(get_current_student)
+):
     supabase = get_supabase()
+    today = date.today()
 
-    courses_response = supabase.table("courses")\
-        .select("courseid")\
-        .eq("instid", institute["instid"])\
+    response = await supabase.table("certificates")\
+        .select(columns_for(CertificateResponse))\
+        .eq("studid", student["studid"])\
+        .eq("status", "valid")\
+        .gte("expiry_date", today.isoformat())\
+        .lte("expiry_date", (today + timedelta(days=days)).isoformat())\
+        .order("expiry_date")\
         .execute()
 
-    course_ids = [c["courseid"] for c in courses_response.data]
+    return trusted_response(response.data, List[CertificateResponse])
 
-    if not course_ids:
-        return []
+@router.get("/institute/my-certificates", response_model=List[CertificateResponse])
+async def get_institute_certificates(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    institute: dict = Depends(get_current_institute)
+):
+    query = select_institute_rows("certificates", institute["instid"], columns_for(CertificateResponse))
 
-    response = supabase.table("certificates")\
-        .select("*")\
-        .in_("courseid", course_ids)\
-        .order("issue_date", desc=True)\
-        .execute()
+    rows = await paginate(query, page, response, "issue_date", "certid")
 
-    return response.data
+    return trusted_response(rows, List[CertificateResponse], response)
+
+@router.get("/institute/my-certificates/export")
+async def export_institute_certificates(
+    format: ExportFormat = Query(ExportFormat.ndjson),
+    institute: dict = Depends(get_current_institute)
+):
+    def build_query():
+        return select_institute_rows("certificates", institute["instid"], columns_for(CertificateResponse))
+
+    pages = iter_rows(build_query, "issue_date", "certid")
+
+    return export_response(pages, format, list(CertificateResponse.model_fields), "certificates")
 
 @router.get("/{certificate_id}", response_model=CertificateResponse)
 async def get_certificate(certificate_id: str):
     supabase = get_supabase()
 
-    response = supabase.table("certificates").select("*").eq("certid", certificate_id).maybe_single().execute()
+    response = await supabase.table("certificates").select(columns_for(CertificateResponse)).eq("certid", certificate_id).maybe_single().execute()
 
-    if not response.data:
+    if response is None or not response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Certificate not found"
@@ -105,25 +397,26 @@ async def update_dgshipping_status(
     certificate_id: str,
     institute: dict = Depends(get_current_institute)
 ):
-    supabase = get_supabase()
+    await get_institute_row(
+        "certificates", "certid", certificate_id, institute,
+        not_found="Certificate not found",
+        forbidden="Not authorized to update this certificate",
+        columns="certid"
+    )
 
-    certificate = supabase.table("certificates").select("*, courses(instid)").eq("certid", certificate_id).maybe_single().execute()
-
-    if not certificate.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Certificate not found"
-        )
-
-    if certificate.data["courses"]["instid"] != institute["instid"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this certificate"
-        )
+    supabase = get_supabase()
 
-    response = supabase.table("certificates")\
-        .update({"dgshipping_uploaded": True})\
+    response = await supabase.table("certificates")\
+        .update({"dgshipping_uploaded": True, "dgshipping_upload_date": date.today().isoformat()})\
         .eq("certid", certificate_id)\
         .execute()
 
+    await job_runner.enqueue(
+        "audit_log",
+        action="dgshipping_uploaded",
+        entity_type="certificate",
+        entity_ids=[certificate_id],
+        actor=institute["userid"]
+    )
+
     return {"message": "DGShipping upload status updated successfully"}
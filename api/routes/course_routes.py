@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from typing import List, Optional
 from schemas import (
     CourseCreateRequest, CourseResponse, MasterCourseResponse,
@@ -6,61 +6,84 @@ from schemas import (
 )
 from database import get_supabase
 from auth import get_current_institute, check_institute_expired
+from pagination import PageParams, page_params, paginate
+from projection import columns_for
+from response_cache import cached_json, invalidate_catalog
+from serialization import trusted_response
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
 @router.get("/master-courses", response_model=List[MasterCourseResponse])
-async def get_master_courses():
-    supabase = get_supabase()
+async def get_master_courses(request: Request):
+    async def load(response: Response):
+        supabase = get_supabase()
 
-    response = supabase.table("master_courses")\
-        .select("*")\
-        .eq("is_active", True)\
-        .order("course_name")\
-        .execute()
+        result = await supabase.table("master_courses")\
+            .select(columns_for(MasterCourseResponse))\
+            .eq("is_active", True)\
+            .order("course_name")\
+            .execute()
 
-    return response.data
+        return result.data
+
+    return await cached_json(request, "master_courses", List[MasterCourseResponse], load)
 
 @router.get("/", response_model=List[CourseResponse])
 async def get_courses(
+    request: Request,
     type: Optional[str] = Query(None),
     mode: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    limit: Optional[int] = Query(100)
+    page: PageParams = Depends(page_params)
 ):
-    supabase = get_supabase()
+    # Search results are ranked by relevance and come back as a single page
+    if search and page.cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor cannot be combined with search; raise limit instead"
+        )
 
-    query = supabase.table("courses").select("*").eq("status", "active")
+    async def load(response: Response):
+        supabase = get_supabase()
 
-    if type:
-        query = query.eq("type", type)
+        if search:
+            result = await supabase.rpc("search_courses", {
+                "p_query": search,
+                "p_type": type,
+                "p_mode": mode,
+                "p_limit": page.limit
+            }).execute()
 
-    if mode:
-        query = query.eq("mode", mode)
+            return result.data
 
-    if search:
-        query = query.ilike("title", f"%{search}%")
+        query = supabase.table("courses").select(columns_for(CourseResponse)).eq("status", "active")
 
-    if limit:
-        query = query.limit(limit)
+        if type:
+            query = query.eq("type", type)
 
-    response = query.order("created_at", desc=True).execute()
+        if mode:
+            query = query.eq("mode", mode)
 
-    return response.data
+        return await paginate(query, page, response, "created_at", "courseid")
+
+    return await cached_json(request, "courses", List[CourseResponse], load)
 
 @router.get("/{course_id}", response_model=CourseResponse)
-async def get_course(course_id: str):
-    supabase = get_supabase()
+async def get_course(course_id: str, request: Request):
+    async def load(response: Response):
+        supabase = get_supabase()
 
-    response = supabase.table("courses").select("*").eq("courseid", course_id).maybe_single().execute()
+        result = await supabase.table("courses").select(columns_for(CourseResponse)).eq("courseid", course_id).maybe_single().execute()
 
-    if not response.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
-        )
+        if result is None or not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
+            )
 
-    return response.data
+        return result.data
+
+    return await cached_json(request, "courses", CourseResponse, load)
 
 @router.post("/", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
 async def create_course(
@@ -95,7 +118,9 @@ async def create_course(
         "status": "active"
     }
 
-    response = supabase.table("courses").insert(course_data).execute()
+    response = await supabase.table("courses").insert(course_data).execute()
+
+    invalidate_catalog("courses")
 
     return response.data[0]
 
@@ -103,13 +128,13 @@ async def create_course(
 async def get_my_courses(institute: dict = Depends(get_current_institute)):
     supabase = get_supabase()
 
-    response = supabase.table("courses")\
-        .select("*")\
+    response = await supabase.table("courses")\
+        .select(columns_for(CourseResponse))\
         .eq("instid", institute["instid"])\
         .order("created_at", desc=True)\
         .execute()
 
-    return response.data
+    return trusted_response(response.data, List[CourseResponse])
 
 @router.put("/{course_id}/status")
 async def update_course_status(
@@ -119,9 +144,9 @@ async def update_course_status(
 ):
     supabase = get_supabase()
 
-    course = supabase.table("courses").select("*").eq("courseid", course_id).maybe_single().execute()
+    course = await supabase.table("courses").select("instid").eq("courseid", course_id).maybe_single().execute()
 
-    if not course.data:
+    if course is None or not course.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
@@ -133,9 +158,11 @@ async def update_course_status(
             detail="Not authorized to update this course"
         )
 
-    response = supabase.table("courses")\
-        .update({"status": status})\
+    response = await supabase.table("courses")\
+        .update({"status": status, "expiry_deactivated": False})\
         .eq("courseid", course_id)\
         .execute()
 
+    invalidate_catalog("courses")
+
     return {"message": "Course status updated successfully"}
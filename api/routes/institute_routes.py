@@ -1,28 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from typing import List
 from schemas import InstituteResponse, ReactivationRequestCreate, ReactivationRequestResponse
 from database import get_supabase
 from auth import get_current_institute, check_institute_expired
+from response_cache import cached_json
+from projection import columns_for
+from serialization import trusted_response
 
 router = APIRouter(prefix="/institutes", tags=["Institutes"])
 
 @router.get("/me", response_model=InstituteResponse)
 async def get_my_institute(institute: dict = Depends(get_current_institute)):
-    return institute
+    supabase = get_supabase()
+
+    response = await supabase.table("institutes").select("documents").eq("instid", institute["instid"]).maybe_single().execute()
+
+    return {**institute, "documents": response.data["documents"] if response and response.data else None}
 
 @router.get("/{institute_id}", response_model=InstituteResponse)
-async def get_institute(institute_id: str):
-    supabase = get_supabase()
+async def get_institute(institute_id: str, request: Request):
+    async def load(response: Response):
+        supabase = get_supabase()
 
-    response = supabase.table("institutes").select("*").eq("instid", institute_id).maybe_single().execute()
+        result = await supabase.table("institutes").select(columns_for(InstituteResponse)).eq("instid", institute_id).maybe_single().execute()
 
-    if not response.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Institute not found"
-        )
+        if result is None or not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Institute not found"
+            )
+
+        return result.data
 
-    return response.data
+    return await cached_json(request, "institutes", InstituteResponse, load)
 
 @router.post("/reactivation-request", response_model=ReactivationRequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_reactivation_request(
@@ -37,8 +47,8 @@ async def create_reactivation_request(
             detail="Institute accreditation is still valid"
         )
 
-    existing = supabase.table("institute_reactivation_requests")\
-        .select("*")\
+    existing = await supabase.table("institute_reactivation_requests")\
+        .select("request_id")\
         .eq("instid", institute["instid"])\
         .eq("status", "pending")\
         .execute()
@@ -58,7 +68,7 @@ async def create_reactivation_request(
         "status": "pending"
     }
 
-    response = supabase.table("institute_reactivation_requests").insert(reactivation_data).execute()
+    response = await supabase.table("institute_reactivation_requests").insert(reactivation_data).execute()
 
     return response.data[0]
 
@@ -66,10 +76,10 @@ async def create_reactivation_request(
 async def get_my_reactivation_requests(institute: dict = Depends(get_current_institute)):
     supabase = get_supabase()
 
-    response = supabase.table("institute_reactivation_requests")\
-        .select("*")\
+    response = await supabase.table("institute_reactivation_requests")\
+        .select(columns_for(ReactivationRequestResponse))\
         .eq("instid", institute["instid"])\
         .order("submitted_at", desc=True)\
         .execute()
 
-    return response.data
+    return trusted_response(response.data, List[ReactivationRequestResponse])
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from schemas import StudentResponse
 from database import get_supabase
-from auth import get_current_student
+from auth import get_current_user, get_current_student, get_current_institute, check_institute_expired, invalidate_principal
+from projection import columns_for
+from exports import ExportFormat
+from student_import import import_students, import_response
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
@@ -9,6 +12,27 @@ router = APIRouter(prefix="/students", tags=["Students"])
 async def get_my_profile(student: dict = Depends(get_current_student)):
     return student
 
+@router.post("/import")
+async def bulk_import_students(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.csv),
+    current_user: dict = Depends(get_current_user)
+):
+    if current_user["role"] == "institute":
+        institute = await get_current_institute(current_user)
+        if check_institute_expired(institute) or institute["verified_status"] != "verified":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Institute must be verified and accredited to import students"
+            )
+    elif current_user["role"] != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. Institute or admin role required."
+        )
+
+    return import_response(import_students(request.stream(), format, actor=current_user["userid"]))
+
 @router.put("/me", response_model=StudentResponse)
 async def update_my_profile(
     update_data: dict,
@@ -29,20 +53,22 @@ async def update_my_profile(
             detail="No valid fields to update"
         )
 
-    response = supabase.table("students")\
+    response = await supabase.table("students")\
         .update(update_dict)\
         .eq("studid", student["studid"])\
         .execute()
 
+    invalidate_principal(student["userid"])
+
     return response.data[0]
 
 @router.get("/{student_id}", response_model=StudentResponse)
 async def get_student(student_id: str):
     supabase = get_supabase()
 
-    response = supabase.table("students").select("*").eq("studid", student_id).maybe_single().execute()
+    response = await supabase.table("students").select(columns_for(StudentResponse)).eq("studid", student_id).maybe_single().execute()
 
-    if not response.data:
+    if response is None or not response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
@@ -62,9 +62,14 @@ class UserLoginRequest(BaseModel):
     email: EmailStr
     password: str
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    expires_in: int
+    refresh_token: str
     user_id: str
     role: str
 
@@ -115,6 +120,7 @@ class InstituteResponse(BaseModel):
     city: Optional[str] = None
     state: Optional[str] = None
     verified_status: str
+    accreditation_expired: bool = False
     documents: Optional[Any] = None
     created_at: Optional[datetime] = None
 
@@ -195,6 +201,17 @@ class BookingResponse(BaseModel):
     booking_date: datetime
     created_at: Optional[datetime] = None
 
+class CartItemCreateRequest(BaseModel):
+    course_id: str
+    batch_id: Optional[str] = None
+
+class CartItemResponse(BaseModel):
+    cart_item_id: str
+    user_id: str
+    course_id: str
+    batch_id: Optional[str] = None
+    added_at: Optional[datetime] = None
+
 class CertificateCreateRequest(BaseModel):
     studid: str
     courseid: str
@@ -212,6 +229,59 @@ class CertificateResponse(BaseModel):
     dgshipping_uploaded: bool
     created_at: Optional[datetime] = None
 
+class CertificateBulkItem(BaseModel):
+    studid: str
+    cert_number: str
+    issue_date: date
+    expiry_date: date
+
+class CertificateBulkIssueRequest(BaseModel):
+    batch_id: Optional[str] = None
+    courseid: Optional[str] = None
+    certificates: List[CertificateBulkItem] = Field(default=[], max_length=10000)
+    issue_date: Optional[date] = None
+    expiry_date: Optional[date] = None
+
+class CertificateBulkResult(BaseModel):
+    studid: str
+    cert_number: Optional[str] = None
+    status: str
+    certid: Optional[str] = None
+    detail: Optional[str] = None
+
+class CertificateBulkIssueResponse(BaseModel):
+    issued: int
+    skipped: int
+    failed: int
+    results: List[CertificateBulkResult]
+
+class DGShippingBulkUploadRequest(BaseModel):
+    certificate_ids: List[str] = Field(min_length=1, max_length=5000)
+
+class DGShippingBulkUploadResponse(BaseModel):
+    updated: int
+    not_found: List[str]
+    forbidden: List[str]
+    submission_id: Optional[str] = None
+
+class DGShippingSubmissionResult(BaseModel):
+    certid: str
+    status: str
+    attempts: int
+    reference: Optional[str] = None
+    detail: Optional[str] = None
+
+class DGShippingSubmissionResponse(BaseModel):
+    submission_id: str
+    status: str
+    total: int
+    submitted: int
+    failed: int
+    pending: int
+    created_at: datetime
+    updated_at: datetime
+    results: List[DGShippingSubmissionResult]
+
 class ReactivationRequestCreate(BaseModel):
     new_accreditation_no: str
     new_valid_from: date
@@ -0,0 +1,123 @@
+"""
+Refresh-token sessions.
+
+Login opens one auth_sessions row per signed-in client and returns a refresh
+token of the form `<session_id>.<secret>`. Only the SHA-256 digest of the
+secret is stored. POST /auth/refresh swaps the secret for a new one with a
+single conditional UPDATE on (session_id, digest), so each refresh token
+works once and refreshing never calls Supabase auth. The digest it replaced is
+kept as previous_token_hash: presenting that just-rotated refresh token again
+revokes the session, since it means the token was copied. Any other wrong
+secret is rejected without touching the session, so knowing a session id
+(it is in every access token) is not enough to sign its user out.
+
+Expired and revoked rows are deleted every SESSION_PURGE_INTERVAL_SECONDS.
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from postgrest.types import CountMethod, ReturnMethod
+from config import settings
+from database import get_supabase
+
+def _digest(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _expires_at(now: datetime) -> str:
+    return (now + timedelta(days=settings.refresh_token_expire_days)).isoformat()
+
+def _parse(refresh_token: str) -> Optional[Tuple[str, str]]:
+    session_id, _, secret = refresh_token.partition(".")
+    try:
+        uuid.UUID(session_id)
+    except ValueError:
+        return None
+    return (session_id, secret) if secret else None
+
+async def create_session(user_id: str, role: str) -> Tuple[str, str]:
+    """(session id, refresh token) for a new session."""
+    supabase = get_supabase()
+    session_id = str(uuid.uuid4())
+    secret = secrets.token_urlsafe(32)
+    now = _now()
+
+    await supabase.table("auth_sessions").insert({
+        "session_id": session_id,
+        "userid": user_id,
+        "role": role,
+        "token_hash": _digest(secret),
+        "expires_at": _expires_at(now)
+    }, returning=ReturnMethod.minimal).execute()
+
+    return session_id, f"{session_id}.{secret}"
+
+async def rotate_session(refresh_token: str) -> Optional[Tuple[dict, str]]:
+    """(session, new refresh token), or None if the token is not current."""
+    parsed = _parse(refresh_token)
+    if not parsed:
+        return None
+    session_id, secret = parsed
+
+    supabase = get_supabase()
+    new_secret = secrets.token_urlsafe(32)
+    now = _now()
+
+    response = await supabase.table("auth_sessions")\
+        .update({
+            "token_hash": _digest(new_secret),
+            "previous_token_hash": _digest(secret),
+            "last_used_at": now.isoformat(),
+            "expires_at": _expires_at(now)
+        })\
+        .eq("session_id", session_id)\
+        .eq("token_hash", _digest(secret))\
+        .is_("revoked_at", "null")\
+        .gt("expires_at", now.isoformat())\
+        .execute()
+
+    if response.data:
+        return response.data[0], f"{session_id}.{new_secret}"
+
+    await supabase.table("auth_sessions")\
+        .update({"revoked_at": now.isoformat()}, returning=ReturnMethod.minimal)\
+        .eq("session_id", session_id)\
+        .eq("previous_token_hash", _digest(secret))\
+        .is_("revoked_at", "null")\
+        .execute()
+    return None
+
+async def revoke_session(session_id: str, user_id: str) -> bool:
+    supabase = get_supabase()
+    response = await supabase.table("auth_sessions")\
+        .update({"revoked_at": _now().isoformat()}, count=CountMethod.exact, returning=ReturnMethod.minimal)\
+        .eq("session_id", session_id)\
+        .eq("userid", user_id)\
+        .is_("revoked_at", "null")\
+        .execute()
+    return bool(response.count)
+
+async def revoke_user_sessions(user_id: str) -> int:
+    supabase = get_supabase()
+    response = await supabase.table("auth_sessions")\
+        .update({"revoked_at": _now().isoformat()}, count=CountMethod.exact, returning=ReturnMethod.minimal)\
+        .eq("userid", user_id)\
+        .is_("revoked_at", "null")\
+        .execute()
+    return response.count or 0
+
+async def purge_sessions() -> dict:
+    supabase = get_supabase()
+    now = _now().isoformat()
+    purged = {}
+    for column in ("expires_at", "revoked_at"):
+        response = await supabase.table("auth_sessions")\
+            .delete(count=CountMethod.exact, returning=ReturnMethod.minimal)\
+            .lt(column, now)\
+            .execute()
+        purged[column] = response.count or 0
+    return {"expired": purged["expires_at"], "revoked": purged["revoked_at"]}
@@ -0,0 +1,108 @@
+"""
+Background job handlers for post-write side effects, run by jobs.job_runner.
+"""
+from typing import List, Optional
+from bulk import select_in
+from database import get_supabase
+from jobs import job
+
+DEFAULT_COMMISSION_PERCENT = 10.0
+
+@job("notify")
+async def notify(
+    title: str,
+    message: str,
+    user_ids: List[str] = (),
+    studids: List[str] = (),
+    instids: List[str] = (),
+    link: Optional[str] = None
+):
+    """One in_app notification per recipient, as a single insert."""
+    supabase = get_supabase()
+    recipients = list(user_ids)
+
+    if studids:
+        recipients += [row["userid"] for row in await select_in(
+            lambda: supabase.table("students").select("userid"), "studid", studids
+        )]
+    if instids:
+        recipients += [row["userid"] for row in await select_in(
+            lambda: supabase.table("institutes").select("userid"), "instid", instids
+        )]
+
+    rows = [
+        {"user_id": user_id, "type": "in_app", "title": title, "message": message, "link": link}
+        for user_id in dict.fromkeys(recipients) if user_id
+    ]
+    if rows:
+        await supabase.table("notifications").insert(rows).execute()
+
+@job("audit_log")
+async def audit_log(
+    action: str,
+    entity_type: str,
+    entity_ids: List[str],
+    actor: Optional[str] = None,
+    remarks: Optional[str] = None
+):
+    supabase = get_supabase()
+
+    await supabase.table("logs").insert([
+        {"actor": actor, "action": action, "entity_type": entity_type, "entity_id": entity_id, "remarks": remarks}
+        for entity_id in entity_ids
+    ]).execute()
+
+async def _default_commission_percents(instids: List[str]) -> dict:
+    supabase = get_supabase()
+
+    rows = await select_in(
+        lambda: supabase.table("institute_commissions").select("instid, default_commission_percent"),
+        "instid", instids
+    )
+    config = await supabase.table("platform_configuration")\
+        .select("config_value")\
+        .eq("config_key", "default_commission_percent")\
+        .maybe_single()\
+        .execute()
+
+    platform_default = float(config.data["config_value"]) if config is not None and config.data else DEFAULT_COMMISSION_PERCENT
+    percents = {instid: platform_default for instid in instids}
+    percents.update({row["instid"]: float(row["default_commission_percent"]) for row in rows})
+    return percents
+
+@job("record_commissions")
+async def record_commissions(bookids: List[str]):
+    """
+    Platform commission per booking: the course's commission_percent, else the
+    institute's default, else the platform default. Upserts on bookid, so a
+    retried job does not double count.
+    """
+    supabase = get_supabase()
+
+    bookings = await select_in(
+        lambda: supabase.table("bookings").select("bookid, amount, batches(courseid, courses(instid, commission_percent))"),
+        "bookid", bookids
+    )
+    bookings = [booking for booking in bookings if (booking.get("batches") or {}).get("courses")]
+    if not bookings:
+        return
+
+    courses = {booking["bookid"]: {**booking["batches"]["courses"], "courseid": booking["batches"]["courseid"]} for booking in bookings}
+    defaults = await _default_commission_percents(list({course["instid"] for course in courses.values()}))
+
+    rows = []
+    for booking in bookings:
+        course = courses[booking["bookid"]]
+        percent = course.get("commission_percent")
+        percent = float(percent) if percent is not None else defaults[course["instid"]]
+        amount = float(booking["amount"] or 0)
+        rows.append({
+            "bookid": booking["bookid"],
+            "instid": course["instid"],
+            "courseid": course["courseid"],
+            "booking_amount": amount,
+            "commission_percent": percent,
+            "commission_amount": round(amount * percent / 100, 2)
+        })
+
+    await supabase.table("booking_commissions").upsert(rows, on_conflict="bookid").execute()
@@ -0,0 +1,242 @@
+"""
+Bulk student import.
+
+Reads a CSV (with a header row) or NDJSON upload as it streams in and handles
+it STUDENT_IMPORT_BATCH_SIZE rows at a time. Each row is validated with
+StudentRegistrationRequest, and rows whose email is already registered are
+skipped. Accounts are created with at most STUDENT_IMPORT_CONCURRENCY sign-ups
+in flight, then the users and students rows go in as multi-row inserts. One
+NDJSON result per row is streamed back as each batch finishes, followed by a
+summary line. Memory use is bounded by the batch size, not the upload size.
+"""
+import asyncio
+import codecs
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from bulk import insert_chunked, select_in
+from config import settings
+from database import get_supabase
+from exports import ExportFormat
+from jobs import job_runner
+from schemas import StudentRegistrationRequest
+
+STUDENT_COLUMNS = [
+    "date_of_birth", "phone", "cdc_number", "indos_number", "rank", "address", "city", "state"
+]
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def parse_rows(
+    chunks: AsyncIterator[bytes],
+    format: ExportFormat
+) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(line number, row, parse error) for each non-blank record."""
+    line_no = 0
+
+    if format == ExportFormat.ndjson:
+        async for line in _lines(chunks):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, row, None
+        return
+
+    header, record, start = None, "", 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not record:
+            start = line_no
+        record += line
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            record += "\n"
+            continue
+
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        if len(values) != len(header):
+            yield start, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, {column: value for column, value in zip(header, values) if value != ""}, None
+
+    if record:
+        yield start, None, "Unterminated quoted field"
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+async def _import_batch(batch: List[tuple], semaphore: asyncio.Semaphore) -> List[dict]:
+    supabase = get_supabase()
+    results = []
+    valid = []
+
+    for line, row, error in batch:
+        result = {"line": line, "email": (row or {}).get("email")}
+        results.append(result)
+        if error is None:
+            try:
+                valid.append((result, StudentRegistrationRequest.model_validate(row)))
+                continue
+            except ValidationError as e:
+                error = _validation_detail(e)
+        result.update(status="invalid", detail=error)
+
+    registered = {
+        row["email"].lower() for row in await select_in(
+            lambda: supabase.table("users").select("email"),
+            "email", [request.email for _, request in valid]
+        )
+    }
+
+    pending, seen = [], set()
+    for result, request in valid:
+        email = request.email.lower()
+        result["email"] = request.email
+        if email in registered:
+            result.update(status="skipped", detail="Email already registered")
+        elif email in seen:
+            result.update(status="skipped", detail="Email listed more than once")
+        else:
+            seen.add(email)
+            pending.append((result, request))
+
+    async def sign_up(request: StudentRegistrationRequest) -> Tuple[Optional[str], Optional[str]]:
+        async with semaphore:
+            try:
+                response = await supabase.auth.sign_up({"email": request.email, "password": request.password})
+            except Exception as e:
+                return None, str(e)
+        if not response.user:
+            return None, "Failed to create user account"
+        return response.user.id, None
+
+    accounts = await asyncio.gather(*[sign_up(request) for _, request in pending])
+
+    created = {}
+    for (result, request), (user_id, error) in zip(pending, accounts):
+        if error:
+            result.update(status="failed", detail=error)
+            continue
+        result["userid"] = user_id
+        created[user_id] = (result, request)
+
+    users = [
+        {"userid": user_id, "email": request.email, "full_name": request.full_name, "role": "student"}
+        for user_id, (_, request) in created.items()
+    ]
+    students = []
+    for chunk, _, error in await insert_chunked("users", users):
+        for row in chunk:
+            result, request = created[row["userid"]]
+            if error:
+                result.update(status="failed", detail=error.message)
+                continue
+            students.append({
+                "userid": row["userid"],
+                "full_name": request.full_name,
+                **request.model_dump(mode="json", include=set(STUDENT_COLUMNS))
+            })
+
+    for chunk, inserted, error in await insert_chunked("students", students):
+        if error:
+            for row in chunk:
+                created[row["userid"]][0].update(status="failed", detail=error.message)
+            continue
+        for row in inserted:
+            created[row["userid"]][0].update(status="created", studid=row["studid"])
+
+    return results
+
+async def import_students(
+    chunks: AsyncIterator[bytes],
+    format: ExportFormat,
+    actor: Optional[str] = None
+) -> AsyncIterator[dict]:
+    """One result per row: created, skipped, invalid or failed."""
+    semaphore = asyncio.Semaphore(settings.student_import_concurrency)
+    batch, rows, cut_off = [], 0, None
+
+    async def flush(batch: List[tuple]) -> List[dict]:
+        results = await _import_batch(batch, semaphore)
+        studids = [result["studid"] for result in results if result["status"] == "created"]
+        if studids:
+            await job_runner.enqueue(
+                "audit_log",
+                action="student_imported",
+                entity_type="student",
+                entity_ids=studids,
+                actor=actor,
+                remarks="bulk import"
+            )
+        return results
+
+    async for line, row, error in parse_rows(chunks, format):
+        rows += 1
+        if rows > settings.student_import_max_rows:
+            cut_off = line
+            break
+        batch.append((line, row, error))
+        if len(batch) >= settings.student_import_batch_size:
+            for result in await flush(batch):
+                yield result
+            batch = []
+
+    if batch:
+        for result in await flush(batch):
+            yield result
+
+    if cut_off is not None:
+        yield {
+            "line": cut_off,
+            "status": "invalid",
+            "detail": f"Imports are limited to {settings.student_import_max_rows} rows; the rest were not read"
+        }
+
+async def _result_lines(results: AsyncIterator[dict]) -> AsyncIterator[str]:
+    counts = {"created": 0, "skipped": 0, "invalid": 0, "failed": 0}
+    async for result in results:
+        counts[result["status"]] += 1
+        yield json.dumps(result) + "\n"
+    yield json.dumps({"summary": counts}) + "\n"
+
+class ImportResponse(StreamingResponse):
+    """
+    Streams results while the upload is still being read. The body reads the
+    request itself, so receive() is not also polled for a disconnect, which
+    would swallow upload chunks.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+def import_response(results: AsyncIterator[dict]) -> StreamingResponse:
+    return ImportResponse(_result_lines(results), media_type="application/x-ndjson")
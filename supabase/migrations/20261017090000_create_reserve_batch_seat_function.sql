@@ -0,0 +1,89 @@
+/*
+  # Atomic Seat Reservation
+
+  ## Purpose
+  - Books a batch seat in a single round-trip instead of read-check-insert-update
+  - Prevents overselling when many students book the same batch concurrently
+
+  ## Changes
+  1. Create reserve_batch_seat(studid, batchid, amount, confirmation_number)
+     - Locks the batch row, rejects missing batches, full batches and duplicate bookings
+     - Inserts the booking and increments batches.seats_booked in the same transaction
+     - Returns the inserted booking row
+  2. Add a NOT VALID check constraint so seats_booked can never exceed seats_total
+     on new writes
+  3. Add a composite index on bookings(batchid, studid) for the duplicate check
+
+  ## Error codes
+  - BK404: batch not found
+  - BK409: batch is full
+  - BK410: student already booked this batch
+*/
+
+CREATE INDEX IF NOT EXISTS idx_bookings_batchid_studid ON bookings(batchid, studid);
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint
+    WHERE conname = 'batches_seats_within_capacity'
+  ) THEN
+    ALTER TABLE batches
+      ADD CONSTRAINT batches_seats_within_capacity
+      CHECK (seats_booked <= seats_total) NOT VALID;
+  END IF;
+END $$;
+
+CREATE OR REPLACE FUNCTION reserve_batch_seat(
+  p_studid uuid,
+  p_batchid uuid,
+  p_amount numeric,
+  p_confirmation_number text
+)
+RETURNS bookings
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_batch batches%ROWTYPE;
+  v_booking bookings%ROWTYPE;
+BEGIN
+  -- The row lock serializes reservations per batch, so the capacity and
+  -- duplicate checks below cannot race with another reservation.
+  SELECT * INTO v_batch FROM batches WHERE batchid = p_batchid FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Batch not found' USING ERRCODE = 'BK404';
+  END IF;
+
+  IF EXISTS (
+    SELECT 1 FROM bookings
+    WHERE batchid = p_batchid AND studid = p_studid
+  ) THEN
+    RAISE EXCEPTION 'You have already booked this batch' USING ERRCODE = 'BK410';
+  END IF;
+
+  IF COALESCE(v_batch.seats_booked, 0) >= v_batch.seats_total THEN
+    RAISE EXCEPTION 'Batch is full. No seats available.' USING ERRCODE = 'BK409';
+  END IF;
+
+  INSERT INTO bookings (
+    studid, batchid, confirmation_number, amount,
+    payment_status, attendance_status, booking_date
+  )
+  VALUES (
+    p_studid, p_batchid, p_confirmation_number, p_amount,
+    'pending', 'not_started', now()
+  )
+  RETURNING * INTO v_booking;
+
+  UPDATE batches
+  SET seats_booked = COALESCE(seats_booked, 0) + 1
+  WHERE batchid = p_batchid;
+
+  RETURN v_booking;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION reserve_batch_seat(uuid, uuid, numeric, text) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reserve_batch_seat(uuid, uuid, numeric, text) TO service_role;
@@ -0,0 +1,289 @@
+/*
+  # Incremental Platform Statistics
+
+  ## Purpose
+  - Answer the admin dashboard from one small read instead of seven count
+    queries plus a full scan of completed bookings for revenue
+
+  ## Changes
+  1. Create platform_stat_counters
+     - 16 shards of running totals; writers bump a random shard so concurrent
+       bookings do not queue on a single counter row
+  2. Statement-level triggers (with transition tables) on institutes, students,
+     courses and bookings apply the net change of each statement, so bulk
+     inserts cost one counter update rather than one per row
+  3. get_platform_stats() sums the shards into the dashboard payload
+  4. rebuild_platform_stats() recomputes the totals from the source tables and
+     reports the drift it corrected
+
+  ## Security
+  - Counter table has RLS enabled with no policies; only the SECURITY DEFINER
+    trigger functions and the service role touch it
+*/
+
+CREATE TABLE IF NOT EXISTS platform_stat_counters (
+  shard smallint PRIMARY KEY,
+  total_institutes bigint NOT NULL DEFAULT 0,
+  verified_institutes bigint NOT NULL DEFAULT 0,
+  total_students bigint NOT NULL DEFAULT 0,
+  total_courses bigint NOT NULL DEFAULT 0,
+  active_courses bigint NOT NULL DEFAULT 0,
+  total_bookings bigint NOT NULL DEFAULT 0,
+  total_revenue numeric(14,2) NOT NULL DEFAULT 0
+);
+
+ALTER TABLE platform_stat_counters ENABLE ROW LEVEL SECURITY;
+
+INSERT INTO platform_stat_counters (shard)
+SELECT generate_series(0, 15)
+ON CONFLICT (shard) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_platform_stats(
+  p_total_institutes bigint DEFAULT 0,
+  p_verified_institutes bigint DEFAULT 0,
+  p_total_students bigint DEFAULT 0,
+  p_total_courses bigint DEFAULT 0,
+  p_active_courses bigint DEFAULT 0,
+  p_total_bookings bigint DEFAULT 0,
+  p_total_revenue numeric DEFAULT 0
+)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF p_total_institutes = 0 AND p_verified_institutes = 0 AND p_total_students = 0
+     AND p_total_courses = 0 AND p_active_courses = 0 AND p_total_bookings = 0
+     AND p_total_revenue = 0 THEN
+    RETURN;
+  END IF;
+
+  UPDATE platform_stat_counters SET
+    total_institutes = total_institutes + p_total_institutes,
+    verified_institutes = verified_institutes + p_verified_institutes,
+    total_students = total_students + p_total_students,
+    total_courses = total_courses + p_total_courses,
+    active_courses = active_courses + p_active_courses,
+    total_bookings = total_bookings + p_total_bookings,
+    total_revenue = total_revenue + p_total_revenue
+  WHERE shard = floor(random() * 16)::smallint;
+END;
+$$;
+
+-- Institutes: total and verified counts
+CREATE OR REPLACE FUNCTION track_institute_stats()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_total bigint := 0;
+  v_verified bigint := 0;
+  v_count bigint;
+  v_matching bigint;
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    SELECT count(*), count(*) FILTER (WHERE verified_status = 'verified')
+    INTO v_count, v_matching FROM new_rows;
+    v_total := v_total + CASE WHEN TG_OP = 'INSERT' THEN v_count ELSE 0 END;
+    v_verified := v_verified + v_matching;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    SELECT count(*), count(*) FILTER (WHERE verified_status = 'verified')
+    INTO v_count, v_matching FROM old_rows;
+    v_total := v_total - CASE WHEN TG_OP = 'DELETE' THEN v_count ELSE 0 END;
+    v_verified := v_verified - v_matching;
+  END IF;
+
+  PERFORM bump_platform_stats(p_total_institutes => v_total, p_verified_institutes => v_verified);
+  RETURN NULL;
+END;
+$$;
+
+-- Students: total count
+CREATE OR REPLACE FUNCTION track_student_stats()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_total bigint := 0;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT count(*) INTO v_total FROM new_rows;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT -count(*) INTO v_total FROM old_rows;
+  END IF;
+
+  PERFORM bump_platform_stats(p_total_students => v_total);
+  RETURN NULL;
+END;
+$$;
+
+-- Courses: total and active counts
+CREATE OR REPLACE FUNCTION track_course_stats()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_total bigint := 0;
+  v_active bigint := 0;
+  v_count bigint;
+  v_matching bigint;
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    SELECT count(*), count(*) FILTER (WHERE status = 'active')
+    INTO v_count, v_matching FROM new_rows;
+    v_total := v_total + CASE WHEN TG_OP = 'INSERT' THEN v_count ELSE 0 END;
+    v_active := v_active + v_matching;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    SELECT count(*), count(*) FILTER (WHERE status = 'active')
+    INTO v_count, v_matching FROM old_rows;
+    v_total := v_total - CASE WHEN TG_OP = 'DELETE' THEN v_count ELSE 0 END;
+    v_active := v_active - v_matching;
+  END IF;
+
+  PERFORM bump_platform_stats(p_total_courses => v_total, p_active_courses => v_active);
+  RETURN NULL;
+END;
+$$;
+
+-- Bookings: total count and revenue from completed payments
+CREATE OR REPLACE FUNCTION track_booking_stats()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_total bigint := 0;
+  v_revenue numeric := 0;
+  v_count bigint;
+  v_amount numeric;
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    SELECT count(*), COALESCE(sum(amount) FILTER (WHERE payment_status = 'completed'), 0)
+    INTO v_count, v_amount FROM new_rows;
+    v_total := v_total + CASE WHEN TG_OP = 'INSERT' THEN v_count ELSE 0 END;
+    v_revenue := v_revenue + v_amount;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    SELECT count(*), COALESCE(sum(amount) FILTER (WHERE payment_status = 'completed'), 0)
+    INTO v_count, v_amount FROM old_rows;
+    v_total := v_total - CASE WHEN TG_OP = 'DELETE' THEN v_count ELSE 0 END;
+    v_revenue := v_revenue - v_amount;
+  END IF;
+
+  PERFORM bump_platform_stats(p_total_bookings => v_total, p_total_revenue => v_revenue);
+  RETURN NULL;
+END;
+$$;
+
+DO $$
+DECLARE
+  v_target record;
+BEGIN
+  FOR v_target IN
+    SELECT * FROM (VALUES
+      ('institutes', 'track_institute_stats'),
+      ('students', 'track_student_stats'),
+      ('courses', 'track_course_stats'),
+      ('bookings', 'track_booking_stats')
+    ) AS t(table_name, function_name)
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', v_target.table_name || '_stats_insert', v_target.table_name);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', v_target.table_name || '_stats_update', v_target.table_name);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', v_target.table_name || '_stats_delete', v_target.table_name);
+
+    EXECUTE format(
+      'CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+      v_target.table_name || '_stats_insert', v_target.table_name, v_target.function_name
+    );
+    EXECUTE format(
+      'CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+      v_target.table_name || '_stats_update', v_target.table_name, v_target.function_name
+    );
+    EXECUTE format(
+      'CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+      v_target.table_name || '_stats_delete', v_target.table_name, v_target.function_name
+    );
+  END LOOP;
+END $$;
+
+CREATE OR REPLACE FUNCTION get_platform_stats()
+RETURNS json
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT json_build_object(
+    'total_institutes', sum(total_institutes),
+    'verified_institutes', sum(verified_institutes),
+    'pending_verification', sum(total_institutes) - sum(verified_institutes),
+    'total_students', sum(total_students),
+    'total_courses', sum(total_courses),
+    'active_courses', sum(active_courses),
+    'total_bookings', sum(total_bookings),
+    'total_revenue', sum(total_revenue)
+  )
+  FROM platform_stat_counters;
+$$;
+
+CREATE OR REPLACE FUNCTION rebuild_platform_stats()
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_before json;
+  v_after json;
+BEGIN
+  -- Blocks trigger writers until the rebuilt totals are committed, and waits
+  -- for in-flight writers whose deltas are already applied.
+  LOCK TABLE platform_stat_counters IN EXCLUSIVE MODE;
+
+  v_before := get_platform_stats();
+
+  UPDATE platform_stat_counters SET
+    total_institutes = 0,
+    verified_institutes = 0,
+    total_students = 0,
+    total_courses = 0,
+    active_courses = 0,
+    total_bookings = 0,
+    total_revenue = 0;
+
+  UPDATE platform_stat_counters SET
+    total_institutes = (SELECT count(*) FROM institutes),
+    verified_institutes = (SELECT count(*) FROM institutes WHERE verified_status = 'verified'),
+    total_students = (SELECT count(*) FROM students),
+    total_courses = (SELECT count(*) FROM courses),
+    active_courses = (SELECT count(*) FROM courses WHERE status = 'active'),
+    total_bookings = (SELECT count(*) FROM bookings),
+    total_revenue = (SELECT COALESCE(sum(amount), 0) FROM bookings WHERE payment_status = 'completed')
+  WHERE shard = 0;
+
+  v_after := get_platform_stats();
+
+  RETURN json_build_object('before', v_before, 'after', v_after);
+END;
+$$;
+
+SELECT rebuild_platform_stats();
+
+REVOKE EXECUTE ON FUNCTION bump_platform_stats(bigint, bigint, bigint, bigint, bigint, bigint, numeric) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION get_platform_stats() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_platform_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_platform_stats() TO service_role;
+GRANT EXECUTE ON FUNCTION rebuild_platform_stats() TO service_role;
@@ -0,0 +1,38 @@
+/*
+  # Keyset Pagination Indexes
+
+  ## Purpose
+  - List endpoints page with (order column, primary key) cursors instead of
+    returning full result sets; these indexes let every page be served by an
+    index range scan, so page latency stays flat as tables grow
+
+  ## Indexes
+  - bookings: admin listing (optionally by payment_status), per student, per batch
+  - institutes: admin listing (optionally by verified_status)
+  - courses: public catalog of active courses
+  - batches: per course listing for institutes
+  - certificates: per course listing for institutes
+*/
+
+CREATE INDEX IF NOT EXISTS idx_bookings_booking_date_bookid
+  ON bookings(booking_date DESC, bookid DESC);
+CREATE INDEX IF NOT EXISTS idx_bookings_payment_status_booking_date_bookid
+  ON bookings(payment_status, booking_date DESC, bookid DESC);
+CREATE INDEX IF NOT EXISTS idx_bookings_studid_booking_date_bookid
+  ON bookings(studid, booking_date DESC, bookid DESC);
+CREATE INDEX IF NOT EXISTS idx_bookings_batchid_booking_date_bookid
+  ON bookings(batchid, booking_date, bookid);
+
+CREATE INDEX IF NOT EXISTS idx_institutes_created_at_instid
+  ON institutes(created_at DESC, instid DESC);
+CREATE INDEX IF NOT EXISTS idx_institutes_verified_status_created_at_instid
+  ON institutes(verified_status, created_at DESC, instid DESC);
+
+CREATE INDEX IF NOT EXISTS idx_courses_status_created_at_courseid
+  ON courses(status, created_at DESC, courseid DESC);
+
+CREATE INDEX IF NOT EXISTS idx_batches_courseid_start_date_batchid
+  ON batches(courseid, start_date DESC, batchid DESC);
+
+CREATE INDEX IF NOT EXISTS idx_certificates_courseid_issue_date_certid
+  ON certificates(courseid, issue_date DESC, certid DESC);
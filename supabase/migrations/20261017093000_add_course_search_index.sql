@@ -0,0 +1,139 @@
+/*
+  # Indexed Course Search
+
+  ## Purpose
+  - Replace ilike '%term%' on courses.title (sequential scan, titles only) with
+    relevance-ranked, typo-tolerant search over title, description, type and
+    the linked master course name/code
+
+  ## Changes
+  1. Enable pg_trgm
+  2. Create course_search_index, one row per course, holding
+     - search_vector: weighted full-text document (GIN indexed)
+     - search_text: title, type and master course name/code for trigram
+       matching (GIN trigram indexed)
+     Kept out of the courses table so regular course reads do not carry it
+  3. Triggers keep the index current when courses change and when a master
+     course is renamed or recoded
+  4. search_courses(query, type, mode, limit) returns active courses ranked by
+     full-text rank plus trigram word similarity
+*/
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+CREATE TABLE IF NOT EXISTS course_search_index (
+  courseid uuid PRIMARY KEY REFERENCES courses(courseid) ON DELETE CASCADE,
+  search_vector tsvector NOT NULL,
+  search_text text NOT NULL
+);
+
+ALTER TABLE course_search_index ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_course_search_index_vector
+  ON course_search_index USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS idx_course_search_index_trgm
+  ON course_search_index USING gin (search_text extensions.gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION refresh_course_search(p_courseids uuid[])
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+  INSERT INTO course_search_index (courseid, search_vector, search_text)
+  SELECT
+    c.courseid,
+    setweight(to_tsvector('english', coalesce(c.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(m.course_name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(m.course_code, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(c.type, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(c.description, '')), 'C'),
+    lower(concat_ws(' ', c.title, m.course_name, m.course_code, c.type))
+  FROM courses c
+  LEFT JOIN master_courses m ON m.master_course_id = c.master_course_id
+  WHERE c.courseid = ANY(p_courseids)
+  ON CONFLICT (courseid) DO UPDATE SET
+    search_vector = EXCLUDED.search_vector,
+    search_text = EXCLUDED.search_text;
+$$;
+
+CREATE OR REPLACE FUNCTION track_course_search()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  PERFORM refresh_course_search(ARRAY(SELECT courseid FROM new_rows));
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION track_master_course_search()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  PERFORM refresh_course_search(ARRAY(
+    SELECT c.courseid
+    FROM courses c
+    JOIN new_rows n ON n.master_course_id = c.master_course_id
+  ));
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS courses_search_insert ON courses;
+CREATE TRIGGER courses_search_insert
+  AFTER INSERT ON courses
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION track_course_search();
+
+DROP TRIGGER IF EXISTS courses_search_update ON courses;
+CREATE TRIGGER courses_search_update
+  AFTER UPDATE ON courses
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION track_course_search();
+
+DROP TRIGGER IF EXISTS master_courses_search_update ON master_courses;
+CREATE TRIGGER master_courses_search_update
+  AFTER UPDATE ON master_courses
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION track_master_course_search();
+
+SELECT refresh_course_search(ARRAY(SELECT courseid FROM courses));
+
+CREATE OR REPLACE FUNCTION search_courses(
+  p_query text,
+  p_type text DEFAULT NULL,
+  p_mode text DEFAULT NULL,
+  p_limit integer DEFAULT 50
+)
+RETURNS SETOF courses
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+  SELECT c.*
+  FROM course_search_index s
+  JOIN courses c ON c.courseid = s.courseid,
+  LATERAL (SELECT websearch_to_tsquery('english', p_query) AS q, lower(p_query) AS term) AS input
+  WHERE c.status = 'active'
+    AND (p_type IS NULL OR c.type = p_type)
+    AND (p_mode IS NULL OR c.mode = p_mode)
+    AND (s.search_vector @@ input.q OR input.term <% s.search_text)
+  ORDER BY
+    ts_rank_cd(s.search_vector, input.q) + word_similarity(input.term, s.search_text) DESC,
+    c.created_at DESC,
+    c.courseid DESC
+  LIMIT LEAST(GREATEST(p_limit, 1), 200);
+$$;
+
+GRANT EXECUTE ON FUNCTION search_courses(text, text, text, integer) TO anon, authenticated, service_role;
+REVOKE EXECUTE ON FUNCTION refresh_course_search(uuid[]) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,118 @@
+/*
+  # Cart Checkout
+
+  ## Purpose
+  - Books every batch in a student's cart in one round-trip and one transaction
+  - Either all cart bookings are made or none are
+
+  ## Changes
+  1. Create checkout_cart(userid, studid)
+     - Locks every batch in the cart in batchid order, so concurrent checkouts
+       and reserve_batch_seat calls always take seat locks in the same order
+     - Rejects an empty cart, items without a batch or with a batch from another
+       course, missing batches, batches the student already booked and full batches
+     - Inserts one booking per item at the course fee, increments each
+       batches.seats_booked and empties the cart
+     - Returns the inserted booking rows
+  2. Add an index on cart_items(user_id, batch_id) for the checkout lookups
+
+  ## Error codes
+  - BK400: cart is empty
+  - BK404: batch not found
+  - BK409: batch is full
+  - BK410: student already booked this batch
+  - BK422: cart item has no batch, or the batch belongs to another course
+*/
+
+CREATE INDEX IF NOT EXISTS idx_cart_items_user_id_batch_id ON cart_items(user_id, batch_id);
+
+CREATE OR REPLACE FUNCTION checkout_cart(
+  p_userid uuid,
+  p_studid uuid
+)
+RETURNS SETOF bookings
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_item_count integer;
+  v_batch_ids uuid[];
+  v_batch record;
+BEGIN
+  SELECT count(*), array_agg(batch_id ORDER BY batch_id)
+  INTO v_item_count, v_batch_ids
+  FROM cart_items
+  WHERE user_id = p_userid;
+
+  IF v_item_count = 0 THEN
+    RAISE EXCEPTION 'Cart is empty' USING ERRCODE = 'BK400';
+  END IF;
+
+  IF array_position(v_batch_ids, NULL) IS NOT NULL THEN
+    RAISE EXCEPTION 'Select a batch for every course in the cart' USING ERRCODE = 'BK422';
+  END IF;
+
+  -- Lock in batchid order: two checkouts sharing batches queue on the first
+  -- shared batch instead of deadlocking on each other's locks.
+  PERFORM 1 FROM batches
+  WHERE batchid = ANY(v_batch_ids)
+  ORDER BY batchid
+  FOR UPDATE;
+
+  FOR v_batch IN
+    SELECT c.course_id, c.batch_id, b.batchid, b.courseid, b.batch_name,
+           b.seats_total, COALESCE(b.seats_booked, 0) AS seats_booked
+    FROM cart_items c
+    LEFT JOIN batches b ON b.batchid = c.batch_id
+    WHERE c.user_id = p_userid
+    ORDER BY c.batch_id
+  LOOP
+    IF v_batch.batchid IS NULL THEN
+      RAISE EXCEPTION 'Batch not found' USING ERRCODE = 'BK404';
+    END IF;
+
+    IF v_batch.courseid <> v_batch.course_id THEN
+      RAISE EXCEPTION 'Batch % does not belong to the selected course', v_batch.batch_name
+        USING ERRCODE = 'BK422';
+    END IF;
+
+    IF EXISTS (
+      SELECT 1 FROM bookings
+      WHERE batchid = v_batch.batchid AND studid = p_studid
+    ) THEN
+      RAISE EXCEPTION 'You have already booked batch %', v_batch.batch_name USING ERRCODE = 'BK410';
+    END IF;
+
+    IF v_batch.seats_booked >= v_batch.seats_total THEN
+      RAISE EXCEPTION 'Batch % is full. No seats available.', v_batch.batch_name USING ERRCODE = 'BK409';
+    END IF;
+  END LOOP;
+
+  UPDATE batches
+  SET seats_booked = COALESCE(seats_booked, 0) + 1
+  WHERE batchid = ANY(v_batch_ids);
+
+  RETURN QUERY
+  INSERT INTO bookings (
+    studid, batchid, confirmation_number, amount,
+    payment_status, attendance_status, booking_date
+  )
+  SELECT
+    p_studid,
+    c.batch_id,
+    'BK' || to_char(now(), 'YYYYMMDD') || upper(substr(replace(gen_random_uuid()::text, '-', ''), 1, 8)),
+    co.fees,
+    'pending',
+    'not_started',
+    now()
+  FROM cart_items c
+  JOIN courses co ON co.courseid = c.course_id
+  WHERE c.user_id = p_userid
+  RETURNING *;
+
+  DELETE FROM cart_items WHERE user_id = p_userid;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION checkout_cart(uuid, uuid) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION checkout_cart(uuid, uuid) TO service_role;
@@ -0,0 +1,67 @@
+/*
+  # Background Jobs and Booking Commissions
+
+  ## Purpose
+  - Optional durable store for the API's in-process background job queue
+    (JOBS_PERSIST=true), so queued side effects survive a restart
+  - Commission records written in the background after each booking
+
+  ## Changes
+  1. Create background_jobs
+     - One row per queued job: handler name, JSON payload, status and attempts
+     - Rows are deleted when the job succeeds; failed jobs keep last_error
+     - Partial index on pending rows in creation order for startup recovery
+  2. Create booking_commissions
+     - One row per booking with the amount, the commission percent applied
+       (course, else institute default, else platform default) and the amount
+     - Unique bookid, so a retried job upserts instead of double counting
+  3. RLS enabled on both; the API uses the service role, institutes can read
+     their own commission rows and admins can read all of them
+*/
+
+CREATE TABLE IF NOT EXISTS background_jobs (
+  job_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  name text NOT NULL,
+  payload jsonb NOT NULL DEFAULT '{}'::jsonb,
+  status text NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'failed')),
+  attempts integer NOT NULL DEFAULT 0,
+  last_error text,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_background_jobs_pending
+  ON background_jobs(created_at)
+  WHERE status = 'pending';
+
+CREATE TABLE IF NOT EXISTS booking_commissions (
+  booking_commission_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  bookid uuid NOT NULL UNIQUE REFERENCES bookings(bookid) ON DELETE CASCADE,
+  instid uuid REFERENCES institutes(instid) ON DELETE CASCADE,
+  courseid uuid REFERENCES courses(courseid) ON DELETE CASCADE,
+  booking_amount decimal(10,2) NOT NULL,
+  commission_percent decimal(5,2) NOT NULL,
+  commission_amount decimal(10,2) NOT NULL,
+  created_at timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_booking_commissions_instid ON booking_commissions(instid);
+
+ALTER TABLE background_jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE booking_commissions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Institutes can view their booking commissions"
+  ON booking_commissions FOR SELECT
+  TO authenticated
+  USING (
+    EXISTS (
+      SELECT 1 FROM institutes
+      WHERE institutes.instid = booking_commissions.instid
+      AND institutes.userid = auth.uid()
+    )
+  );
+
+CREATE POLICY "Admins can view all booking commissions"
+  ON booking_commissions FOR SELECT
+  TO authenticated
+  USING (is_admin());
@@ -0,0 +1,24 @@
+/*
+  # Batch Lifecycle Indexes
+
+  ## Purpose
+  - The batch lifecycle scheduler moves batches upcoming -> ongoing -> completed
+    with two set-based updates; only upcoming and ongoing batches are ever
+    candidates, so partial indexes over those rows keep each run proportional
+    to the active batches rather than the whole history
+  - GET /batches lists batch_status IN ('upcoming', 'ongoing') ordered by
+    start_date, which the first index serves directly
+
+  ## Indexes
+  - Active batches by (batch_status, start_date): default listing and
+    upcoming -> ongoing
+  - Active batches by end_date: upcoming/ongoing -> completed
+*/
+
+CREATE INDEX IF NOT EXISTS idx_batches_active_status_start_date
+  ON batches(batch_status, start_date)
+  WHERE batch_status IN ('upcoming', 'ongoing');
+
+CREATE INDEX IF NOT EXISTS idx_batches_active_end_date
+  ON batches(end_date)
+  WHERE batch_status IN ('upcoming', 'ongoing');
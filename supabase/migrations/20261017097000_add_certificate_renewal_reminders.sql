@@ -0,0 +1,26 @@
+/*
+  # Certificate Renewal Reminders
+
+  ## Purpose
+  - The renewal sweep pages through valid certificates expiring in the next
+    N days and notifies their students once per certificate
+  - Students list their own certificates expiring soon
+
+  ## Changes
+  1. Add certificates.renewal_reminder_sent_at, stamped by the sweep after it
+     writes a certificate's notification
+  2. Partial index on (expiry_date, certid) over valid certificates that have
+     not been reminded: the sweep's keyset range scan reads only due rows, and
+     reminded rows leave the index, so an interrupted sweep resumes where it
+     stopped
+  3. Index on (studid, expiry_date) for GET /certificates/my-certificates/expiring
+*/
+
+ALTER TABLE certificates ADD COLUMN IF NOT EXISTS renewal_reminder_sent_at timestamptz;
+
+CREATE INDEX IF NOT EXISTS idx_certificates_renewal_due
+  ON certificates(expiry_date, certid)
+  WHERE status = 'valid' AND renewal_reminder_sent_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_certificates_studid_expiry_date
+  ON certificates(studid, expiry_date);
@@ -0,0 +1,61 @@
+/*
+  # Institute Accreditation Expiry State
+
+  ## Purpose
+  - Keep accreditation expiry as a stored, indexed flag instead of comparing
+    valid_to on every request, so request-time checks read it from the cached
+    principal and admin listings can filter on it
+  - Let the API's expiry sweeper find newly expired institutes with an index
+    scan over the unflagged rows only
+
+  ## Changes
+  1. Add institutes.accreditation_expired (default false) and
+     accreditation_expired_at, backfilled from valid_to. The backfill leaves
+     courses alone; the first sweep does not revisit flagged institutes
+  2. Trigger clears the flag when valid_to is moved to today or later, e.g. when
+     a reactivation request is approved; flagging (and deactivating the
+     institute's courses) is left to the sweeper
+  3. Indexes
+     - unflagged institutes by valid_to, for the sweeper
+     - (accreditation_expired, created_at, instid), for the admin listing filter
+     - courses (instid, status), for deactivating an institute's active courses
+*/
+
+ALTER TABLE institutes ADD COLUMN IF NOT EXISTS accreditation_expired boolean NOT NULL DEFAULT false;
+ALTER TABLE institutes ADD COLUMN IF NOT EXISTS accreditation_expired_at timestamptz;
+
+UPDATE institutes
+SET accreditation_expired = true,
+    accreditation_expired_at = now()
+WHERE valid_to < CURRENT_DATE
+  AND NOT accreditation_expired;
+
+CREATE OR REPLACE FUNCTION clear_institute_accreditation_expired()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+  IF NEW.valid_to >= CURRENT_DATE THEN
+    NEW.accreditation_expired := false;
+    NEW.accreditation_expired_at := NULL;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS institute_accreditation_expired_trigger ON institutes;
+CREATE TRIGGER institute_accreditation_expired_trigger
+  BEFORE INSERT OR UPDATE OF valid_to ON institutes
+  FOR EACH ROW
+  EXECUTE FUNCTION clear_institute_accreditation_expired();
+
+CREATE INDEX IF NOT EXISTS idx_institutes_expiry_due
+  ON institutes(valid_to)
+  WHERE NOT accreditation_expired;
+
+CREATE INDEX IF NOT EXISTS idx_institutes_accreditation_expired_created_at_instid
+  ON institutes(accreditation_expired, created_at DESC, instid DESC);
+
+CREATE INDEX IF NOT EXISTS idx_courses_instid_status
+  ON courses(instid, status);
@@ -0,0 +1,44 @@
+/*
+  # Refresh-Token Sessions
+
+  ## Purpose
+  - Let clients renew access tokens with a rotating refresh token instead of
+    signing in with their password again every ACCESS_TOKEN_EXPIRE_MINUTES
+  - Keep one compact row per signed-in client: the refresh secret is stored
+    only as a SHA-256 digest and is replaced in place on every refresh
+
+  ## Changes
+  1. auth_sessions table
+     - session_id, userid and role (so a refresh needs no users lookup)
+     - token_hash: hex SHA-256 digest of the current refresh secret
+     - expires_at (sliding, moved forward on each refresh), last_used_at,
+       revoked_at
+  2. Indexes
+     - live sessions by userid, for logout-all and admin revocation
+     - expires_at and revoked_at, for the purge of dead rows
+  3. RLS enabled with no policies; the API uses the service role
+*/
+
+CREATE TABLE IF NOT EXISTS auth_sessions (
+  session_id uuid PRIMARY KEY,
+  userid uuid NOT NULL REFERENCES users(userid) ON DELETE CASCADE,
+  role text NOT NULL,
+  token_hash text NOT NULL,
+  expires_at timestamptz NOT NULL,
+  last_used_at timestamptz,
+  revoked_at timestamptz,
+  created_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE auth_sessions ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_auth_sessions_userid_live
+  ON auth_sessions(userid)
+  WHERE revoked_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_auth_sessions_expires_at
+  ON auth_sessions(expires_at);
+
+CREATE INDEX IF NOT EXISTS idx_auth_sessions_revoked_at
+  ON auth_sessions(revoked_at)
+  WHERE revoked_at IS NOT NULL;
@@ -0,0 +1,51 @@
+/*
+  # Fix Platform Statistics Shard Selection
+
+  ## Purpose
+  - bump_platform_stats() chose its shard with random() inside the UPDATE's
+    WHERE clause. random() is volatile, so it was evaluated once per shard row
+    and a delta landed on zero, one or several shards, making the dashboard
+    counters drift from the source tables
+
+  ## Changes
+  1. bump_platform_stats() picks the shard once, into a variable
+  2. Counters are rebuilt from the source tables to clear the drift
+*/
+
+CREATE OR REPLACE FUNCTION bump_platform_stats(
+  p_total_institutes bigint DEFAULT 0,
+  p_verified_institutes bigint DEFAULT 0,
+  p_total_students bigint DEFAULT 0,
+  p_total_courses bigint DEFAULT 0,
+  p_active_courses bigint DEFAULT 0,
+  p_total_bookings bigint DEFAULT 0,
+  p_total_revenue numeric DEFAULT 0
+)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  -- Picked once: random() in the WHERE clause would be re-evaluated per row
+  v_shard smallint := floor(random() * 16)::smallint;
+BEGIN
+  IF p_total_institutes = 0 AND p_verified_institutes = 0 AND p_total_students = 0
+     AND p_total_courses = 0 AND p_active_courses = 0 AND p_total_bookings = 0
+     AND p_total_revenue = 0 THEN
+    RETURN;
+  END IF;
+
+  UPDATE platform_stat_counters SET
+    total_institutes = total_institutes + p_total_institutes,
+    verified_institutes = verified_institutes + p_verified_institutes,
+    total_students = total_students + p_total_students,
+    total_courses = total_courses + p_total_courses,
+    active_courses = active_courses + p_active_courses,
+    total_bookings = total_bookings + p_total_bookings,
+    total_revenue = total_revenue + p_total_revenue
+  WHERE shard = v_shard;
+END;
+$$;
+
+SELECT rebuild_platform_stats();
@@ -0,0 +1,23 @@
+/*
+  # Courses Deactivated by Accreditation Expiry
+
+  ## Purpose
+  - Tell courses the expiry sweeper deactivated apart from courses an
+    institute switched off itself, so approving a reactivation request can
+    re-activate exactly the former
+
+  ## Changes
+  1. Add courses.expiry_deactivated (default false). The sweeper sets it with
+     status = 'inactive'; reactivation approval and any later status change by
+     the institute clear it. Courses deactivated by sweeps before this
+     migration are not marked and stay inactive until the institute
+     re-activates them
+  2. Partial index on instid over the marked courses, for the reactivation
+     update
+*/
+
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS expiry_deactivated boolean NOT NULL DEFAULT false;
+
+CREATE INDEX IF NOT EXISTS idx_courses_instid_expiry_deactivated
+  ON courses(instid)
+  WHERE expiry_deactivated;
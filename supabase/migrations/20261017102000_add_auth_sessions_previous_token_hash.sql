@@ -0,0 +1,15 @@
+/*
+  # Refresh-Token Reuse Detection by Previous Digest
+
+  ## Purpose
+  - Revoke a session only when the refresh token it last rotated away is
+    presented again (a copied token), not on any wrong secret. The session id
+    is carried in every access token, so revoking on a mismatch let anyone who
+    had seen one sign its user out
+
+  ## Changes
+  1. Add auth_sessions.previous_token_hash: hex SHA-256 digest of the refresh
+     secret replaced by the latest rotation (null until the first refresh)
+*/
+
+ALTER TABLE auth_sessions ADD COLUMN IF NOT EXISTS previous_token_hash text;
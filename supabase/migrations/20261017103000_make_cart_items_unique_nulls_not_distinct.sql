@@ -0,0 +1,56 @@
+/*
+  # One Cart Line per Course Without a Batch
+
+  ## Purpose
+  - UNIQUE(user_id, course_id, batch_id) treats NULL batch_ids as distinct, so
+    the same course could be added to a cart any number of times without a
+    batch. Make the constraint treat NULLs as equal
+
+  ## Changes
+  1. Delete duplicate batchless lines, keeping the earliest per user and course
+  2. Replace the unique constraint with UNIQUE NULLS NOT DISTINCT
+  3. batch_id is ON DELETE SET NULL, so deleting a batch could now turn a line
+     into a duplicate of a batchless line for the same course. A BEFORE
+     DELETE trigger on batches first drops such lines. Lines for other batches
+     are kept, since setting this one to NULL does not clash with them
+*/
+
+DELETE FROM cart_items ci
+USING cart_items earlier
+WHERE ci.batch_id IS NULL
+  AND earlier.batch_id IS NULL
+  AND earlier.user_id = ci.user_id
+  AND earlier.course_id = ci.course_id
+  AND (earlier.added_at, earlier.cart_item_id) < (ci.added_at, ci.cart_item_id);
+
+ALTER TABLE cart_items DROP CONSTRAINT IF EXISTS cart_items_user_id_course_id_batch_id_key;
+ALTER TABLE cart_items
+  ADD CONSTRAINT cart_items_user_id_course_id_batch_id_key
+  UNIQUE NULLS NOT DISTINCT (user_id, course_id, batch_id);
+
+CREATE OR REPLACE FUNCTION drop_cart_items_for_deleted_batch()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  -- Lines that would become a duplicate once batch_id is set to NULL
+  DELETE FROM cart_items ci
+  WHERE ci.batch_id = OLD.batchid
+    AND EXISTS (
+      SELECT 1
+      FROM cart_items other
+      WHERE other.user_id = ci.user_id
+        AND other.course_id = ci.course_id
+        AND other.batch_id IS NULL
+    );
+  RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS batches_drop_duplicate_cart_items ON batches;
+CREATE TRIGGER batches_drop_duplicate_cart_items
+  BEFORE DELETE ON batches
+  FOR EACH ROW
+  EXECUTE FUNCTION drop_cart_items_for_deleted_batch();
@@ -0,0 +1,26 @@
+/*
+  # Profile Columns Read by the API
+
+  ## Purpose
+  - The API reads users and students with explicit select lists built from
+    its response models (UserProfile, StudentResponse) instead of select("*").
+    Sign-up has always written these fields, but no earlier migration creates
+    them, so on a database built from migrations alone every authenticated
+    request failed with "column does not exist"
+
+  ## Changes
+  1. users.full_name
+  2. students.full_name, phone, cdc_number, indos_number, address, state
+  All nullable and added only if missing, so databases that already have them
+  are unchanged
+*/
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS full_name text;
+
+ALTER TABLE students
+  ADD COLUMN IF NOT EXISTS full_name text,
+  ADD COLUMN IF NOT EXISTS phone text,
+  ADD COLUMN IF NOT EXISTS cdc_number text,
+  ADD COLUMN IF NOT EXISTS indos_number text,
+  ADD COLUMN IF NOT EXISTS address text,
+  ADD COLUMN IF NOT EXISTS state text;
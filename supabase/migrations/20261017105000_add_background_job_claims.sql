@@ -0,0 +1,62 @@
+/*
+  # Background Job Claims
+
+  ## Purpose
+  - With several API processes, each one queued every pending background_jobs
+    row at startup, so notifications and audit entries were written once per
+    process. A process now claims rows before running them, and rows claimed
+    by a process that stopped are claimed again once their claim goes stale
+
+  ## Changes
+  1. background_jobs.status also allows 'running'; claimed_by (process id) and
+     claimed_at record the claim
+  2. claim_background_jobs(worker, limit, stale_seconds) marks up to limit
+     pending rows, or running rows claimed more than stale_seconds ago, as
+     running for worker and returns them, oldest first. FOR UPDATE SKIP LOCKED
+     keeps concurrent claims from returning the same row
+  3. Partial index on running rows by claimed_at, for the stale check
+*/
+
+ALTER TABLE background_jobs DROP CONSTRAINT IF EXISTS background_jobs_status_check;
+ALTER TABLE background_jobs
+  ADD CONSTRAINT background_jobs_status_check
+  CHECK (status IN ('pending', 'running', 'failed'));
+
+ALTER TABLE background_jobs ADD COLUMN IF NOT EXISTS claimed_by text;
+ALTER TABLE background_jobs ADD COLUMN IF NOT EXISTS claimed_at timestamptz;
+
+CREATE INDEX IF NOT EXISTS idx_background_jobs_running
+  ON background_jobs(claimed_at)
+  WHERE status = 'running';
+
+CREATE OR REPLACE FUNCTION claim_background_jobs(
+  p_worker text,
+  p_limit integer,
+  p_stale_seconds integer
+)
+RETURNS SETOF background_jobs
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH claimable AS (
+    SELECT job_id
+    FROM background_jobs
+    WHERE status = 'pending'
+       OR (status = 'running' AND claimed_at < now() - make_interval(secs => p_stale_seconds))
+    ORDER BY created_at
+    LIMIT GREATEST(p_limit, 0)
+    FOR UPDATE SKIP LOCKED
+  )
+  UPDATE background_jobs j
+  SET status = 'running',
+      claimed_by = p_worker,
+      claimed_at = now(),
+      updated_at = now()
+  FROM claimable
+  WHERE j.job_id = claimable.job_id
+  RETURNING j.*;
+$$;
+
+REVOKE EXECUTE ON FUNCTION claim_background_jobs(text, integer, integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_background_jobs(text, integer, integer) TO service_role;